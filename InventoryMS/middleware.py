@@ -17,36 +17,67 @@ access_logger = logging.getLogger('access.log')
 perf_logger = logging.getLogger('performance.log')
 
 class SQLInjectionProtectionMiddleware:
-    # ... (existing code)
+    """
+    Blocks requests whose parameters or body look like SQL injection.
+
+    Each pattern is paired with a lowercase trigger substring; values are
+    lowercased once and only the patterns whose trigger occurs are run, so
+    clean input costs a handful of substring scans instead of 13 regex
+    passes.
+
+    Patterns with an open-ended gap (``OR ... =``, ``UPDATE ... SET``,
+    ``/* ... */``) are split into a head and a tail, the gap being the rest
+    of one line. Only the first head ending on a line has to be tried: a
+    later one on the same line sees a subset of that line. So every line is
+    searched once and whole values and bodies are scanned in linear time,
+    with no length cap or gap limit to pad past.
+    """
+    # (trigger, head, tail). A whitespace group in the head may span lines;
+    # the gap then needs at least one character before the tail.
     SQL_PATTERNS = [
-        r"(?i)UNION\s+SELECT",
-        r"(?i)OR\s+.+?=.+",
-        r"(?i)AND\s+.+?=.+",
-        r"--",
-        r"/\*.*?\*/",
-        r"#",
-        r";",
-        r"(?i)DROP\s+TABLE",
-        r"(?i)INSERT\s+INTO",
-        r"(?i)UPDATE\s+.+?\s+SET",
-        r"(?i)DELETE\s+FROM",
-        r"(?i)SLEEP\(",
-        r"(?i)BENCHMARK\(",
+        ("union", r"UNION\s+SELECT", None),
+        ("or", r"OR(\s+)", r"=."),
+        ("and", r"AND(\s+)", r"=."),
+        ("--", r"--", None),
+        ("/*", r"/\*", r"\*/"),
+        ("#", r"#", None),
+        (";", r";", None),
+        ("drop", r"DROP\s+TABLE", None),
+        ("insert", r"INSERT\s+INTO", None),
+        ("update", r"UPDATE(\s+)", r"\s+SET"),
+        ("delete", r"DELETE\s+FROM", None),
+        ("sleep(", r"SLEEP\(", None),
+        ("benchmark(", r"BENCHMARK\(", None),
     ]
+    WHITESPACE_ESCAPES = (("\\n", "\n"), ("\\r", "\r"), ("\\t", "\t"))
+    # Bodies already parsed into request.POST are not scanned twice
+    FORM_CONTENT_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
 
     def __init__(self, get_response):
         self.get_response = get_response
-        self.compiled_patterns = [re.compile(p) for p in self.SQL_PATTERNS]
+        self.compiled_patterns = [
+            (
+                trigger,
+                re.compile(head, re.IGNORECASE),
+                re.compile(tail, re.IGNORECASE) if tail else None,
+            )
+            for trigger, head, tail in self.SQL_PATTERNS
+        ]
 
     def __call__(self, request):
         if self._is_malicious(request.GET):
             return self._record_and_block(request, "GET")
-        if self._is_malicious(request.POST):
-            return self._record_and_block(request, "POST")
+        if request.content_type in self.FORM_CONTENT_TYPES:
+            if self._is_malicious(request.POST):
+                return self._record_and_block(request, "POST")
+            return self.get_response(request)
         try:
             if request.body:
                 try:
                     body_str = request.body.decode('utf-8', errors='ignore')
+                    # JSON escapes whitespace; scan it as the decoded value
+                    for escaped, char in self.WHITESPACE_ESCAPES:
+                        body_str = body_str.replace(escaped, char)
                     if self._is_malicious_string(body_str):
                          return self._record_and_block(request, "BODY")
                 except:
@@ -64,11 +95,41 @@ class SQLInjectionProtectionMiddleware:
         return False
 
     def _is_malicious_string(self, value):
-        for pattern in self.compiled_patterns:
-            if pattern.search(value):
+        lowered = value.lower()
+        for trigger, head, tail in self.compiled_patterns:
+            if trigger in lowered and self._search(value, head, tail):
                 return True
         return False
 
+    def _search(self, value, head, tail):
+        if tail is None:
+            return head.search(value) is not None
+        if tail.search(value) is None:
+            return False
+        pos = 0
+        searched_to = -1
+        while True:
+            match = head.search(value, pos)
+            if match is None:
+                return False
+            pos = match.end()
+            if match.end() <= searched_to:
+                # Ends on a line an earlier head already searched
+                continue
+            if head.groups:
+                # The gap starts on the line the whitespace run ends on and
+                # holds at least one character
+                gap = max(match.start(1), value.rfind('\n', match.start(1), match.end(1))) + 2
+            else:
+                gap = match.end()
+            line_end = value.find('\n', match.end())
+            if line_end == -1:
+                line_end = len(value)
+            # The tail may itself start with whitespace running past the line
+            if tail.search(value, gap, line_end) or tail.match(value, line_end):
+                return True
+            searched_to = line_end
+
     def _record_and_block(self, request, method):
         ip = self._get_client_ip(request)
         sqli_logger.warning(
@@ -16,6 +16,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'phonenumber_field',
     'crispy_forms',
@@ -148,6 +149,24 @@ LOGGING = {
     },
 }
 
+# Rows fetched per database round trip when streaming sales/purchase exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Seconds between refreshes of the agent's in-memory product catalogue
+CATALOGUE_REFRESH_INTERVAL = 5
+
+# Per-session agent memory: estimated tokens of history replayed to the LLM,
+# most recent messages considered, and size of the rolling summary
+AGENT_MEMORY_TOKEN_BUDGET = int(os.getenv('AGENT_MEMORY_TOKEN_BUDGET', '1500'))
+AGENT_MEMORY_MAX_MESSAGES = int(os.getenv('AGENT_MEMORY_MAX_MESSAGES', '20'))
+AGENT_MEMORY_SUMMARY_TOKENS = int(os.getenv('AGENT_MEMORY_SUMMARY_TOKENS', '300'))
+
+# In-flight LLM calls allowed per event loop by AccountingAgent.aprocess_message
+AGENT_MAX_CONCURRENT_LLM_CALLS = int(os.getenv('AGENT_MAX_CONCURRENT_LLM_CALLS', '200'))
+
+# Store per-message latency and token usage of the agent as AgentMetric rows
+AGENT_METRICS_ENABLED = os.getenv('AGENT_METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+
 LOGIN_URL = 'user-login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_URL = 'logout'
@@ -208,3 +227,53 @@ AI_MODEL_NAME = os.getenv('AI_MODEL_NAME', 'gpt-3.5-turbo')
 # WPPConnect Configuration
 WPPCONNECT_SECRET_KEY = os.getenv('WPPCONNECT_SECRET_KEY', 'THISISMYSECURETOKEN')
 WPPCONNECT_WEBHOOK_URL = os.getenv('WPPCONNECT_WEBHOOK_URL')
+WPPCONNECT_POOL_SIZE = int(os.getenv('WPPCONNECT_POOL_SIZE', '10'))
+WPPCONNECT_MAX_RETRIES = int(os.getenv('WPPCONNECT_MAX_RETRIES', '3'))
+WPPCONNECT_RETRY_BACKOFF = float(os.getenv('WPPCONNECT_RETRY_BACKOFF', '0.5'))
+
+# Process-local cache of derived encryption keys / decrypted secrets
+ENCRYPTION_CACHE_SIZE = int(os.getenv('ENCRYPTION_CACHE_SIZE', '256'))
+ENCRYPTION_CACHE_TTL = int(os.getenv('ENCRYPTION_CACHE_TTL', '3600'))
+
+# Caches. Agent tool answers live in the database cache so the web and
+# worker processes share entries and invalidations
+# (run `manage.py createcachetable` once).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'agent_tools': {
+        'BACKEND': os.getenv('AGENT_TOOL_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('AGENT_TOOL_CACHE_LOCATION', 'agent_tool_cache'),
+        'OPTIONS': {
+            # Keys are one per tool/argument/generation; the default of 300
+            # entries culls constantly under normal agent traffic
+            'MAX_ENTRIES': int(os.getenv('AGENT_TOOL_CACHE_MAX_ENTRIES', '10000')),
+        },
+    },
+}
+AGENT_TOOL_CACHE_TIMEOUT = int(os.getenv('AGENT_TOOL_CACHE_TIMEOUT', '300'))
+
+# Webhook Queue (processed by `manage.py process_webhook_events`)
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', '4'))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '3'))
+WEBHOOK_STALE_TIMEOUT = int(os.getenv('WEBHOOK_STALE_TIMEOUT', '300'))
+
+# zlib level (1-9) used to compress raw webhook payloads in MessagePayload
+MESSAGE_PAYLOAD_COMPRESSION_LEVEL = int(os.getenv('MESSAGE_PAYLOAD_COMPRESSION_LEVEL', '6'))
+
+# Messages older than MESSAGE_RETENTION_DAYS are moved to monthly gzip JSONL
+# files in MESSAGE_ARCHIVE_DIR by `manage.py archive_messages`
+MESSAGE_RETENTION_DAYS = int(os.getenv('MESSAGE_RETENTION_DAYS', '180'))
+MESSAGE_ARCHIVE_DIR = os.getenv('MESSAGE_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
+
+# Outbound message outbox (sent by `manage.py dispatch_outbound_messages`).
+# OUTBOX_RATE messages per second per WhatsApp session, bursts of OUTBOX_BURST.
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', '4'))
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '50'))
+OUTBOX_RATE = float(os.getenv('OUTBOX_RATE', '1.0'))
+OUTBOX_BURST = int(os.getenv('OUTBOX_BURST', '5'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))
+OUTBOX_RETRY_BACKOFF = float(os.getenv('OUTBOX_RETRY_BACKOFF', '2'))
+OUTBOX_MAX_BACKOFF = int(os.getenv('OUTBOX_MAX_BACKOFF', '300'))
+OUTBOX_STALE_TIMEOUT = int(os.getenv('OUTBOX_STALE_TIMEOUT', '600'))
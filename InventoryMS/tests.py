@@ -0,0 +1,88 @@
+import json
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from .middleware import SQLInjectionProtectionMiddleware
+
+
+class SQLInjectionProtectionMiddlewareTests(SimpleTestCase):
+    """
+    The pre-filter blocks the classic payloads wherever they appear and
+    lets ordinary product and customer data through.
+    """
+    PAYLOADS = [
+        "' OR 1=1",
+        "x' AND 'a'='a",
+        "1 UNION SELECT password FROM auth_user",
+        "x'; DROP TABLE store_item",
+        "admin'--",
+        "1 /* comment */",
+        "1 #",
+        "1; INSERT INTO auth_user VALUES (1)",
+        "UPDATE auth_user SET is_superuser=1",
+        "1; DELETE FROM store_item",
+        "1 AND SLEEP(5)",
+        "BENCHMARK(1000000,MD5(1))",
+    ]
+    CLEAN = [
+        "Paper for printers and copiers",
+        "Red or blue marker",
+        "Update your order",
+        "Salt and pepper (set of 2)",
+        "email@example.com",
+        "100% cotton",
+    ]
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = SQLInjectionProtectionMiddleware(lambda request: HttpResponse("ok"))
+
+    def assertBlocked(self, request):
+        self.assertEqual(self.middleware(request).status_code, 403)
+
+    def assertAllowed(self, request):
+        self.assertEqual(self.middleware(request).status_code, 200)
+
+    def _json(self, data):
+        return self.factory.post("/api/", json.dumps(data), content_type="application/json")
+
+    def test_payloads_are_blocked_everywhere(self):
+        for payload in self.PAYLOADS:
+            with self.subTest(payload=payload):
+                self.assertBlocked(self.factory.get("/", {"q": payload}))
+                self.assertBlocked(self.factory.post("/", {"name": payload}))
+                self.assertBlocked(self._json({"name": payload}))
+
+    def test_payloads_padded_past_the_old_limits(self):
+        # Gaps longer than the old 100 character quantifiers
+        self.assertBlocked(self.factory.get("/", {"q": "x OR " + "a" * 500 + "=1"}))
+        self.assertBlocked(self.factory.get("/", {"q": "UPDATE " + "t" * 500 + " SET a"}))
+        self.assertBlocked(self.factory.get("/", {"q": "/*" + " " * 5000 + "*/"}))
+        # Bodies and values longer than the old 64 KiB scan cap
+        padding = "a" * 100_000
+        self.assertBlocked(self._json({"filler": padding, "name": "' OR 1=1"}))
+        self.assertBlocked(self.factory.post("/", {"name": padding + " UNION SELECT 1"}))
+
+    def test_payloads_split_across_lines(self):
+        for payload in ["1 OR\n1=1", "1 OR\t\n 1=1", "x AND\r\n'a'='a", "UPDATE auth_user\nSET x", "1;\nDROP TABLE t"]:
+            with self.subTest(payload=payload):
+                self.assertBlocked(self.factory.get("/", {"q": payload}))
+                self.assertBlocked(self._json({"note": payload}))
+
+    def test_gap_does_not_span_lines(self):
+        # Like the original '.+?', the text between OR and '=' stays on one line
+        self.assertAllowed(self.factory.post("/", "color or size\nsize=2", content_type="text/plain"))
+
+    def test_clean_json_body(self):
+        items = [
+            {"name": name, "description": " ".join(self.CLEAN), "price": 12.5, "quantity": 3}
+            for name in self.CLEAN * 500
+        ]
+        self.assertAllowed(self._json({"customer": 1, "items": items}))
+
+    def test_clean_form_body(self):
+        for value in self.CLEAN:
+            with self.subTest(value=value):
+                self.assertAllowed(self.factory.post("/", {"name": value, "note": value}))
+                self.assertAllowed(self.factory.get("/", {"search": value}))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Profile, Vendor
+from .models import Profile, UserSession, Vendor
 
 
 @admin.register(Profile)
@@ -8,6 +8,13 @@ class ProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'telephone', 'email', 'role', 'status')
 
 
+@admin.register(UserSession)
+class UserSessionAdmin(admin.ModelAdmin):
+    """Admin interface for the UserSession model."""
+    list_display = ('user', 'session_key', 'created_at')
+    search_fields = ('user__username',)
+
+
 @admin.register(Vendor)
 class VendorAdmin(admin.ModelAdmin):
     """Admin interface for the Vendor model."""
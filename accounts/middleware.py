@@ -1,11 +1,17 @@
-from django.contrib.sessions.models import Session
 from django.conf import settings
 from django.contrib.auth import logout
-from django.utils import timezone
+
+from .models import UserSession
 
 class ConcurrentSessionMiddleware:
     """
     Middleware to prevent multiple concurrent sessions for the same user.
+
+    Older sessions are revoked when the user logs in (see
+    ``accounts.signals.register_user_session``); here we only check the
+    current session against the user's registered one. A mismatch only
+    means a newer login while the registered session still exists;
+    otherwise the key was rotated and the mapping follows it.
     """
     def __init__(self, get_response):
         self.get_response = get_response
@@ -13,15 +19,27 @@ class ConcurrentSessionMiddleware:
     def __call__(self, request):
         if request.user.is_authenticated:
             current_session_key = request.session.session_key
-            
-            # Find all active sessions for this user
-            sessions = Session.objects.filter(expire_date__gte=timezone.now())
-            
-            for session in sessions:
-                data = session.get_decoded()
-                if str(data.get('_auth_user_id')) == str(request.user.id):
-                    if session.session_key != current_session_key:
-                        session.delete()
+            active_session_key = (
+                UserSession.objects.filter(user_id=request.user.pk)
+                .values_list('session_key', flat=True)
+                .first()
+            )
+
+            if active_session_key is None:
+                # Session predates the index: adopt it as the active one
+                UserSession.objects.update_or_create(
+                    user_id=request.user.pk, defaults={'session_key': current_session_key}
+                )
+            elif active_session_key != current_session_key:
+                if request.session.exists(active_session_key):
+                    # Superseded by a newer login
+                    logout(request)
+                else:
+                    # The key was rotated (e.g. cycle_key() on password
+                    # change) and the old session is gone: follow it
+                    UserSession.objects.filter(user_id=request.user.pk).update(
+                        session_key=current_session_key
+                    )
         
         response = self.get_response(request)
         return response
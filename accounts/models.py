@@ -90,6 +90,36 @@ class Profile(models.Model):
         verbose_name_plural = 'Profiles'
 
 
+class UserSession(models.Model):
+    """
+    Maps a user to their single active session, so the concurrent-session
+    check is one indexed lookup instead of decoding every stored session.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='active_session',
+        verbose_name='User'
+    )
+    session_key = models.CharField(
+        max_length=40, db_index=True, verbose_name='Session Key'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Created At'
+    )
+
+    def __str__(self):
+        """
+        Returns a string representation of the user session.
+        """
+        return f"{self.user.username} Session"
+
+    class Meta:
+        """Meta options for the UserSession model."""
+        verbose_name = 'User Session'
+        verbose_name_plural = 'User Sessions'
+
+
 class Vendor(models.Model):
     """
     Represents a vendor with contact and address information.
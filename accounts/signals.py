@@ -2,7 +2,9 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from django.contrib.auth.models import User
-from .models import Profile
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.contrib.sessions.models import Session
+from .models import Profile, UserSession
 
 
 @receiver(post_save, sender=User)
@@ -16,3 +18,34 @@ def handle_user_profile(sender, instance, created, **kwargs):
     else:
         instance.profile.save()
         print('Profile updated!')
+
+
+@receiver(user_logged_in)
+def register_user_session(sender, request, user, **kwargs):
+    """
+    Signal handler to revoke the user's previous session and record
+    the new one when the user logs in.
+    """
+    session_key = request.session.session_key
+    if not session_key:
+        return
+
+    previous = UserSession.objects.filter(user=user).first()
+    if previous and previous.session_key != session_key:
+        Session.objects.filter(session_key=previous.session_key).delete()
+
+    UserSession.objects.update_or_create(
+        user=user, defaults={'session_key': session_key}
+    )
+
+
+@receiver(user_logged_out)
+def unregister_user_session(sender, request, user, **kwargs):
+    """
+    Signal handler to drop the session mapping when the user logs out.
+    """
+    if user is None or request is None:
+        return
+    UserSession.objects.filter(
+        user=user, session_key=request.session.session_key
+    ).delete()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Benchmark SQLInjectionProtectionMiddleware on large request bodies.
+
+Times the middleware over clean JSON bodies of product-like data and
+over adversarial bodies built from trigger words, and compares the clean
+ones with the original 13 unbounded regexes where those still finish.
+
+    python bin/bench_sqli_middleware.py [--repeat N]
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(DEBUG=False, ALLOWED_HOSTS=['*'], DATA_UPLOAD_MAX_MEMORY_SIZE=None)
+django.setup()
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from InventoryMS.middleware import SQLInjectionProtectionMiddleware
+
+# The patterns the middleware ran before the trigger pre-filter
+ORIGINAL_PATTERNS = [
+    re.compile(pattern) for pattern in [
+        r"(?i)UNION\s+SELECT", r"(?i)OR\s+.+?=.+", r"(?i)AND\s+.+?=.+", r"--",
+        r"/\*.*?\*/", r"#", r";", r"(?i)DROP\s+TABLE", r"(?i)INSERT\s+INTO",
+        r"(?i)UPDATE\s+.+?\s+SET", r"(?i)DELETE\s+FROM", r"(?i)SLEEP\(", r"(?i)BENCHMARK\(",
+    ]
+]
+
+
+def clean_json(size):
+    item = {
+        "name": "Paper for and or printer " * 5,
+        "description": "and or for printing, copying and scanning " * 10,
+        "price": 12.5,
+        "quantity": 3,
+    }
+    row = len(json.dumps(item)) + 2
+    return json.dumps({"customer": 1, "items": [item] * max(1, size // row)})
+
+
+BODIES = [
+    ("clean JSON 30 KB", lambda: clean_json(30_000), True),
+    ("clean JSON 1 MB", lambda: clean_json(1_000_000), False),
+    ("'or ' x 500k", lambda: "or " * 500_000, False),
+    ("'or\\n' x 500k", lambda: "or\n" * 500_000, False),
+    ("'or = \\n' x 200k", lambda: "or = \n" * 200_000, False),
+    ("'update \\n' x 300k", lambda: "update \n" * 300_000, False),
+    ("1 MB padding + ' OR 1=1'", lambda: json.dumps({"filler": "a" * 1_000_000, "q": "' OR 1=1"}), False),
+]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger('security.sqli').disabled = True
+    factory = RequestFactory()
+    middleware = SQLInjectionProtectionMiddleware(lambda request: HttpResponse("ok"))
+
+    print(f"{'body':<28} {'size':>10} {'status':>7} {'middleware':>12} {'original':>12}")
+    for label, build, compare in BODIES:
+        body = build()
+
+        def run():
+            request = factory.post('/', body, content_type='application/json')
+            return middleware(request).status_code
+
+        elapsed, status = best_of(args.repeat, run)
+        original = ''
+        if compare:
+            original_elapsed, _ = best_of(
+                args.repeat, lambda: any(pattern.search(body) for pattern in ORIGINAL_PATTERNS)
+            )
+            original = f"{original_elapsed * 1000:.1f} ms"
+        print(f"{label:<28} {len(body):>10} {status:>7} {elapsed * 1000:>9.1f} ms {original:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,7 @@ python manage.py collectstatic --noinput || echo "⚠ collectstatic not availabl
 # Apply database migrations
 echo "Apply database migrations"
 python manage.py migrate
+python manage.py createcachetable
 
 # Start server based on environment
 echo "Starting server..."
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import Application, ApplicationConfiguration, Conversation, Message, Template, UserPreferences
+from .models import AgentMetric, Application, ApplicationConfiguration, Conversation, Message, MessageArchive, OutboundMessage, Template, UserPreferences, WebhookEvent
 
 
 class MessageInline(admin.TabularInline):
@@ -16,7 +16,7 @@ class ConversationAdmin(admin.ModelAdmin):
     list_filter = ('application', 'updated_at')
     search_fields = ('session_id', 'user_identifier')
     inlines = [MessageInline]
-    readonly_fields = ('started_at', 'updated_at')
+    readonly_fields = ('started_at', 'updated_at', 'summary', 'summary_until')
 
 
 class ApplicationConfigurationAdmin(admin.ModelAdmin):
@@ -129,9 +129,62 @@ class UserPreferencesAdmin(admin.ModelAdmin):
     ]
 
 
+class WebhookEventAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the WebhookEvent queue.
+    """
+    list_display = ('id', 'application', 'event', 'status', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('status', 'event', 'application')
+    readonly_fields = ('created_at', 'started_at', 'processed_at')
+
+
+class OutboundMessageAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the outbound message outbox.
+    """
+    list_display = ('id', 'application', 'phone', 'kind', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind', 'application')
+    search_fields = ('phone', 'idempotency_key')
+    readonly_fields = ('created_at', 'started_at', 'sent_at', 'response')
+
+
+class MessageArchiveAdmin(admin.ModelAdmin):
+    """
+    Read-only index of archived message files.
+    """
+    list_display = ('month', 'message_count', 'size', 'first_message_at', 'last_message_at', 'path', 'created_at')
+    date_hierarchy = 'month'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class AgentMetricAdmin(admin.ModelAdmin):
+    """
+    Read-only view of agent latency and token usage.
+    """
+    list_display = ('created_at', 'kind', 'name', 'session_id', 'duration_ms', 'prompt_tokens', 'completion_tokens', 'llm_calls', 'tool_calls')
+    list_filter = ('kind', 'name', 'created_at')
+    search_fields = ('session_id', 'name', 'run_id')
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(ApplicationConfiguration, ApplicationConfigurationAdmin)
 admin.site.register(Application, ApplicationAdmin)
 admin.site.register(Conversation, ConversationAdmin)
 admin.site.register(Message)
 admin.site.register(Template)
 admin.site.register(UserPreferences, UserPreferencesAdmin)
+admin.site.register(WebhookEvent, WebhookEventAdmin)
+admin.site.register(OutboundMessage, OutboundMessageAdmin)
+admin.site.register(MessageArchive, MessageArchiveAdmin)
+admin.site.register(AgentMetric, AgentMetricAdmin)
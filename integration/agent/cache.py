@@ -0,0 +1,172 @@
+"""
+Response cache for read-only agent tools.
+
+``cached_tool`` memoizes a tool's text answer in the ``agent_tools``
+Django cache, keyed by tool name, normalized arguments, today's date and
+the current *generation* of every model the tool reads. Writes to those
+models (see ``integration.signals``) bump the model's generation once
+the transaction commits, so every dependent cache entry is bypassed
+without having to enumerate keys. ``AGENT_TOOL_CACHE_TIMEOUT`` bounds how
+long an entry can live even when no write is observed (e.g. queryset
+``update()`` calls, which send no signals).
+
+Generation counters are seeded from the clock rather than 0, so a counter
+that was culled or cleared restarts at a value no earlier generation
+used and cannot bring old answers back.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from ..utils.common import normalize_text
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'agent_tools'
+KEY_PREFIX = 'agent_tool'
+
+_stats_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def get_cache():
+    alias = CACHE_ALIAS if CACHE_ALIAS in settings.CACHES else 'default'
+    return caches[alias]
+
+
+def _generation_key(label):
+    return f"{KEY_PREFIX}:gen:{label}"
+
+
+def _new_generation(cache, key):
+    """
+    Start a missing counter at a value no earlier generation used.
+    """
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def bump_generation(label):
+    """
+    Invalidate every cached answer that depends on model ``label``
+    (``app_label.ModelName``) once the current transaction commits.
+    """
+    def bump():
+        cache = get_cache()
+        key = _generation_key(label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter missing (cleared or culled)
+            _new_generation(cache, key)
+
+    transaction.on_commit(bump)
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return normalize_text(value)
+    return value
+
+
+def cached_tool(*models, timeout=None):
+    """
+    Memoize a tool function's result until one of ``models`` changes.
+
+    Apply it beneath ``@tool`` so LangChain still sees the original
+    signature and docstring::
+
+        @tool
+        @cached_tool('transactions.Sale')
+        def get_monthly_sales(month: int = None, year: int = None) -> str:
+    """
+    labels = sorted(models)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = {k: _normalize(v) for k, v in bound.arguments.items()}
+
+                generations = cache.get_many([_generation_key(label) for label in labels])
+                for label in labels:
+                    gen_key = _generation_key(label)
+                    if gen_key not in generations:
+                        generations[gen_key] = _new_generation(cache, gen_key)
+                raw_key = json.dumps(
+                    [
+                        name,
+                        arguments,
+                        str(timezone.localdate()),
+                        [generations[_generation_key(label)] for label in labels],
+                    ],
+                    sort_keys=True,
+                    default=str,
+                )
+                key = f"{KEY_PREFIX}:{name}:{hashlib.sha1(raw_key.encode()).hexdigest()}"
+                result = cache.get(key)
+            except Exception as e:
+                # A cache outage must not break the agent
+                logger.warning(f"Agent tool cache unavailable for {name}: {e}")
+                return func(*args, **kwargs)
+
+            if result is not None:
+                _record(name, hit=True)
+                return result
+
+            _record(name, hit=False)
+            result = func(*args, **kwargs)
+            try:
+                cache.set(
+                    key, result,
+                    timeout=timeout or getattr(settings, 'AGENT_TOOL_CACHE_TIMEOUT', 300)
+                )
+            except Exception as e:
+                logger.warning(f"Could not cache result of {name}: {e}")
+            return result
+
+        wrapper.cache_models = labels
+        return wrapper
+
+    return decorator
+
+
+def _record(name, hit):
+    with _stats_lock:
+        (_hits if hit else _misses)[name] += 1
+
+
+def cache_stats():
+    """
+    Return hit/miss counters of this process, overall and per tool.
+    """
+    with _stats_lock:
+        hits = sum(_hits.values())
+        misses = sum(_misses.values())
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+            'by_tool': {
+                name: {'hits': _hits[name], 'misses': _misses[name]}
+                for name in sorted(set(_hits) | set(_misses))
+            },
+        }
@@ -0,0 +1,255 @@
+"""
+Process-local product catalogue snapshot for the agent tools.
+
+Tools resolve free-text product names ("قلم", "blue pen") several times
+per conversation turn. Instead of a LIKE query per lookup they match
+against an in-memory snapshot of every item's id, normalized name,
+price, quantity and category.
+
+The snapshot is column-oriented: ids, prices, quantities and category
+indexes live in compact ``array`` buffers, names in parallel lists. It is
+refreshed at most every ``CATALOGUE_REFRESH_INTERVAL`` seconds by
+loading only items whose ``Item.updated_at`` moved past the last
+watermark; deletions (row count mismatch) and a periodic full reload
+rebuild it from scratch. Prices and quantities are therefore a little
+stale by design: stock is still checked by ``store.stock`` when a sale
+is written.
+"""
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+
+from ..utils.common import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Re-read this much history on every refresh so rows committed slightly
+# out of timestamp order by concurrent transactions are not missed
+WATERMARK_OVERLAP = timedelta(seconds=30)
+# Rebuild from scratch this often to pick up category renames
+FULL_RELOAD_INTERVAL = 300
+# Stop collecting matches for very common words after this many
+MAX_CANDIDATES = 1000
+
+CatalogueEntry = namedtuple(
+    'CatalogueEntry', ['id', 'name', 'price', 'quantity', 'category']
+)
+
+
+class CatalogueSnapshot:
+    """
+    Versioned, array-backed copy of the Item table.
+    """
+
+    def __init__(self, refresh_interval=None):
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None
+            else getattr(settings, 'CATALOGUE_REFRESH_INTERVAL', 5)
+        )
+        self.version = 0
+        self._lock = threading.RLock()
+        self._checked_at = None
+        self._loaded_at = None
+        self._watermark = None
+        self._reset()
+
+    def _reset(self):
+        self._ids = array('q')
+        self._prices = array('d')
+        self._quantities = array('q')
+        self._category_ids = array('l')
+        self._names = []
+        self._normalized = []
+        self._positions = {}
+        self._exact = {}
+        self._categories = []
+        self._category_positions = {}
+        self._blob = None
+        self._offsets = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    # Loading
+
+    def refresh(self, force=False):
+        """
+        Bring the snapshot up to date if the refresh interval has passed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+            try:
+                if force or self._loaded_at is None or now - self._loaded_at > FULL_RELOAD_INTERVAL:
+                    self._full_reload()
+                else:
+                    self._incremental_reload()
+            except Exception:
+                # Tools fall back to the database; rebuild fully next time
+                self._loaded_at = None
+                logger.exception("Catalogue snapshot refresh failed")
+
+    def _rows(self, queryset):
+        return queryset.values_list(
+            'id', 'name', 'price', 'quantity', 'category__name', 'updated_at'
+        ).order_by('id').iterator(chunk_size=5000)
+
+    def _full_reload(self):
+        from store.models import Item
+
+        self._reset()
+        self._watermark = None
+        for row in self._rows(Item.objects.all()):
+            self._upsert(*row)
+        self._loaded_at = time.monotonic()
+        self.version += 1
+        logger.info(f"Catalogue snapshot v{self.version} loaded with {len(self)} items")
+
+    def _incremental_reload(self):
+        from store.models import Item
+
+        changed = 0
+        if self._watermark is not None:
+            since = self._watermark - WATERMARK_OVERLAP
+            for row in self._rows(Item.objects.filter(updated_at__gte=since)):
+                changed += self._upsert(*row)
+
+        if Item.objects.count() != len(self):
+            # Items were deleted (or the watermark missed a write)
+            self._full_reload()
+        elif changed:
+            self.version += 1
+
+    def _upsert(self, item_id, name, price, quantity, category, updated_at):
+        """
+        Insert or update one item; returns 1 if anything changed.
+        """
+        if self._watermark is None or updated_at > self._watermark:
+            self._watermark = updated_at
+
+        category_id = self._category_positions.get(category)
+        if category_id is None:
+            category_id = len(self._categories)
+            self._categories.append(category)
+            self._category_positions[category] = category_id
+
+        normalized = normalize_text(name)
+        price = float(price or 0)
+        position = self._positions.get(item_id)
+
+        if position is None:
+            position = len(self._ids)
+            self._positions[item_id] = position
+            self._ids.append(item_id)
+            self._prices.append(price)
+            self._quantities.append(quantity)
+            self._category_ids.append(category_id)
+            self._names.append(name)
+            self._normalized.append(normalized)
+            self._exact.setdefault(normalized, position)
+            self._blob = None
+            return 1
+
+        if (
+            self._names[position] == name
+            and self._prices[position] == price
+            and self._quantities[position] == quantity
+            and self._category_ids[position] == category_id
+        ):
+            return 0
+
+        if self._normalized[position] != normalized:
+            old = self._normalized[position]
+            if self._exact.get(old) == position:
+                del self._exact[old]
+            self._exact.setdefault(normalized, position)
+            self._blob = None
+        self._prices[position] = price
+        self._quantities[position] = quantity
+        self._category_ids[position] = category_id
+        self._names[position] = name
+        self._normalized[position] = normalized
+        return 1
+
+    # Queries
+
+    def _entry(self, position):
+        return CatalogueEntry(
+            id=self._ids[position],
+            name=self._names[position],
+            price=self._prices[position],
+            quantity=self._quantities[position],
+            category=self._categories[self._category_ids[position]],
+        )
+
+    def search(self, term, limit=10):
+        """
+        Return up to ``limit`` entries whose name contains every word of
+        ``term``: exact name first, then prefix matches, then shortest names.
+        """
+        self.refresh()
+        needle = normalize_text(term)
+        words = needle.split()
+        if not words:
+            return []
+
+        # Scan the joined name buffer for the rarest word with str.find,
+        # then check the remaining words on each hit
+        with self._lock:
+            if self._blob is None:
+                self._build_blob()
+            blob, offsets = self._blob, self._offsets
+            key = min(words, key=blob.count) if len(words) > 1 else words[0]
+            exact = self._exact.get(needle)
+            matches = []
+            start = blob.find(key)
+            while start != -1 and len(matches) < MAX_CANDIDATES:
+                position = bisect_right(offsets, start) - 1
+                name = self._normalized[position]
+                if all(word in name for word in words):
+                    rank = (
+                        0 if position == exact else 1 if name.startswith(needle) else 2,
+                        len(name),
+                    )
+                    matches.append((rank, position))
+                start = blob.find(key, offsets[position + 1])
+            matches.sort()
+            return [self._entry(position) for _, position in matches[:limit]]
+
+    def _build_blob(self):
+        """
+        Join all normalized names into one newline-separated string with
+        the start offset of each name, for fast substring scanning.
+        """
+        offsets = array('q')
+        total = 0
+        for name in self._normalized:
+            offsets.append(total)
+            total += len(name) + 1
+        offsets.append(total)
+        self._blob = '\n'.join(self._normalized) + '\n'
+        self._offsets = offsets
+
+    def resolve(self, term):
+        """
+        Return the best matching entry for a product name, or None.
+        """
+        self.refresh()
+        needle = normalize_text(term)
+        with self._lock:
+            position = self._exact.get(needle)
+            if position is not None:
+                return self._entry(position)
+        matches = self.search(term, limit=1)
+        return matches[0] if matches else None
+
+
+catalogue = CatalogueSnapshot()
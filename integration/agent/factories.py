@@ -1,13 +1,19 @@
+import asyncio
 import logging
 import random
 import re
+import weakref
 from abc import ABC, abstractmethod
 from typing import Optional, Union, List, Callable
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 # Import separated prompts
 from . import prompts
+from .router import IntentRouter
+from .toolsets import ToolSelector
 
 logger = logging.getLogger(__name__)
 
@@ -34,16 +40,38 @@ class WPPConnectClient(WPPConnectClientInterface):
 # AI Agent Interface
 class AIAgentInterface(ABC):
     @abstractmethod
-    def process_message(self, message: str) -> str:
+    def process_message(self, message: str, session_id: Optional[str] = None) -> str:
         pass
 
+    async def aprocess_message(self, message: str, session_id: Optional[str] = None) -> str:
+        return await sync_to_async(self.process_message)(message, session_id=session_id)
+
+
+# One limiter per event loop: asyncio primitives cannot be shared across loops
+_llm_semaphores = weakref.WeakKeyDictionary()
+
+
+def llm_call_slot() -> asyncio.Semaphore:
+    """
+    Return the semaphore bounding concurrent LLM calls on the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(getattr(settings, 'AGENT_MAX_CONCURRENT_LLM_CALLS', 200))
+        _llm_semaphores[loop] = semaphore
+    return semaphore
+
 class AccountingAgent(AIAgentInterface):
     def __init__(self, llm, tools, system_prompt):
         self.llm = llm
         self.tools = tools
         self.system_prompt = system_prompt
         self._agent = None
+        self._agents = {}
         self._compile_patterns()
+        self.router = IntentRouter(tools)
+        self.tool_selector = ToolSelector(tools)
         
     def _compile_patterns(self):
         """Pre-compile regex patterns for performance."""
@@ -80,6 +108,17 @@ class AccountingAgent(AIAgentInterface):
             from langgraph.prebuilt import create_react_agent
             self._agent = create_react_agent(model=self.llm, tools=self.tools)
         return self._agent
+
+    def agent_for(self, tools) -> object:
+        """Return the (cached) agent graph offering only ``tools``."""
+        if len(tools) == len(self.tools):
+            return self.agent
+        key = tuple(tool.name for tool in tools)
+        agent = self._agents.get(key)
+        if agent is None:
+            from langgraph.prebuilt import create_react_agent
+            agent = self._agents[key] = create_react_agent(model=self.llm, tools=tools)
+        return agent
     
     def _handle_conversational(self, message: str) -> Optional[str]:
         """Check message against pre-compiled conversational patterns."""
@@ -93,38 +132,126 @@ class AccountingAgent(AIAgentInterface):
                 return response_source # String (like help message)
         return None
     
-    def process_message(self, message: str) -> str:
-        # Check conversational first (Pre-processing)
-        conv_response = self._handle_conversational(message)
-        if conv_response:
-            return conv_response
-        
-        # Process with AI (LLM)
+    def process_message(self, message: str, session_id: Optional[str] = None, conversation=None) -> str:
+        from .instrumentation import AgentMetricsHandler
+
+        metrics = AgentMetricsHandler(session_id)
         try:
-            from langchain_core.messages import HumanMessage, SystemMessage
-            logger.info(f"📨 Processing financial query: {message}")
-            
-            response = self.agent.invoke({
-                "messages": [
-                    SystemMessage(content=self.system_prompt),
-                    HumanMessage(content=message)
-                ]
-            })
+            # Check conversational first, then common questions with a direct tool call
+            direct_response = self._answer_directly(message, metrics)
+            if direct_response:
+                return direct_response
             
-            msgs = response.get("messages", [])
-            if msgs:
-                result = self._extract_content(msgs[-1].content)
-                if not result or result.strip() == "":
-                    return "🤔 لم أفهم طلبك\n\nاكتب 'مساعدة' لمعرفة الأوامر المتاحة"
-                return result
-            
-            return _("⚠️ لم أجد نتائج")
-            
-        except Exception as e:
-            logger.error(f"❌ Agent Error: {e}")
-            if "429" in str(e):
-                return "⏳ الخدمة مشغولة حالياً\n\nحاول مرة أخرى بعد 30 ثانية"
-            return _("⚠️ حدث خطأ\n\nحاول مرة أخرى أو اكتب 'مساعدة'")
+            # Process with AI (LLM)
+            metrics.route = 'llm'
+            try:
+                logger.info(f"📨 Processing financial query: {message}")
+                
+                messages, tools = self._prepare(message, session_id, conversation)
+                response = self.agent_for(tools).invoke(
+                    {"messages": messages}, config={"callbacks": [metrics]}
+                )
+                return self._response_text(response)
+                
+            except Exception as e:
+                metrics.error = str(e)
+                return self._error_text(e)
+        finally:
+            metrics.save()
+
+    async def aprocess_message(self, message: str, session_id: Optional[str] = None, conversation=None) -> str:
+        """
+        Async variant of ``process_message`` for ASGI callers.
+
+        The LLM round trip is awaited with ``ainvoke`` instead of blocking a
+        thread, and at most ``AGENT_MAX_CONCURRENT_LLM_CALLS`` calls run at
+        once per event loop; the rest wait for a free slot.
+        """
+        from .instrumentation import AgentMetricsHandler
+
+        metrics = AgentMetricsHandler(session_id)
+        try:
+            direct_response = await sync_to_async(self._answer_directly)(message, metrics)
+            if direct_response:
+                return direct_response
+
+            metrics.route = 'llm'
+            try:
+                logger.info(f"📨 Processing financial query: {message}")
+
+                messages, tools = await sync_to_async(self._prepare)(message, session_id, conversation)
+                async with llm_call_slot():
+                    response = await self.agent_for(tools).ainvoke(
+                        {"messages": messages}, config={"callbacks": [metrics]}
+                    )
+                return self._response_text(response)
+
+            except Exception as e:
+                metrics.error = str(e)
+                return self._error_text(e)
+        finally:
+            await sync_to_async(metrics.save)()
+
+    def _answer_directly(self, message: str, metrics) -> Optional[str]:
+        """Answer without the LLM when possible, noting the route taken."""
+        response = self._handle_conversational(message)
+        if response:
+            metrics.route = 'conversational'
+            return response
+        response = self.router.route(message, callbacks=[metrics])
+        if response:
+            metrics.route = 'router'
+        return response
+
+    def _response_text(self, response) -> str:
+        msgs = response.get("messages", [])
+        if msgs:
+            result = self._extract_content(msgs[-1].content)
+            if not result or result.strip() == "":
+                return "🤔 لم أفهم طلبك\n\nاكتب 'مساعدة' لمعرفة الأوامر المتاحة"
+            return result
+        
+        return _("⚠️ لم أجد نتائج")
+
+    def _error_text(self, error: Exception) -> str:
+        logger.error(f"❌ Agent Error: {error}")
+        if "429" in str(error):
+            return "⏳ الخدمة مشغولة حالياً\n\nحاول مرة أخرى بعد 30 ثانية"
+        return _("⚠️ حدث خطأ\n\nحاول مرة أخرى أو اكتب 'مساعدة'")
+
+    def _prepare(self, message: str, session_id: Optional[str] = None, conversation=None):
+        """
+        Build the LLM input and pick the tools to offer.
+
+        The system prompt always comes first and never changes, so providers
+        can cache it; per-session memory follows and the per-request context
+        (phone number, date) is appended last, right before the message.
+        """
+        from langchain_core.messages import HumanMessage, SystemMessage
+        from .memory import load_memory
+
+        messages = [SystemMessage(content=self.system_prompt)]
+        previous = None
+        context = [f"Today is {timezone.localdate().isoformat()}."]
+        if session_id or conversation is not None:
+            try:
+                memory = load_memory(session_id, current_message=message, conversation=conversation)
+            except Exception as e:
+                logger.warning(f"Could not load memory for {session_id}: {e}")
+                memory = None
+            if memory is not None:
+                messages.extend(memory.to_messages())
+                previous = next(
+                    (content for direction, content in reversed(memory.window) if direction == 'incoming'),
+                    None
+                )
+                context.append(f"The user's phone number is {memory.session_id}.")
+        messages.append(SystemMessage(content=' '.join(context)))
+        messages.append(HumanMessage(content=message))
+
+        tools = self.tool_selector.select(message, previous)
+        logger.debug(f"Offering {len(tools)}/{len(self.tools)} tools")
+        return messages, tools
 
     def _extract_content(self, content: Union[str, list]) -> str:
         """Safely extract text content from LangChain response."""
@@ -146,35 +273,37 @@ class AIAgentFactory:
     @classmethod
     def create(cls):
         if cls._instance is None:
-            # Import tools dynamically to avoid heavy imports at module level if unused
-            from .tools import (
-                get_today_sales, get_monthly_sales, get_yearly_sales,
-                get_top_selling_products, get_low_stock_products, 
-                get_best_customers, get_financial_summary,
-                get_customer_invoices, search_item, get_categories,
-                get_vendors, get_unpaid_bills, get_all_customers,
-                create_customer, search_customer, get_customer_details,
-                get_user_preferences, set_display_format, set_items_per_page,
-                manage_purchase_order, manage_sale, finalize_sale
-            )
-            
-            tools = [
-                get_today_sales, get_monthly_sales, get_yearly_sales,
-                get_top_selling_products, get_low_stock_products, 
-                get_best_customers, get_financial_summary,
-                get_customer_invoices, search_item, get_categories,
-                get_vendors, get_unpaid_bills, get_all_customers,
-                create_customer, search_customer, get_customer_details,
-                get_user_preferences, set_display_format, set_items_per_page,
-                manage_purchase_order, manage_sale, finalize_sale
-            ]
-            
             llm = cls._create_llm()
             # Pass the extracted system prompt
-            cls._instance = AccountingAgent(llm, tools, prompts.SYSTEM_PROMPT)
+            cls._instance = AccountingAgent(llm, cls.create_tools(), prompts.SYSTEM_PROMPT)
             logger.info("✅ Accounting Agent instance created.")
         
         return cls._instance
+
+    @classmethod
+    def create_tools(cls):
+        # Import tools dynamically to avoid heavy imports at module level if unused
+        from .tools import (
+            get_today_sales, get_monthly_sales, get_yearly_sales,
+            get_top_selling_products, get_low_stock_products, 
+            get_best_customers, get_financial_summary,
+            get_customer_invoices, search_item, get_categories,
+            get_vendors, get_unpaid_bills, get_all_customers,
+            create_customer, search_customer, get_customer_details,
+            get_user_preferences, set_display_format, set_items_per_page,
+            manage_purchase_order, manage_sale, finalize_sale
+        )
+        
+        return [
+            get_today_sales, get_monthly_sales, get_yearly_sales,
+            get_top_selling_products, get_low_stock_products, 
+            get_best_customers, get_financial_summary,
+            get_customer_invoices, search_item, get_categories,
+            get_vendors, get_unpaid_bills, get_all_customers,
+            create_customer, search_customer, get_customer_details,
+            get_user_preferences, set_display_format, set_items_per_page,
+            manage_purchase_order, manage_sale, finalize_sale
+        ]
     
     @classmethod
     def _create_llm(cls):
@@ -0,0 +1,145 @@
+"""
+Latency and token accounting for the accounting agent.
+
+``AgentMetricsHandler`` is a LangChain callback handler created for every
+``process_message`` call and passed to the LangGraph agent (and to tools
+called directly by the router). It times each LLM and tool call, reads
+token usage from the LLM responses and, when the message is answered,
+writes one ``AgentMetric`` row per step plus a ``message`` row with the
+totals, in a single bulk insert. Set ``AGENT_METRICS_ENABLED = False`` to
+keep the timings in memory only.
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+# Longest error text stored per step
+MAX_ERROR_LENGTH = 1000
+
+
+def _usage(response):
+    """Return ``(prompt_tokens, completion_tokens)`` of an LLMResult."""
+    prompt = completion = 0
+    for generations in response.generations or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None)
+            if usage:
+                prompt += usage.get('input_tokens', 0)
+                completion += usage.get('output_tokens', 0)
+    if not prompt and not completion:
+        usage = (response.llm_output or {}).get('token_usage') or {}
+        prompt = usage.get('prompt_tokens', 0)
+        completion = usage.get('completion_tokens', 0)
+    return prompt or 0, completion or 0
+
+
+class AgentMetricsHandler(BaseCallbackHandler):
+    """
+    Collect timings of one agent message and save them as AgentMetric rows.
+    """
+
+    # Timing only: safe to call on the event loop without a thread hop
+    run_inline = True
+
+    def __init__(self, session_id=''):
+        self.run_id = uuid.uuid4()
+        self.session_id = session_id or ''
+        self.route = ''
+        self.error = ''
+        self.steps = []
+        self._started_at = time.perf_counter()
+        self._pending = {}
+
+    # LLM calls
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, 'llm', self._model_name(serialized, kwargs))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, 'llm', self._model_name(serialized, kwargs))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt_tokens, completion_tokens = _usage(response)
+        self._end(run_id, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    # Tool calls
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get('name') or kwargs.get('name') or 'tool'
+        self._start(run_id, 'tool', name)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+    # Bookkeeping
+
+    def _model_name(self, serialized, kwargs):
+        params = kwargs.get('invocation_params') or {}
+        return (
+            params.get('model') or params.get('model_name')
+            or (serialized or {}).get('name') or 'llm'
+        )
+
+    def _start(self, run_id, kind, name):
+        self._pending[run_id] = (kind, name, time.perf_counter())
+
+    def _end(self, run_id, error=None, prompt_tokens=0, completion_tokens=0):
+        started = self._pending.pop(run_id, None)
+        if started is None:
+            return
+        kind, name, started_at = started
+        self.steps.append({
+            'kind': kind,
+            'name': name[:100],
+            'duration_ms': int((time.perf_counter() - started_at) * 1000),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'error': str(error)[:MAX_ERROR_LENGTH] if error else '',
+        })
+
+    def summary(self):
+        """Totals of the message so far."""
+        return {
+            'kind': 'message',
+            'name': self.route or 'unknown',
+            'duration_ms': int((time.perf_counter() - self._started_at) * 1000),
+            'prompt_tokens': sum(step['prompt_tokens'] for step in self.steps),
+            'completion_tokens': sum(step['completion_tokens'] for step in self.steps),
+            'llm_calls': sum(1 for step in self.steps if step['kind'] == 'llm'),
+            'tool_calls': sum(1 for step in self.steps if step['kind'] == 'tool'),
+            'error': self.error[:MAX_ERROR_LENGTH],
+        }
+
+    def save(self):
+        """
+        Write the message totals and every step; never raises.
+        """
+        summary = self.summary()
+        logger.info(
+            f"⏱️ Agent message via {summary['name']}: {summary['duration_ms']} ms, "
+            f"{summary['llm_calls']} LLM / {summary['tool_calls']} tool calls, "
+            f"{summary['prompt_tokens']}+{summary['completion_tokens']} tokens"
+        )
+        if not getattr(settings, 'AGENT_METRICS_ENABLED', True):
+            return
+
+        from ..models import AgentMetric
+
+        try:
+            AgentMetric.objects.bulk_create([
+                AgentMetric(run_id=self.run_id, session_id=self.session_id, **values)
+                for values in [summary, *self.steps]
+            ])
+        except Exception as e:
+            logger.warning(f"Could not save agent metrics: {e}")
@@ -0,0 +1,157 @@
+"""
+Bounded per-session memory for the accounting agent.
+
+Each WhatsApp session (``Conversation.session_id``) keeps its recent
+``Message`` rows as a rolling window that is replayed to the LLM, newest
+turns first, until ``AGENT_MEMORY_TOKEN_BUDGET`` is spent. Turns that fall
+out of the window are folded into ``Conversation.summary``, a compact
+"who said what" digest capped at ``AGENT_MEMORY_SUMMARY_TOKENS``; the
+``Conversation.summary_until`` watermark records the newest message folded
+so far. Summaries are extractive (no extra LLM call), so loading memory
+costs two small queries and never adds a round trip.
+
+Token counts are estimated at ~4 characters per token, which is close
+enough for budgeting both Arabic and English text.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+# Longest excerpt of a single message kept in the summary
+SUMMARY_LINE_CHARS = 160
+ROLE_LABELS = {'incoming': 'User', 'outgoing': 'Assistant'}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of ``text`` for budgeting."""
+    return len(text or '') // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class SessionMemory:
+    """
+    What the agent remembers of a session: the compact summary of older
+    turns and the recent ``(direction, content)`` window, oldest first.
+    """
+    session_id: str
+    summary: str = ''
+    window: List[tuple] = field(default_factory=list)
+    tokens: int = 0
+
+    def to_messages(self):
+        """Return the memory as LangChain messages."""
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+        messages = []
+        if self.summary:
+            messages.append(SystemMessage(content=f"Earlier in this conversation:\n{self.summary}"))
+        for direction, content in self.window:
+            message_class = HumanMessage if direction == 'incoming' else AIMessage
+            messages.append(message_class(content=content))
+        return messages
+
+
+def _summary_line(direction, content):
+    text = ' '.join((content or '').split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 1] + '…'
+    return f"{ROLE_LABELS.get(direction, direction)}: {text}"
+
+
+def _trim_summary(lines, budget):
+    """Keep the newest summary lines that fit in ``budget`` tokens."""
+    kept = []
+    used = 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return '\n'.join(reversed(kept))
+
+
+def load_memory(session_id: str, current_message: str = None, conversation=None) -> Optional[SessionMemory]:
+    """
+    Build the memory of ``session_id`` (or of ``conversation`` when the
+    caller already has it) for the next LLM call.
+
+    ``current_message`` is the message being answered; when it is already
+    logged as the newest incoming Message it is left out of the window.
+    Messages pushed out of the window are folded into the stored summary.
+    """
+    from ..models import Conversation
+
+    if conversation is None:
+        if not session_id:
+            return None
+        conversation = (
+            Conversation.objects.filter(session_id=session_id)
+            .order_by('-updated_at')
+            .first()
+        )
+        if conversation is None:
+            return None
+
+    token_budget = getattr(settings, 'AGENT_MEMORY_TOKEN_BUDGET', 1500)
+    max_messages = getattr(settings, 'AGENT_MEMORY_MAX_MESSAGES', 20)
+    summary_budget = getattr(settings, 'AGENT_MEMORY_SUMMARY_TOKENS', 300)
+
+    recent = conversation.messages.order_by('-created_at', '-pk')
+    if conversation.summary_until:
+        recent = recent.filter(created_at__gt=conversation.summary_until)
+    # One extra row tells us whether anything older is left to fold
+    rows = list(recent.values_list('direction', 'content', 'created_at')[:max_messages + 2])
+
+    if (
+        rows and current_message is not None
+        and rows[0][0] == 'incoming' and rows[0][1].strip() == current_message.strip()
+    ):
+        rows = rows[1:]
+
+    summary = conversation.summary
+    used = estimate_tokens(summary) if summary else 0
+    window = []
+    for position, (direction, content, created_at) in enumerate(rows):
+        cost = estimate_tokens(content)
+        if position >= max_messages or used + cost > token_budget:
+            break
+        window.append((direction, content))
+        used += cost
+
+    overflow = rows[len(window):]
+    if overflow:
+        # Fold every unsummarized message older than the window
+        newest_folded = overflow[0][2]
+        older = conversation.messages.filter(created_at__lte=newest_folded)
+        if conversation.summary_until:
+            older = older.filter(created_at__gt=conversation.summary_until)
+        folded = older.order_by('-created_at', '-pk').values_list('direction', 'content')[:max_messages]
+
+        lines = summary.splitlines() if summary else []
+        lines.extend(_summary_line(direction, content) for direction, content in reversed(folded))
+        summary = _trim_summary(lines, summary_budget)
+        Conversation.objects.filter(pk=conversation.pk).update(
+            summary=summary, summary_until=newest_folded
+        )
+        conversation.summary = summary
+        conversation.summary_until = newest_folded
+        used = estimate_tokens(summary) + sum(estimate_tokens(c) for _, c in window)
+
+    window.reverse()
+    memory = SessionMemory(
+        session_id=conversation.session_id,
+        summary=summary,
+        window=window,
+        tokens=used,
+    )
+    logger.debug(
+        f"Memory for {memory.session_id}: {len(window)} messages, "
+        f"summary {len(summary)} chars, ~{used} tokens"
+    )
+    return memory
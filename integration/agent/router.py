@@ -0,0 +1,128 @@
+"""
+Deterministic intent router for the accounting agent.
+
+High-frequency questions ("مبيعات اليوم", "low stock", "الملخص المالي")
+map one-to-one onto a tool call, so the router answers them directly
+instead of running the LangGraph ReAct loop. Intent phrases live in
+``prompts.INTENTS`` and are compiled the same way as the conversational
+patterns in ``AccountingAgent``; a message only matches when the whole
+message (after an optional filler prefix such as "كم" or "show") is an
+intent phrase, so anything more specific still goes to the LLM.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Optional
+
+from ..utils.common import normalize_text
+from . import prompts
+
+logger = logging.getLogger(__name__)
+
+# Punctuation ignored around a message ("مبيعات اليوم؟")
+_PUNCTUATION = re.compile(r'[\s?!.,;:؟،؛]+')
+
+
+class IntentRouter:
+    """
+    Map whole-message intents to tools and keep hit/miss counters.
+    """
+
+    def __init__(self, tools, intents=None, prefixes=None):
+        self.tools = {tool.name: tool for tool in tools}
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = 0
+        self._compile_patterns(
+            prompts.INTENTS if intents is None else intents,
+            prompts.INTENT_PREFIXES if prefixes is None else prefixes,
+        )
+
+    def _compile_patterns(self, intents, prefixes):
+        """Pre-compile one anchored regex per intent phrase group."""
+        self.compiled_patterns = []
+
+        sorted_prefixes = sorted({normalize_text(p) for p in prefixes}, key=len, reverse=True)
+        prefix = f"(?:(?:{'|'.join(re.escape(p) for p in sorted_prefixes)}) )?" if sorted_prefixes else ''
+
+        for tool_name, spec in intents.items():
+            if tool_name not in self.tools:
+                logger.warning(f"Intent for unknown tool {tool_name} ignored")
+                continue
+
+            sources = []
+            keywords = sorted({normalize_text(k) for k in spec.get('keywords', [])}, key=len, reverse=True)
+            if keywords:
+                sources.append('|'.join(re.escape(k) for k in keywords))
+            sources.extend(spec.get('patterns', []))
+
+            for source in sources:
+                try:
+                    regex = re.compile(f"^{prefix}(?:{source})$", re.IGNORECASE)
+                    self.compiled_patterns.append((regex, tool_name))
+                except re.error as e:
+                    logger.error(f"Failed to compile intent pattern for {tool_name}: {e}")
+
+    def match(self, message: str):
+        """Return ``(tool_name, arguments)`` for a routable message, else None."""
+        text = _PUNCTUATION.sub(' ', normalize_text(message)).strip()
+        if not text:
+            return None
+        for regex, tool_name in self.compiled_patterns:
+            found = regex.match(text)
+            if found:
+                arguments = {
+                    key: int(value) if value.isdigit() else value
+                    for key, value in found.groupdict().items()
+                    if value is not None
+                }
+                return tool_name, arguments
+        return None
+
+    def route(self, message: str, callbacks=None) -> Optional[str]:
+        """
+        Answer ``message`` with a direct tool call, or return None so the
+        caller falls back to the LLM. ``callbacks`` are passed to the tool.
+        """
+        matched = self.match(message)
+        if matched is None:
+            self._record(None)
+            return None
+
+        tool_name, arguments = matched
+        try:
+            result = self.tools[tool_name].invoke(arguments, config={'callbacks': callbacks})
+        except Exception as e:
+            logger.error(f"Routed tool {tool_name} failed, falling back to the LLM: {e}")
+            self._record(None)
+            return None
+
+        self._record(tool_name)
+        logger.info(f"⚡ Routed to {tool_name} without the LLM (hit rate {self.hit_rate:.0%})")
+        return result
+
+    def _record(self, tool_name):
+        with self._lock:
+            if tool_name is None:
+                self.misses += 1
+            else:
+                self.hits[tool_name] += 1
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of routed messages answered without the LLM."""
+        with self._lock:
+            total = sum(self.hits.values()) + self.misses
+            return sum(self.hits.values()) / total if total else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = sum(self.hits.values())
+            total = hits + self.misses
+            return {
+                'hits': hits,
+                'misses': self.misses,
+                'hit_rate': hits / total if total else 0.0,
+                'by_intent': dict(self.hits),
+            }
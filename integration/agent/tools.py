@@ -1,32 +1,50 @@
 from langchain_core.tools import tool
 from django.db.models import Sum, Count, Q, F, FloatField
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.db.models.functions import TruncMonth
 
 # App models
-from store.models import Item, Category
+from store.models import Item, Category, StockMovement
+from store.stock import move_stock, InsufficientStock
+from store.search import search_items
 from invoice.models import Invoice
-from transactions.models import Sale, Purchase, SaleDetail
+from transactions.models import Sale, Purchase, SaleDetail, DailySalesRollup
+from transactions.rollup import sales_summary
 from bills.models import Bill
 from accounts.models import Customer, Vendor
+from .catalogue import catalogue
+from .cache import cached_tool
+
+
+def _find_item(name):
+    """
+    Resolve a free-text product name to an Item.
+
+    The name is matched against the in-memory catalogue snapshot, so only
+    a primary-key fetch hits the database; items added since the last
+    snapshot refresh are found through the indexed database search.
+    """
+    entry = catalogue.resolve(name)
+    if entry is not None:
+        item = Item.objects.filter(pk=entry.id).first()
+        if item is not None:
+            return item
+    return search_items(name, limit=1).first()
+
 
 @tool
+@cached_tool('transactions.Sale')
 def get_today_sales() -> str:
     """Get sales summary for the current day."""
-    today = timezone.now().date()
+    today = timezone.localdate()
     
-    # Filter sales for today
-    sales = Sale.objects.filter(date_added__date=today)
-    result = sales.aggregate(
-        total=Sum('grand_total'),
-        count=Count('id'),
-        paid=Sum('amount_paid')
-    )
+    # Today's pre-aggregated rollup row
+    result = sales_summary(date=today)
     
-    total = result['total'] or 0
-    count = result['count'] or 0
-    paid = result['paid'] or 0
+    total = result['total']
+    count = result['count']
+    paid = result['paid']
     credit = total - paid
     
     if count == 0:
@@ -40,22 +58,18 @@ def get_today_sales() -> str:
 ⏳ الآجل: {credit:,.0f} ريال"""
 
 @tool
+@cached_tool('transactions.Sale')
 def get_monthly_sales(month: int = None, year: int = None) -> str:
     """Get sales summary for a specific month and year."""
     now = timezone.now()
     month = month or now.month
     year = year or now.year
     
-    sales = Sale.objects.filter(date_added__month=month, date_added__year=year)
-    result = sales.aggregate(
-        total=Sum('grand_total'),
-        count=Count('id'),
-        paid=Sum('amount_paid')
-    )
+    result = sales_summary(date__month=month, date__year=year)
     
-    total = result['total'] or 0
-    count = result['count'] or 0
-    paid = result['paid'] or 0
+    total = result['total']
+    count = result['count']
+    paid = result['paid']
     
     months_ar = ['يناير','فبراير','مارس','أبريل','مايو','يونيو',
                  'يوليو','أغسطس','سبتمبر','أكتوبر','نوفمبر','ديسمبر']
@@ -73,28 +87,25 @@ def get_monthly_sales(month: int = None, year: int = None) -> str:
 69: 📊 متوسط اليوم: {total/30:,.0f} ريال"""
 
 @tool
+@cached_tool('transactions.Sale')
 def get_yearly_sales(year: int = None) -> str:
     """Get sales summary for a full year with monthly breakdown."""
     now = timezone.now()
     year = year or now.year
     
-    sales = Sale.objects.filter(date_added__year=year)
-    result = sales.aggregate(
-        total=Sum('grand_total'),
-        count=Count('id'),
-        paid=Sum('amount_paid')
-    )
+    days = DailySalesRollup.objects.filter(date__year=year)
+    result = sales_summary(date__year=year)
     
-    total = result['total'] or 0
-    count = result['count'] or 0
-    paid = result['paid'] or 0
+    total = result['total']
+    count = result['count']
+    paid = result['paid']
     
     if count == 0:
         return f"📅 مبيعات سنة {year}:\n\n🚫 لا توجد مبيعات مسجلة."
     
     # Monthly breakdown
-    monthly = sales.annotate(
-        month=TruncMonth('date_added')
+    monthly = days.annotate(
+        month=TruncMonth('date')
     ).values('month').annotate(
         month_total=Sum('grand_total')
     ).order_by('month')
@@ -118,19 +129,17 @@ def get_yearly_sales(year: int = None) -> str:
     return resp
 
 @tool
+@cached_tool('transactions.Sale', 'bills.Bill', 'store.Item', 'store.StockMovement')
 def get_financial_summary() -> str:
     """Get a comprehensive financial overview of the business."""
-    today = timezone.now().date()
+    today = timezone.localdate()
     
     # Sales
-    today_sales = Sale.objects.filter(date_added__date=today).aggregate(total=Sum('grand_total'))['total'] or 0
-    month_sales = Sale.objects.filter(date_added__month=today.month, date_added__year=today.year).aggregate(total=Sum('grand_total'))['total'] or 0
+    today_sales = sales_summary(date=today)['total']
+    month_sales = sales_summary(date__month=today.month, date__year=today.year)['total']
     
-    # Debts (Customers who haven't paid in full)
-    customer_debts = Sale.objects.filter(amount_paid__lt=F('grand_total'))
-    total_debts = customer_debts.aggregate(
-        debt=Sum(F('grand_total') - F('amount_paid'), output_field=models.DecimalField(max_digits=12, decimal_places=2))
-    )['debt'] or 0
+    # Debts (Customers who haven't paid in full), tracked per day in the rollup
+    total_debts = float(sales_summary()['outstanding'])
     
     # Unpaid Bills
     unpaid_bills = Bill.objects.filter(status=False).aggregate(total=Sum('amount'))['total'] or 0
@@ -184,6 +193,7 @@ def get_customer_invoices(customer_name: str) -> str:
     return "\n".join(lines)
 
 @tool
+@cached_tool('store.Item', 'store.StockMovement', 'transactions.Sale')
 def get_low_stock_products(threshold: int = 10) -> str:
     """Identify products with low stock levels."""
     products = Item.objects.filter(quantity__lte=threshold).order_by('quantity')[:10]
@@ -199,6 +209,7 @@ def get_low_stock_products(threshold: int = 10) -> str:
     return "\n".join(lines)
 
 @tool
+@cached_tool('transactions.Sale', 'transactions.SaleDetail', 'store.Item')
 def get_top_selling_products(limit: int = 5) -> str:
     """Get the most sold products based on quantity in the current month."""
     now = timezone.now()
@@ -226,6 +237,7 @@ def get_top_selling_products(limit: int = 5) -> str:
     return "\n".join(lines)
 
 @tool
+@cached_tool('transactions.Sale', 'accounts.Customer')
 def get_best_customers(limit: int = 5) -> str:
     """Get top customers based on total spending."""
     results = Sale.objects.values('customer__first_name', 'customer__last_name', 'customer__loyalty_points').annotate(
@@ -247,6 +259,7 @@ def get_best_customers(limit: int = 5) -> str:
     return "\n".join(lines)
 
 @tool
+@cached_tool('accounts.Customer')
 def get_all_customers() -> str:
     """List all customers with their loyalty points."""
     customers = Customer.objects.all().order_by('-loyalty_points')[:50] # Limit to 50 to avoid overflow
@@ -267,7 +280,7 @@ def get_all_customers() -> str:
 @tool
 def search_item(query: str) -> str:
     """Search for an item by name and return its details."""
-    items = Item.objects.filter(name__icontains=query)
+    items = search_items(query, limit=10)
     if not items.exists():
         return f"🚫 لم يتم العثور على منتج يطابق '{query}'."
     
@@ -282,6 +295,7 @@ def search_item(query: str) -> str:
     return "\n".join(lines)
 
 @tool
+@cached_tool('store.Category', 'store.Item')
 def get_categories() -> str:
     """List all product categories."""
     categories = Category.objects.all()
@@ -296,6 +310,7 @@ def get_categories() -> str:
     return "\n".join(lines)
 
 @tool
+@cached_tool('accounts.Vendor')
 def get_vendors() -> str:
     """List all vendors/suppliers."""
     vendors = Vendor.objects.all()
@@ -310,6 +325,7 @@ def get_vendors() -> str:
     return "\n".join(lines)
 
 @tool
+@cached_tool('bills.Bill')
 def get_unpaid_bills() -> str:
     """List all unpaid bills."""
     bills = Bill.objects.filter(status=False)
@@ -337,10 +353,9 @@ def create_purchase_order(item_name: str, vendor_name: str, quantity: int, price
     """
     try:
         # Find the item
-        items = Item.objects.filter(name__icontains=item_name)
-        if not items.exists():
+        item = _find_item(item_name)
+        if item is None:
             return f"❌ لم يتم العثور على منتج باسم: {item_name}"
-        item = items.first()
         
         # Find the vendor
         vendors = Vendor.objects.filter(name__icontains=vendor_name)
@@ -405,10 +420,9 @@ def create_sale(customer_name: str, items_data: str) -> str:
             item_name, qty, price = parts[0].strip(), int(parts[1].strip()), float(parts[2].strip())
             
             # Find item
-            items = Item.objects.filter(name__icontains=item_name)
-            if not items.exists():
+            item = _find_item(item_name)
+            if item is None:
                 return f"❌ لم يتم العثور على منتج: {item_name}"
-            item = items.first()
             
             # Check stock
             if item.quantity < qty:
@@ -422,29 +436,35 @@ def create_sale(customer_name: str, items_data: str) -> str:
             })
             total += qty * price
         
-        # Create sale
-        sale = Sale.objects.create(
-            customer=customer,
-            sub_total=total,
-            grand_total=total,
-            tax_amount=0,
-            tax_percentage=0,
-            amount_paid=0,
-            amount_change=0
-        )
-        
-        # Create sale details and update stock
-        for item_data in items_list:
-            SaleDetail.objects.create(
-                sale=sale,
-                item=item_data['item'],
-                quantity=item_data['quantity'],
-                price=item_data['price'],
-                total_detail=item_data['total']
-            )
-            # Update stock
-            item_data['item'].quantity -= item_data['quantity']
-            item_data['item'].save()
+        try:
+            with transaction.atomic():
+                # Create sale
+                sale = Sale.objects.create(
+                    customer=customer,
+                    sub_total=total,
+                    grand_total=total,
+                    tax_amount=0,
+                    tax_percentage=0,
+                    amount_paid=0,
+                    amount_change=0
+                )
+                
+                # Create sale details and update stock
+                for item_data in items_list:
+                    SaleDetail.objects.create(
+                        sale=sale,
+                        item=item_data['item'],
+                        quantity=item_data['quantity'],
+                        price=item_data['price'],
+                        total_detail=item_data['total']
+                    )
+                    # Atomic decrement; fails if another sale took the stock first
+                    move_stock(
+                        item_data['item'], -item_data['quantity'],
+                        StockMovement.REASON_SALE, f"sale:{sale.pk}"
+                    )
+        except InsufficientStock as e:
+            return f"⚠️ مخزون غير كافٍ لـ {e.item.name}. المتوفر: {e.item.quantity}"
         
         lines = [
             "✅ تم إنشاء فاتورة البيع بنجاح!",
@@ -0,0 +1,83 @@
+"""
+Per-request tool selection for the accounting agent.
+
+Sending all 22 tool schemas on every LLM call costs more input tokens
+than the system prompt itself. ``ToolSelector`` offers the model only the
+tool categories of ``prompts.TOOL_CATEGORIES`` whose keywords appear in
+the message (or in the previous user message, so follow-ups such as
+"وكم سعره؟" keep their context), plus ``prompts.CORE_TOOLS``. A message
+that matches no category gets every tool, so nothing becomes unreachable.
+
+Selected tools always keep the order of the full tool list: the same set
+of categories produces a byte-identical tool block, which keeps the
+prompt prefix cacheable by the provider.
+"""
+import logging
+
+from ..utils.common import normalize_text
+from . import prompts
+
+logger = logging.getLogger(__name__)
+
+# Attached particles stripped from the start of Arabic words
+# ("والمبيعات" -> "مبيعات", "بالمخزون" -> "مخزون")
+_PREFIXES = ('وال', 'بال', 'فال', 'كال', 'لل', 'ال', 'و', 'ف', 'ب', 'ل')
+
+
+def _word_forms(text):
+    """Every word of ``text`` with and without its leading particles."""
+    forms = set()
+    for word in text.split():
+        forms.add(word)
+        for prefix in _PREFIXES:
+            if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+                forms.add(word[len(prefix):])
+    return forms
+
+
+class ToolSelector:
+    """
+    Pick the tools relevant to a message from a category map.
+    """
+
+    def __init__(self, tools, categories=None, core=None):
+        self.tools = list(tools)
+        available = {tool.name for tool in self.tools}
+        self.core = {name for name in (prompts.CORE_TOOLS if core is None else core) if name in available}
+        self.categories = []
+        for name, spec in (prompts.TOOL_CATEGORIES if categories is None else categories).items():
+            unknown = set(spec['tools']) - available
+            if unknown:
+                logger.warning(f"Tool category {name} lists unknown tools: {', '.join(sorted(unknown))}")
+            keywords = {normalize_text(k) for k in spec.get('keywords', [])}
+            self.categories.append((
+                name,
+                set(spec['tools']) & available,
+                {k for k in keywords if ' ' not in k},
+                [k for k in keywords if ' ' in k],
+            ))
+
+    def categories_for(self, text):
+        """Names of the categories whose keywords appear in ``text``."""
+        text = normalize_text(text or '')
+        forms = _word_forms(text)
+        return [
+            name for name, _tools, words, phrases in self.categories
+            if words & forms or any(phrase in text for phrase in phrases)
+        ]
+
+    def select(self, message, previous=None):
+        """
+        Return the tools to offer for ``message``, in the original order.
+        """
+        matched = set(self.categories_for(message))
+        if previous:
+            matched.update(self.categories_for(previous))
+        if not matched:
+            return self.tools
+
+        names = set(self.core)
+        for name, tools, _words, _phrases in self.categories:
+            if name in matched:
+                names |= tools
+        return [tool for tool in self.tools if tool.name in names]
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+from integration.models import AgentMetric
+
+
+class Command(BaseCommand):
+    help = 'Report agent latency and token usage per step, slowest first'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=7,
+            help='Only include metrics recorded in the last N days'
+        )
+        parser.add_argument(
+            '--by-session', action='store_true',
+            help='Report token usage per session instead of per step'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Number of rows to show'
+        )
+
+    def handle(self, *args, **options):
+        metrics = AgentMetric.objects.filter(
+            created_at__gte=timezone.now() - timedelta(days=options['days'])
+        )
+
+        if options['by_session']:
+            rows = (
+                metrics.filter(kind=AgentMetric.KIND_MESSAGE)
+                .values('session_id')
+                .annotate(
+                    messages=Count('id'),
+                    prompt=Sum('prompt_tokens'),
+                    completion=Sum('completion_tokens'),
+                )
+                .order_by('-prompt')[:options['limit']]
+            )
+            self.stdout.write(f"{'session':<24}{'messages':>10}{'prompt':>12}{'completion':>12}")
+            for row in rows:
+                self.stdout.write(
+                    f"{row['session_id'] or '-':<24}{row['messages']:>10}"
+                    f"{row['prompt']:>12}{row['completion']:>12}"
+                )
+            return
+
+        rows = (
+            metrics.values('kind', 'name')
+            .annotate(
+                calls=Count('id'),
+                avg_ms=Avg('duration_ms'),
+                max_ms=Max('duration_ms'),
+                errors=Count('id', filter=~Q(error='')),
+                tokens=Sum('prompt_tokens') + Sum('completion_tokens'),
+            )
+            .order_by('-avg_ms')[:options['limit']]
+        )
+        self.stdout.write(
+            f"{'kind':<10}{'name':<32}{'calls':>8}{'avg ms':>10}{'max ms':>10}{'errors':>8}{'tokens':>10}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['kind']:<10}{row['name'][:31]:<32}{row['calls']:>8}"
+                f"{row['avg_ms']:>10.0f}{row['max_ms']:>10}{row['errors']:>8}{row['tokens']:>10}"
+            )
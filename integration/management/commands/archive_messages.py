@@ -0,0 +1,74 @@
+import logging
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from integration.services.archive import archive_messages
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Move messages older than the retention period into monthly compressed archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'MESSAGE_RETENTION_DAYS', 180),
+            help='Archive messages older than this many days'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Messages read and deleted per query'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many messages would be archived per month'
+        )
+        parser.add_argument(
+            '--every', type=float, default=0,
+            help='Keep running and archive again every N hours'
+        )
+
+    def handle(self, *args, **options):
+        self.running = True
+        if options['every']:
+            signal.signal(signal.SIGTERM, self._stop)
+            signal.signal(signal.SIGINT, self._stop)
+
+        while True:
+            self._run(options)
+            if not options['every']:
+                break
+            deadline = time.monotonic() + options['every'] * 3600
+            while self.running and time.monotonic() < deadline:
+                time.sleep(5)
+            if not self.running:
+                break
+            close_old_connections()
+
+    def _run(self, options):
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        try:
+            results = archive_messages(
+                days=options['days'],
+                batch_size=max(1, options['batch_size']),
+                dry_run=options['dry_run'],
+            )
+        except Exception:
+            if not options['every']:
+                raise
+            logger.exception('Message archiving failed')
+            return
+
+        for month, count, archive in results:
+            target = f' to {archive.path}' if archive else ''
+            self.stdout.write(f'{verb} {count} messages of {month:%Y-%m}{target}')
+        total = sum(count for _, count, _ in results)
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} messages older than {options["days"]} days.'))
+
+    def _stop(self, signum, frame):
+        self.stdout.write('Shutdown requested, stopping after the current run...')
+        self.running = False
@@ -0,0 +1,95 @@
+import logging
+import signal
+import time
+from itertools import groupby
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from integration.providers import close_http_sessions
+from integration.services import claim_messages, requeue_stale_messages, OutboxDispatcher
+from integration.services.scheduler import KeyedExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound WhatsApp messages with per-session rate limiting'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'OUTBOX_WORKERS', 4),
+            help='Number of WhatsApp sessions sent to concurrently'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=getattr(settings, 'OUTBOX_BATCH_SIZE', 50),
+            help='Maximum number of messages claimed per poll'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=0.5,
+            help='Seconds to sleep when the outbox is empty'
+        )
+        parser.add_argument(
+            '--stale-timeout', type=int, default=getattr(settings, 'OUTBOX_STALE_TIMEOUT', 600),
+            help='Seconds after which a message stuck in sending is requeued'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the outbox once and exit instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        batch_size = max(1, options['batch_size'])
+        poll_interval = options['poll_interval']
+        stale_timeout = options['stale_timeout']
+        self.running = True
+        self.dispatcher = OutboxDispatcher()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write(f'Dispatching outbound messages with {workers} workers...')
+        requeue_stale_messages(stale_timeout)
+        last_stale_check = time.monotonic()
+
+        # Messages of one application (WhatsApp session) are sent in order on
+        # a single lane, paced by its token bucket; sessions run concurrently.
+        try:
+            with KeyedExecutor(max_workers=workers, thread_name_prefix='outbox') as executor:
+                while self.running:
+                    if time.monotonic() - last_stale_check > stale_timeout:
+                        requeue_stale_messages(stale_timeout)
+                        last_stale_check = time.monotonic()
+
+                    messages = []
+                    if executor.pending < workers:
+                        messages = claim_messages(batch_size, exclude_applications=executor.busy_keys)
+                    messages.sort(key=lambda m: (m.application_id, m.id))
+                    for application_id, batch in groupby(messages, key=lambda m: m.application_id):
+                        executor.submit(application_id, self._send, list(batch))
+
+                    if messages:
+                        continue
+                    if options['once'] and not executor.pending:
+                        break
+                    if executor.pending >= workers:
+                        executor.wait(timeout=poll_interval, below=workers)
+                    else:
+                        time.sleep(poll_interval)
+        finally:
+            close_http_sessions()
+
+        self.stdout.write(self.style.SUCCESS('Outbound dispatcher stopped.'))
+
+    def _send(self, messages):
+        close_old_connections()
+        try:
+            self.dispatcher.send_batch(messages)
+        finally:
+            close_old_connections()
+
+    def _stop(self, signum, frame):
+        self.stdout.write('Shutdown requested, finishing in-flight batches...')
+        self.running = False
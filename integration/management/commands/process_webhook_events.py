@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import signal
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from integration.providers import close_http_sessions
+from integration.services import (
+    claim_events, complete_event, fail_event, release_events, requeue_stale_events,
+    WebhookEventProcessor
+)
+from integration.services.scheduler import KeyedExecutor
+from integration.services.webhook_processor import close_async_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Process queued WhatsApp webhook events with a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=getattr(settings, 'WEBHOOK_WORKERS', 4),
+            help='Number of events processed concurrently'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to sleep when the queue is empty'
+        )
+        parser.add_argument(
+            '--stale-timeout', type=int, default=getattr(settings, 'WEBHOOK_STALE_TIMEOUT', 300),
+            help='Seconds after which an event stuck in processing is requeued'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the queue once and exit instead of polling forever'
+        )
+        parser.add_argument(
+            '--async', action='store_true', dest='use_async',
+            help='Process events as asyncio tasks instead of threads; --workers then '
+                 'bounds events in flight and can be set to hundreds'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        stale_timeout = options['stale_timeout']
+        self.running = True
+        self.processor = WebhookEventProcessor()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        mode = 'async tasks' if options['use_async'] else 'workers'
+        self.stdout.write(f'Processing webhook events with {workers} {mode}...')
+        requeue_stale_events(stale_timeout)
+
+        try:
+            if options['use_async']:
+                asyncio.run(self._run_async(workers, poll_interval, stale_timeout, options['once']))
+            else:
+                self._run_threads(workers, poll_interval, stale_timeout, options['once'])
+        finally:
+            # Agent tools send through pooled WPPConnect sessions
+            close_http_sessions()
+
+        self.stdout.write(self.style.SUCCESS('Webhook worker stopped.'))
+
+    def _run_threads(self, workers, poll_interval, stale_timeout, once):
+        last_stale_check = time.monotonic()
+
+        # Events of one conversation run in order on a single lane; different
+        # conversations spread over all worker threads.
+        with KeyedExecutor(max_workers=workers, thread_name_prefix='webhook') as executor:
+            while self.running:
+                if time.monotonic() - last_stale_check > stale_timeout:
+                    requeue_stale_events(stale_timeout)
+                    last_stale_check = time.monotonic()
+
+                events = claim_events(workers - executor.pending)
+                # Sessions of this batch whose lane hit a failed event
+                failed = set()
+                for event in events:
+                    executor.submit(self._key(event), self._process, event, failed)
+
+                if executor.pending >= workers:
+                    executor.wait(timeout=poll_interval, below=workers)
+                elif events:
+                    continue
+                elif once and not executor.pending:
+                    break
+                else:
+                    time.sleep(poll_interval)
+
+    async def _run_async(self, workers, poll_interval, stale_timeout, once):
+        # Database calls share one thread; the waits on Flow AI and the LLM
+        # overlap on the event loop. A session's events run in order within
+        # one task, and claim_events never hands out a session that is still
+        # in flight.
+        tasks = set()
+        self.in_flight = 0
+        last_stale_check = time.monotonic()
+        try:
+            while self.running:
+                if time.monotonic() - last_stale_check > stale_timeout:
+                    await sync_to_async(requeue_stale_events)(stale_timeout)
+                    last_stale_check = time.monotonic()
+
+                events = []
+                if self.in_flight < workers:
+                    events = await sync_to_async(claim_events)(workers - self.in_flight)
+                lanes = {}
+                for event in events:
+                    lanes.setdefault(self._key(event), []).append(event)
+                for lane in lanes.values():
+                    self.in_flight += len(lane)
+                    task = asyncio.create_task(self._aprocess_lane(lane))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                if events:
+                    continue
+                if once and not tasks:
+                    break
+                if tasks:
+                    await asyncio.wait(tasks, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await sync_to_async(close_old_connections)()
+                    await asyncio.sleep(poll_interval)
+
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            await close_async_http_client()
+
+    async def _aprocess_lane(self, events):
+        for index, event in enumerate(events):
+            try:
+                await self.processor.aprocess(event)
+                await sync_to_async(complete_event)(event)
+            except Exception as e:
+                logger.exception(f"Webhook event {event.pk} raised an error")
+                await sync_to_async(fail_event)(event, e)
+                # The retry must run before the session's later events
+                await sync_to_async(release_events)(events[index + 1:])
+                self.in_flight -= len(events) - index - 1
+                return
+            finally:
+                self.in_flight -= 1
+
+    def _key(self, event):
+        return event.session_id or f"event-{event.pk}"
+
+    def _process(self, event, failed):
+        key = self._key(event)
+        if key in failed:
+            # An earlier event of this session failed and will be retried;
+            # this one goes back to the queue behind it
+            release_events([event])
+            return
+        close_old_connections()
+        try:
+            self.processor.process(event)
+            complete_event(event)
+        except Exception as e:
+            logger.exception(f"Webhook event {event.pk} raised an error")
+            fail_event(event, e)
+            failed.add(key)
+        finally:
+            close_old_connections()
+
+    def _stop(self, signum, frame):
+        self.stdout.write('Shutdown requested, finishing in-flight events...')
+        self.running = False
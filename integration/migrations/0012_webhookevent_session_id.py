@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-17 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0011_webhookevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookevent',
+            name='session_id',
+            field=models.CharField(blank=True, db_index=True, help_text='Conversation session the event belongs to; events of one session are processed in order', max_length=255, verbose_name='Session ID'),
+        ),
+    ]
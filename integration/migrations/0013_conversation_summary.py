@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-17 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0012_webhookevent_session_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='summary',
+            field=models.TextField(blank=True, default='', verbose_name='Summary'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='summary_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Summarized Until'),
+        ),
+    ]
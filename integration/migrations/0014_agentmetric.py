@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-17 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0013_conversation_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.UUIDField(db_index=True, verbose_name='Run ID')),
+                ('kind', models.CharField(choices=[('message', 'Message'), ('llm', 'LLM Call'), ('tool', 'Tool Call')], max_length=20, verbose_name='Kind')),
+                ('name', models.CharField(help_text='Tool or model name; for messages, how the message was answered', max_length=100, verbose_name='Name')),
+                ('session_id', models.CharField(blank=True, db_index=True, max_length=255, verbose_name='Session ID')),
+                ('duration_ms', models.PositiveIntegerField(default=0, verbose_name='Duration (ms)')),
+                ('prompt_tokens', models.PositiveIntegerField(default=0, verbose_name='Prompt Tokens')),
+                ('completion_tokens', models.PositiveIntegerField(default=0, verbose_name='Completion Tokens')),
+                ('llm_calls', models.PositiveIntegerField(default=0, verbose_name='LLM Calls')),
+                ('tool_calls', models.PositiveIntegerField(default=0, verbose_name='Tool Calls')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Agent Metric',
+                'verbose_name_plural': 'Agent Metrics',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['kind', 'name', 'created_at'], name='agent_metric_name_idx')],
+            },
+        ),
+    ]
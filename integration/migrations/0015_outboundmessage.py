@@ -0,0 +1,41 @@
+# Generated by Django 5.1 on 2026-10-17 06:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0014_agentmetric'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone', models.CharField(max_length=255, verbose_name='Phone')),
+                ('kind', models.CharField(choices=[('text', 'Text'), ('file', 'File'), ('list', 'List Message')], default='text', max_length=20, verbose_name='Kind')),
+                ('payload', models.JSONField(default=dict, help_text='Keyword arguments of the provider send method', verbose_name='Payload')),
+                ('idempotency_key', models.CharField(blank=True, help_text='Enqueuing again with the same key returns the existing message instead of sending twice', max_length=255, null=True, verbose_name='Idempotency Key')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('response', models.JSONField(blank=True, null=True, verbose_name='Provider Response')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='The message will not be sent before this time', verbose_name='Available At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent At')),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbound_messages', to='integration.application', verbose_name='Application')),
+            ],
+            options={
+                'verbose_name': 'Outbound Message',
+                'verbose_name_plural': 'Outbound Messages',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='outbound_message_queue_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('application', 'idempotency_key'), name='outbound_message_idempotency_key')],
+            },
+        ),
+    ]
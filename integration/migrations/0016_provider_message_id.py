@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-17 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0015_outboundmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='provider_message_id',
+            field=models.CharField(blank=True, max_length=255, null=True, verbose_name='Provider Message ID'),
+        ),
+        migrations.AddField(
+            model_name='webhookevent',
+            name='provider_message_id',
+            field=models.CharField(blank=True, help_text='Id of the message at the provider; redeliveries of the same message are rejected', max_length=255, null=True, verbose_name='Provider Message ID'),
+        ),
+        migrations.AddConstraint(
+            model_name='message',
+            constraint=models.UniqueConstraint(condition=models.Q(('provider_message_id__isnull', False)), fields=('conversation', 'provider_message_id'), name='message_provider_message_id'),
+        ),
+        migrations.AddConstraint(
+            model_name='webhookevent',
+            constraint=models.UniqueConstraint(condition=models.Q(('provider_message_id__isnull', False)), fields=('application', 'provider_message_id'), name='webhook_event_provider_message_id'),
+        ),
+    ]
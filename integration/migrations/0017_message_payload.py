@@ -0,0 +1,81 @@
+# Generated by Django 5.1 on 2026-10-17 06:42
+
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_metadata_to_payloads(apps, schema_editor):
+    """
+    Compress every Message.metadata into a MessagePayload row and copy the
+    sender name and message type into their new columns.
+    """
+    Message = apps.get_model('integration', 'Message')
+    MessagePayload = apps.get_model('integration', 'MessagePayload')
+
+    batch = []
+    messages = Message.objects.exclude(metadata=None).only('id', 'metadata').iterator(chunk_size=1000)
+    for message in messages:
+        data = message.metadata
+        if not isinstance(data, dict):
+            data = {'value': data}
+        sender = data.get('sender') or {}
+        Message.objects.filter(pk=message.pk).update(
+            sender_name=(sender.get('name') or sender.get('pushname') or data.get('notifyName') or '')[:255],
+            message_type=(data.get('type') or '')[:30],
+        )
+        raw = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode()
+        batch.append(MessagePayload(message_id=message.pk, data=zlib.compress(raw), size=len(raw)))
+        if len(batch) >= 500:
+            MessagePayload.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        MessagePayload.objects.bulk_create(batch)
+
+
+def restore_metadata(apps, schema_editor):
+    Message = apps.get_model('integration', 'Message')
+    MessagePayload = apps.get_model('integration', 'MessagePayload')
+    for payload in MessagePayload.objects.iterator(chunk_size=1000):
+        Message.objects.filter(pk=payload.message_id).update(
+            metadata=json.loads(zlib.decompress(bytes(payload.data)))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0016_provider_message_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessagePayload',
+            fields=[
+                ('message', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload_record', serialize=False, to='integration.message', verbose_name='Message')),
+                ('data', models.BinaryField(verbose_name='Compressed Data')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Uncompressed Size')),
+            ],
+            options={
+                'verbose_name': 'Message Payload',
+                'verbose_name_plural': 'Message Payloads',
+            },
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='message_type',
+            field=models.CharField(blank=True, help_text='Provider message type, e.g. chat, image, ptt', max_length=30, verbose_name='Message Type'),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='sender_name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Sender Name'),
+        ),
+        migrations.RunPython(move_metadata_to_payloads, restore_metadata),
+        migrations.RemoveField(
+            model_name='message',
+            name='metadata',
+        ),
+    ]
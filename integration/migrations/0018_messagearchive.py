@@ -0,0 +1,48 @@
+# Generated by Django 5.1 on 2026-10-17 06:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0017_message_payload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(db_index=True, help_text='First day of the month the archived messages were created in', verbose_name='Month')),
+                ('path', models.CharField(help_text='File path relative to MESSAGE_ARCHIVE_DIR', max_length=500, unique=True, verbose_name='Path')),
+                ('message_count', models.PositiveIntegerField(default=0, verbose_name='Message Count')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='File Size')),
+                ('first_message_at', models.DateTimeField(verbose_name='First Message At')),
+                ('last_message_at', models.DateTimeField(verbose_name='Last Message At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Message Archive',
+                'verbose_name_plural': 'Message Archives',
+                'ordering': ['-month', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MessageArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset', models.PositiveBigIntegerField(verbose_name='Offset')),
+                ('length', models.PositiveBigIntegerField(verbose_name='Length')),
+                ('message_count', models.PositiveIntegerField(default=0, verbose_name='Message Count')),
+                ('archive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='integration.messagearchive', verbose_name='Archive')),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archive_segments', to='integration.conversation', verbose_name='Conversation')),
+            ],
+            options={
+                'verbose_name': 'Message Archive Segment',
+                'verbose_name_plural': 'Message Archive Segments',
+                'constraints': [models.UniqueConstraint(fields=('conversation', 'archive'), name='archive_segment_conversation_archive')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-17 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0018_messagearchive'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='conversation',
+            options={'ordering': ['-updated_at', '-id'], 'verbose_name': 'Conversation', 'verbose_name_plural': 'Conversations'},
+        ),
+        migrations.AlterModelOptions(
+            name='message',
+            options={'ordering': ['created_at', 'id'], 'verbose_name': 'Message', 'verbose_name_plural': 'Messages'},
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['-updated_at', '-id'], name='conversation_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'created_at', 'id'], name='message_conv_created_idx'),
+        ),
+    ]
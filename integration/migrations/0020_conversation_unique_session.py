@@ -0,0 +1,56 @@
+# Generated by Django 5.1 on 2026-10-17 06:47
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def merge_duplicate_conversations(apps, schema_editor):
+    """
+    Fold conversations sharing an (application, session_id) into the
+    oldest one so the unique constraint can be added.
+    """
+    Conversation = apps.get_model('integration', 'Conversation')
+    Message = apps.get_model('integration', 'Message')
+
+    duplicates = (
+        Conversation.objects.values('application_id', 'session_id')
+        .annotate(count=Count('id'), last_activity=Max('updated_at'))
+        .filter(count__gt=1)
+    )
+    for group in duplicates:
+        conversations = list(
+            Conversation.objects.filter(
+                application_id=group['application_id'], session_id=group['session_id']
+            ).order_by('id')
+        )
+        keeper, extras = conversations[0], conversations[1:]
+        extra_ids = [conversation.pk for conversation in extras]
+
+        # Keep the first copy of every provider message across the whole
+        # group, so no two moved messages collide on the unique index
+        delivered = Message.objects.filter(
+            conversation_id__in=[keeper.pk, *extra_ids], provider_message_id__isnull=False
+        )
+        first_copies = list(
+            delivered.values('provider_message_id').annotate(first=Min('id'))
+            .values_list('first', flat=True)
+        )
+        delivered.exclude(id__in=first_copies).delete()
+        Message.objects.filter(conversation_id__in=extra_ids).update(conversation=keeper)
+        Conversation.objects.filter(pk__in=extra_ids).delete()
+        Conversation.objects.filter(pk=keeper.pk).update(updated_at=group['last_activity'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0019_conversation_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_conversations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('application', 'session_id'), name='conversation_application_session'),
+        ),
+    ]
@@ -0,0 +1,83 @@
+import json
+import zlib
+
+from django.db import migrations
+
+
+def _provider_message_id(payload):
+    message_id = (payload or {}).get('id')
+    if isinstance(message_id, dict):
+        message_id = message_id.get('_serialized') or message_id.get('id')
+    if not message_id:
+        return None
+    return str(message_id)[:255]
+
+
+def backfill_provider_message_ids(apps, schema_editor):
+    """
+    Fill provider_message_id on messages and webhook events stored before
+    the column existed, so redeliveries of older messages are rejected too.
+    Only the first copy of a message already logged twice gets the id; the
+    unique indexes do not allow more.
+    """
+    Message = apps.get_model('integration', 'Message')
+    MessagePayload = apps.get_model('integration', 'MessagePayload')
+    WebhookEvent = apps.get_model('integration', 'WebhookEvent')
+
+    seen = set(
+        Message.objects.filter(provider_message_id__isnull=False)
+        .values_list('conversation_id', 'provider_message_id')
+    )
+    batch = []
+    payloads = (
+        MessagePayload.objects
+        .filter(message__direction='incoming', message__provider_message_id__isnull=True)
+        .order_by('message_id')
+        .values_list('message_id', 'message__conversation_id', 'data')
+        .iterator(chunk_size=1000)
+    )
+    for message_id, conversation_id, data in payloads:
+        provider_id = _provider_message_id(json.loads(zlib.decompress(bytes(data))))
+        if provider_id is None or (conversation_id, provider_id) in seen:
+            continue
+        seen.add((conversation_id, provider_id))
+        batch.append(Message(pk=message_id, provider_message_id=provider_id))
+        if len(batch) >= 500:
+            Message.objects.bulk_update(batch, ['provider_message_id'])
+            batch = []
+    if batch:
+        Message.objects.bulk_update(batch, ['provider_message_id'])
+
+    seen = set(
+        WebhookEvent.objects.filter(provider_message_id__isnull=False)
+        .values_list('application_id', 'provider_message_id')
+    )
+    batch = []
+    events = (
+        WebhookEvent.objects.filter(provider_message_id__isnull=True)
+        .order_by('id')
+        .values_list('id', 'application_id', 'payload')
+        .iterator(chunk_size=1000)
+    )
+    for event_id, application_id, payload in events:
+        provider_id = _provider_message_id(payload if isinstance(payload, dict) else None)
+        if provider_id is None or (application_id, provider_id) in seen:
+            continue
+        seen.add((application_id, provider_id))
+        batch.append(WebhookEvent(pk=event_id, provider_message_id=provider_id))
+        if len(batch) >= 500:
+            WebhookEvent.objects.bulk_update(batch, ['provider_message_id'])
+            batch = []
+    if batch:
+        WebhookEvent.objects.bulk_update(batch, ['provider_message_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integration', '0020_conversation_unique_session'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_provider_message_ids, migrations.RunPython.noop),
+    ]
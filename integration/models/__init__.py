@@ -1,8 +1,12 @@
 from .application import Application
 from .application_configuration import ApplicationConfiguration
-from .conversation import Conversation, Message
+from .conversation import Conversation, Message, MessagePayload
 from .template import Template
 from .user_preferences import UserPreferences
 from .pending_operation import PendingOperation
+from .webhook_event import WebhookEvent
+from .agent_metric import AgentMetric
+from .outbound_message import OutboundMessage
+from .message_archive import MessageArchive, MessageArchiveSegment
 
-__all__ = ['ApplicationConfiguration', 'Application', 'Conversation', 'Message', 'Template', 'UserPreferences', 'PendingOperation']
+__all__ = ['ApplicationConfiguration', 'Application', 'Conversation', 'Message', 'MessagePayload', 'Template', 'UserPreferences', 'PendingOperation', 'WebhookEvent', 'AgentMetric', 'OutboundMessage', 'MessageArchive', 'MessageArchiveSegment']
@@ -0,0 +1,81 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class AgentMetric(models.Model):
+    """
+    One timed step of the accounting agent: a whole ``process_message``
+    call, an LLM call or a tool call. Rows of the same message share
+    ``run_id`` and are written by ``integration.agent.instrumentation``.
+    """
+
+    KIND_MESSAGE = 'message'
+    KIND_LLM = 'llm'
+    KIND_TOOL = 'tool'
+
+    KIND_CHOICES = [
+        (KIND_MESSAGE, _('Message')),
+        (KIND_LLM, _('LLM Call')),
+        (KIND_TOOL, _('Tool Call')),
+    ]
+
+    run_id = models.UUIDField(
+        db_index=True,
+        verbose_name=_('Run ID')
+    )
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+        verbose_name=_('Kind')
+    )
+    name = models.CharField(
+        max_length=100,
+        verbose_name=_('Name'),
+        help_text=_('Tool or model name; for messages, how the message was answered')
+    )
+    session_id = models.CharField(
+        max_length=255,
+        blank=True,
+        db_index=True,
+        verbose_name=_('Session ID')
+    )
+    duration_ms = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Duration (ms)')
+    )
+    prompt_tokens = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Prompt Tokens')
+    )
+    completion_tokens = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Completion Tokens')
+    )
+    llm_calls = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('LLM Calls')
+    )
+    tool_calls = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Tool Calls')
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name=_('Error')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name=_('Created At')
+    )
+
+    class Meta:
+        verbose_name = _('Agent Metric')
+        verbose_name_plural = _('Agent Metrics')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['kind', 'name', 'created_at'], name='agent_metric_name_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.name} ({self.duration_ms} ms)"
@@ -1,4 +1,10 @@
+import json
+import zlib
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from .application import Application
 
@@ -27,15 +33,58 @@ class Conversation(models.Model):
         auto_now=True, 
         verbose_name=_('Updated At')
     )
+    summary = models.TextField(
+        blank=True,
+        default='',
+        verbose_name=_('Summary')
+    )
+    summary_until = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_('Summarized Until')
+    )
 
     class Meta:
         verbose_name = _('Conversation')
         verbose_name_plural = _('Conversations')
-        ordering = ['-updated_at']
+        ordering = ['-updated_at', '-id']
+        indexes = [
+            models.Index(fields=['-updated_at', '-id'], name='conversation_updated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['application', 'session_id'],
+                name='conversation_application_session',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user_identifier} ({self.session_id})"
 
+    @classmethod
+    def touch(cls, application, session_id, user_identifier=None):
+        """
+        Return the conversation of ``session_id``, creating it if needed,
+        with ``updated_at`` bumped to now.
+
+        The upsert is one ``INSERT ... ON CONFLICT DO UPDATE`` that only
+        rewrites ``updated_at``; the row is then read back by its unique
+        key, so an existing conversation keeps its summary and start time.
+        """
+        now = timezone.now()
+        cls.objects.bulk_create(
+            [cls(
+                application=application, session_id=session_id,
+                user_identifier=user_identifier, started_at=now, updated_at=now,
+            )],
+            update_conflicts=True,
+            unique_fields=['application', 'session_id'],
+            update_fields=['updated_at'],
+        )
+        conversation = cls.objects.get(application=application, session_id=session_id)
+        conversation.application = application
+        return conversation
+
 
 class Message(models.Model):
     DIRECTION_CHOICES = [
@@ -55,10 +104,22 @@ class Message(models.Model):
         verbose_name=_('Direction')
     )
     content = models.TextField(verbose_name=_('Content'))
-    metadata = models.JSONField(
-        blank=True, 
-        null=True, 
-        verbose_name=_('Metadata')
+    provider_message_id = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        verbose_name=_('Provider Message ID')
+    )
+    sender_name = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_('Sender Name')
+    )
+    message_type = models.CharField(
+        max_length=30,
+        blank=True,
+        verbose_name=_('Message Type'),
+        help_text=_('Provider message type, e.g. chat, image, ptt')
     )
     created_at = models.DateTimeField(
         auto_now_add=True, 
@@ -68,7 +129,69 @@ class Message(models.Model):
     class Meta:
         verbose_name = _('Message')
         verbose_name_plural = _('Messages')
-        ordering = ['created_at']
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['conversation', 'created_at', 'id'], name='message_conv_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['conversation', 'provider_message_id'],
+                condition=Q(provider_message_id__isnull=False),
+                name='message_provider_message_id',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.direction}: {self.content[:50]}"
+
+    @property
+    def payload(self):
+        """
+        Raw provider payload of the message, loaded from MessagePayload on
+        first access (None for messages without one).
+        """
+        if not hasattr(self, '_payload'):
+            record = MessagePayload.objects.filter(message_id=self.pk).only('data').first()
+            self._payload = record.unpack() if record else None
+        return self._payload
+
+
+class MessagePayload(models.Model):
+    """
+    zlib-compressed raw webhook payload of a Message, kept out of the
+    message table so listing conversations never reads it.
+    """
+
+    message = models.OneToOneField(
+        Message,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='payload_record',
+        verbose_name=_('Message')
+    )
+    data = models.BinaryField(verbose_name=_('Compressed Data'))
+    size = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Uncompressed Size')
+    )
+
+    class Meta:
+        verbose_name = _('Message Payload')
+        verbose_name_plural = _('Message Payloads')
+
+    def __str__(self):
+        return f"Payload of message {self.message_id} ({self.size} bytes)"
+
+    @staticmethod
+    def pack(payload):
+        """Return ``(compressed_bytes, raw_size)`` for a JSON-serializable payload."""
+        raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str).encode()
+        return zlib.compress(raw, getattr(settings, 'MESSAGE_PAYLOAD_COMPRESSION_LEVEL', 6)), len(raw)
+
+    def unpack(self):
+        return json.loads(zlib.decompress(bytes(self.data)))
+
+    @classmethod
+    def for_message(cls, message, payload):
+        data, size = cls.pack(payload)
+        return cls(message=message, data=data, size=size)
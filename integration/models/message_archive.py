@@ -0,0 +1,94 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class MessageArchive(models.Model):
+    """
+    One gzip-compressed JSONL file of messages moved out of the live
+    Message table by the ``archive_messages`` command. Every file holds
+    messages of a single calendar month, one gzip member per conversation.
+    """
+
+    month = models.DateField(
+        db_index=True,
+        verbose_name=_('Month'),
+        help_text=_('First day of the month the archived messages were created in')
+    )
+    path = models.CharField(
+        max_length=500,
+        unique=True,
+        verbose_name=_('Path'),
+        help_text=_('File path relative to MESSAGE_ARCHIVE_DIR')
+    )
+    message_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Message Count')
+    )
+    size = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_('File Size')
+    )
+    first_message_at = models.DateTimeField(
+        verbose_name=_('First Message At')
+    )
+    last_message_at = models.DateTimeField(
+        verbose_name=_('Last Message At')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created At')
+    )
+
+    class Meta:
+        verbose_name = _('Message Archive')
+        verbose_name_plural = _('Message Archives')
+        ordering = ['-month', '-id']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} ({self.message_count} messages)"
+
+
+class MessageArchiveSegment(models.Model):
+    """
+    Where the messages of one conversation sit inside an archive file.
+
+    Each conversation is written as its own gzip member, so its history
+    can be read back by seeking to ``offset`` and decompressing ``length``
+    bytes instead of the whole month.
+    """
+
+    archive = models.ForeignKey(
+        MessageArchive,
+        on_delete=models.CASCADE,
+        related_name='segments',
+        verbose_name=_('Archive')
+    )
+    conversation = models.ForeignKey(
+        'integration.Conversation',
+        on_delete=models.CASCADE,
+        related_name='archive_segments',
+        verbose_name=_('Conversation')
+    )
+    offset = models.PositiveBigIntegerField(
+        verbose_name=_('Offset')
+    )
+    length = models.PositiveBigIntegerField(
+        verbose_name=_('Length')
+    )
+    message_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Message Count')
+    )
+
+    class Meta:
+        verbose_name = _('Message Archive Segment')
+        verbose_name_plural = _('Message Archive Segments')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['conversation', 'archive'],
+                name='archive_segment_conversation_archive'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.archive} / conversation {self.conversation_id}"
@@ -0,0 +1,119 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from .application import Application
+
+
+class OutboundMessage(models.Model):
+    """
+    WhatsApp message waiting to be sent by the ``dispatch_outbound_messages``
+    worker, which applies per-session rate limits and retries.
+    """
+
+    KIND_TEXT = 'text'
+    KIND_FILE = 'file'
+    KIND_LIST = 'list'
+
+    KIND_CHOICES = [
+        (KIND_TEXT, _('Text')),
+        (KIND_FILE, _('File')),
+        (KIND_LIST, _('List Message')),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('Pending')),
+        (STATUS_SENDING, _('Sending')),
+        (STATUS_SENT, _('Sent')),
+        (STATUS_FAILED, _('Failed')),
+    ]
+
+    application = models.ForeignKey(
+        Application,
+        on_delete=models.CASCADE,
+        related_name='outbound_messages',
+        verbose_name=_('Application')
+    )
+    phone = models.CharField(
+        max_length=255,
+        verbose_name=_('Phone')
+    )
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+        default=KIND_TEXT,
+        verbose_name=_('Kind')
+    )
+    payload = models.JSONField(
+        default=dict,
+        verbose_name=_('Payload'),
+        help_text=_('Keyword arguments of the provider send method')
+    )
+    idempotency_key = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        verbose_name=_('Idempotency Key'),
+        help_text=_('Enqueuing again with the same key returns the existing message instead of sending twice')
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name=_('Status')
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Attempts')
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_('Last Error')
+    )
+    response = models.JSONField(
+        blank=True,
+        null=True,
+        verbose_name=_('Provider Response')
+    )
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Available At'),
+        help_text=_('The message will not be sent before this time')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created At')
+    )
+    started_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_('Started At')
+    )
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_('Sent At')
+    )
+
+    class Meta:
+        verbose_name = _('Outbound Message')
+        verbose_name_plural = _('Outbound Messages')
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbound_message_queue_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['application', 'idempotency_key'],
+                condition=Q(idempotency_key__isnull=False),
+                name='outbound_message_idempotency_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.application} -> {self.phone} ({self.status})"
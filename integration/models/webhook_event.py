@@ -0,0 +1,104 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from .application import Application
+
+
+class WebhookEvent(models.Model):
+    """
+    Inbound webhook payload persisted by WebhookView and processed
+    asynchronously by the ``process_webhook_events`` worker.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('Pending')),
+        (STATUS_PROCESSING, _('Processing')),
+        (STATUS_DONE, _('Done')),
+        (STATUS_FAILED, _('Failed')),
+    ]
+
+    application = models.ForeignKey(
+        Application,
+        on_delete=models.CASCADE,
+        related_name='webhook_events',
+        verbose_name=_('Application')
+    )
+    event = models.CharField(
+        max_length=50,
+        verbose_name=_('Event')
+    )
+    session_id = models.CharField(
+        max_length=255,
+        blank=True,
+        db_index=True,
+        verbose_name=_('Session ID'),
+        help_text=_('Conversation session the event belongs to; events of one session are processed in order')
+    )
+    provider_message_id = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        verbose_name=_('Provider Message ID'),
+        help_text=_('Id of the message at the provider; redeliveries of the same message are rejected')
+    )
+    payload = models.JSONField(
+        default=dict,
+        verbose_name=_('Payload')
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name=_('Status')
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Attempts')
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_('Last Error')
+    )
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Available At'),
+        help_text=_('The event will not be picked up by a worker before this time')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created At')
+    )
+    started_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_('Started At')
+    )
+    processed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name=_('Processed At')
+    )
+
+    class Meta:
+        verbose_name = _('Webhook Event')
+        verbose_name_plural = _('Webhook Events')
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='webhook_event_queue_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['application', 'provider_message_id'],
+                condition=Q(provider_message_id__isnull=False),
+                name='webhook_event_provider_message_id',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.application} - {self.event} ({self.status})"
@@ -1,3 +1,3 @@
-from .wppconnect_provider import WPPConnectProvider
+from .wppconnect_provider import WPPConnectProvider, close_http_sessions
 
-__all__ = ['WPPConnectProvider']
+__all__ = ['WPPConnectProvider', 'close_http_sessions']
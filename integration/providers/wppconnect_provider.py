@@ -2,6 +2,9 @@ import base64
 import requests
 import json
 import logging
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
 from django.contrib import messages
 from django.urls import reverse
@@ -12,6 +15,56 @@ from ..interfaces import ConnectorProvider
 
 logger = logging.getLogger(__name__)
 
+# Pooled HTTP sessions shared by every provider instance of an application
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+
+
+def _build_http_session():
+    """Create a keep-alive session with a bounded connection pool and retry/backoff."""
+    pool_size = getattr(settings, 'WPPCONNECT_POOL_SIZE', 10)
+    max_retries = getattr(settings, 'WPPCONNECT_MAX_RETRIES', 3)
+    # Connection errors are retried for every method; read errors and
+    # retryable status codes only for idempotent ones, so a message is
+    # never sent twice.
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=getattr(settings, 'WPPCONNECT_RETRY_BACKOFF', 0.5),
+        status_forcelist=(429, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_http_session(application, base_url):
+    """Return the pooled session for an application, rebuilding it if its URL changed."""
+    key = application.pk
+    with _http_sessions_lock:
+        entry = _http_sessions.get(key)
+        if entry is None or entry[0] != base_url:
+            if entry is not None:
+                entry[1].close()
+            entry = (base_url, _build_http_session())
+            _http_sessions[key] = entry
+        return entry[1]
+
+
+def close_http_sessions():
+    """Close every pooled session (e.g. on worker shutdown)."""
+    with _http_sessions_lock:
+        for _, session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
+
+
 class WPPConnectProvider(ConnectorProvider):
     """
     WPPConnectProvider handles communication with the WPPConnect API.
@@ -25,6 +78,7 @@ class WPPConnectProvider(ConnectorProvider):
             self.base_url += '/'
         
         self.session = self.app.session
+        self.http = get_http_session(self.app, self.base_url)
         self.token = self.app.decrypted_token
         # Secret key for token generation - usually configured in WPPConnect server
         self.secret_key = self.app.webhook_key or getattr(settings, 'WPPCONNECT_SECRET_KEY', 'THISISMYSECURETOKEN')
@@ -49,7 +103,7 @@ class WPPConnectProvider(ConnectorProvider):
         """
         url = self._compose_url(self.session, endpoint)
         try:
-            response = requests.post(url, json=data, headers=self.headers, timeout=30)
+            response = self.http.post(url, json=data, headers=self.headers, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -136,7 +190,7 @@ class WPPConnectProvider(ConnectorProvider):
         for secret in secrets_to_try:
             url = self._compose_url(self.session, secret, "generate-token")
             try:
-                response = requests.post(url, headers={"Content-Type": "application/json"}, timeout=30)
+                response = self.http.post(url, headers={"Content-Type": "application/json"}, timeout=30)
                 if response.status_code in [200, 201]:
                     data = response.json()
                     new_token = data.get("token")
@@ -183,7 +237,7 @@ class WPPConnectProvider(ConnectorProvider):
         }
 
         try:
-            response = requests.post(url, headers=self.headers, json=payload, timeout=30)
+            response = self.http.post(url, headers=self.headers, json=payload, timeout=30)
             if response.ok:
                 data = response.json()
                 status = data.get("status") or data.get("message") or "Requested"
@@ -211,7 +265,7 @@ class WPPConnectProvider(ConnectorProvider):
             
         url = self._compose_url(self.session, "qrcode-session")
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.http.get(url, headers=self.headers, timeout=30)
             if response.ok:
                 if 'image' in response.headers.get('Content-Type', ''):
                     image_bytes = response.content
@@ -240,7 +294,7 @@ class WPPConnectProvider(ConnectorProvider):
             
         url = self._compose_url(self.session, "status-session")
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.http.get(url, headers=self.headers, timeout=30)
             if response.ok:
                 data = response.json()
                 status = data.get("status") or data.get("response") or "Unknown"
@@ -260,7 +314,7 @@ class WPPConnectProvider(ConnectorProvider):
             
         url = self._compose_url(self.session, "logout-session")
         try:
-            response = requests.post(url, headers=self.headers, timeout=30)
+            response = self.http.post(url, headers=self.headers, timeout=30)
             if response.ok:
                 messages.success(request, "Session logged out successfully.")
                 return True
@@ -278,7 +332,7 @@ class WPPConnectProvider(ConnectorProvider):
             
         url = self._compose_url(self.session, "close-session")
         try:
-            response = requests.post(url, headers=self.headers, timeout=30)
+            response = self.http.post(url, headers=self.headers, timeout=30)
             if response.ok:
                 messages.success(request, "Session closed successfully.")
                 return True
@@ -296,7 +350,7 @@ class WPPConnectProvider(ConnectorProvider):
             
         url = self._compose_url(self.session, "check-connection-session")
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.http.get(url, headers=self.headers, timeout=30)
             if response.ok:
                 payload = response.json()
                 is_connected = bool(payload.get("status"))
@@ -322,7 +376,7 @@ class WPPConnectProvider(ConnectorProvider):
             
         url = self._compose_url(self.session, "get-phone-number")
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.http.get(url, headers=self.headers, timeout=30)
             if response.ok:
                 data = response.json()
                 phone = data.get("response") or data.get("phoneNumber")
@@ -351,7 +405,7 @@ class WPPConnectProvider(ConnectorProvider):
             
         url = self._compose_url(self.session, "all-contacts")
         try:
-            response = requests.get(url, headers=self.headers, timeout=60)
+            response = self.http.get(url, headers=self.headers, timeout=60)
             if response.ok:
                 data = response.json()
                 contacts = data.get("response", [])
@@ -374,7 +428,7 @@ class WPPConnectProvider(ConnectorProvider):
     def get_groups(self):
         url = self._compose_url("all-groups")
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.http.get(url, headers=self.headers, timeout=30)
             response.raise_for_status()
             response_data = response.json()
             
@@ -416,7 +470,7 @@ class WPPConnectProvider(ConnectorProvider):
         url = self._compose_url(f"group-members/{encoded_group}")
 
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.http.get(url, headers=self.headers, timeout=30)
             response.raise_for_status()
             data = response.json()
             if data.get("status") == "success":
@@ -434,7 +488,7 @@ class WPPConnectProvider(ConnectorProvider):
         
         url = self._compose_url("contact", "pn-lid", safe_identifier)
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.http.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -0,0 +1,16 @@
+from .event_queue import (
+    enqueue_event, claim_events, complete_event, fail_event, release_events,
+    requeue_stale_events
+)
+from .outbox import (
+    enqueue_message, claim_messages, complete_message, fail_message,
+    requeue_stale_messages, OutboxDispatcher, OutboundSendError
+)
+from .webhook_processor import WebhookEventProcessor
+
+__all__ = [
+    'enqueue_event', 'claim_events', 'complete_event', 'fail_event',
+    'release_events', 'requeue_stale_events', 'WebhookEventProcessor',
+    'enqueue_message', 'claim_messages', 'complete_message', 'fail_message',
+    'requeue_stale_messages', 'OutboxDispatcher', 'OutboundSendError',
+]
@@ -0,0 +1,222 @@
+"""
+Retention policy for conversation messages.
+
+``archive_messages`` moves messages older than ``MESSAGE_RETENTION_DAYS``
+out of the live Message table into gzip-compressed JSONL files under
+``MESSAGE_ARCHIVE_DIR``: one file per calendar month and run, indexed by a
+``MessageArchive`` row. Each line holds the message columns, the session
+and application of its conversation and the decompressed raw payload.
+Every conversation is written as its own gzip member and indexed by a
+``MessageArchiveSegment``, so one conversation's history is read back
+without decompressing the rest of the month.
+
+A file is fully written and flushed to disk before its messages are
+deleted; the index row and the deletes are committed together, so an
+interrupted run leaves at worst an unindexed file behind, never lost
+messages. Conversations themselves (and their memory summary) stay in
+the database; ``archived_messages`` reads their old history back on demand.
+"""
+import gzip
+import json
+import logging
+import os
+import zlib
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Message, MessageArchive, MessageArchiveSegment, MessagePayload
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = (
+    'id', 'conversation_id', 'conversation__session_id', 'conversation__application_id',
+    'direction', 'content', 'provider_message_id', 'sender_name', 'message_type', 'created_at',
+)
+
+
+def archive_root():
+    return Path(getattr(settings, 'MESSAGE_ARCHIVE_DIR', Path(settings.BASE_DIR) / 'archive'))
+
+
+def _month_bounds(moment):
+    """Start of the (local) month containing ``moment`` and of the next one."""
+    start = timezone.localtime(moment).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def archive_messages(days=None, batch_size=5000, dry_run=False):
+    """
+    Archive every message created more than ``days`` days ago.
+
+    Returns a list of ``(month, message_count, archive)`` per month
+    processed; ``archive`` is None for dry runs.
+    """
+    days = getattr(settings, 'MESSAGE_RETENTION_DAYS', 180) if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    results = []
+    since = None
+
+    while True:
+        pending = Message.objects.filter(created_at__lt=cutoff)
+        if since is not None:
+            pending = pending.filter(created_at__gte=since)
+        first = pending.order_by('created_at').values_list('created_at', flat=True).first()
+        if first is None:
+            break
+
+        start, end = _month_bounds(first)
+        end = min(end, cutoff)
+        month = timezone.localtime(start).date()
+        if dry_run:
+            count = Message.objects.filter(created_at__gte=start, created_at__lt=end).count()
+            results.append((month, count, None))
+        else:
+            archive = _archive_range(month, start, end, batch_size)
+            results.append((month, archive.message_count, archive))
+        since = end
+
+    return results
+
+
+def _archive_record(row, data):
+    return {
+        'id': row['id'],
+        'conversation_id': row['conversation_id'],
+        'session_id': row['conversation__session_id'],
+        'application_id': row['conversation__application_id'],
+        'direction': row['direction'],
+        'content': row['content'],
+        'provider_message_id': row['provider_message_id'],
+        'sender_name': row['sender_name'],
+        'message_type': row['message_type'],
+        'created_at': row['created_at'].isoformat(),
+        'payload': json.loads(zlib.decompress(bytes(data))) if data is not None else None,
+    }
+
+
+def _archive_range(month, start, end, batch_size):
+    messages = Message.objects.filter(created_at__gte=start, created_at__lt=end)
+    relative = Path(f"{month:%Y}") / f"messages-{month:%Y-%m}-{timezone.now():%Y%m%dT%H%M%S%f}.jsonl.gz"
+    path = archive_root() / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+
+    count = 0
+    first_at = last_at = None
+    # One gzip member per conversation; messages are read in
+    # (conversation_id, id) order so each member is written in one go
+    segments = []
+    last_conversation_id = last_id = 0
+    with open(temp_path, 'wb') as raw_file:
+        member = None
+        while True:
+            rows = list(
+                messages.filter(
+                    Q(conversation_id__gt=last_conversation_id)
+                    | Q(conversation_id=last_conversation_id, id__gt=last_id)
+                ).order_by('conversation_id', 'id').values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            payloads = dict(
+                MessagePayload.objects.filter(message_id__in=[row['id'] for row in rows])
+                .values_list('message_id', 'data')
+            )
+            for row in rows:
+                if member is None or row['conversation_id'] != segments[-1]['conversation_id']:
+                    if member is not None:
+                        member.close()
+                        segments[-1]['length'] = raw_file.tell() - segments[-1]['offset']
+                    segments.append({
+                        'conversation_id': row['conversation_id'],
+                        'offset': raw_file.tell(),
+                        'message_count': 0,
+                    })
+                    member = gzip.GzipFile(fileobj=raw_file, mode='wb')
+                record = _archive_record(row, payloads.get(row['id']))
+                member.write(json.dumps(record, ensure_ascii=False, default=str).encode() + b'\n')
+                segments[-1]['message_count'] += 1
+                segments[-1]['last_id'] = row['id']
+                first_at = row['created_at'] if first_at is None else min(first_at, row['created_at'])
+                last_at = row['created_at'] if last_at is None else max(last_at, row['created_at'])
+            count += len(rows)
+            last_conversation_id, last_id = rows[-1]['conversation_id'], rows[-1]['id']
+        if member is not None:
+            member.close()
+            segments[-1]['length'] = raw_file.tell() - segments[-1]['offset']
+        raw_file.flush()
+        os.fsync(raw_file.fileno())
+    os.replace(temp_path, path)
+
+    try:
+        with transaction.atomic():
+            archive = MessageArchive.objects.create(
+                month=month,
+                path=str(relative),
+                message_count=count,
+                size=path.stat().st_size,
+                first_message_at=first_at or start,
+                last_message_at=last_at or start,
+            )
+            MessageArchiveSegment.objects.bulk_create([
+                MessageArchiveSegment(
+                    archive=archive,
+                    conversation_id=segment['conversation_id'],
+                    offset=segment['offset'],
+                    length=segment['length'],
+                    message_count=segment['message_count'],
+                )
+                for segment in segments
+            ], batch_size=batch_size)
+            for segment in segments:
+                archived = messages.filter(
+                    conversation_id=segment['conversation_id'], id__lte=segment['last_id']
+                )
+                while True:
+                    ids = list(archived.values_list('id', flat=True)[:batch_size])
+                    if not ids:
+                        break
+                    Message.objects.filter(id__in=ids).delete()
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+
+    logger.info(f"Archived {count} messages of {month:%Y-%m} to {path}")
+    return archive
+
+
+def read_segment(segment):
+    """Yield the message records of one conversation's archive segment."""
+    with open(archive_root() / segment.archive.path, 'rb') as archive_file:
+        archive_file.seek(segment.offset)
+        member = archive_file.read(segment.length)
+    for line in gzip.decompress(member).decode('utf-8').splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+
+def has_archived_messages(conversation):
+    return conversation.archive_segments.exists()
+
+
+def archived_messages(conversation):
+    """
+    Return the archived messages of ``conversation``, oldest first.
+
+    Only the conversation's own segments are read, not the whole archives.
+    """
+    found = []
+    segments = conversation.archive_segments.select_related('archive').order_by('archive__month', 'archive_id')
+    for segment in segments:
+        try:
+            found.extend(read_segment(segment))
+        except OSError as e:
+            logger.error(f"Could not read message archive {segment.archive.path}: {e}")
+    found.sort(key=lambda record: (record['created_at'], record['id']))
+    return found
@@ -0,0 +1,187 @@
+"""
+Database-backed queue for inbound webhook events.
+
+WebhookView only persists the payload (``enqueue_event``); the
+``process_webhook_events`` management command claims pending rows and
+hands them to WebhookEventProcessor on a pool of worker threads.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..models import WebhookEvent
+from ..utils.common import clean_phone_number, provider_message_id
+
+logger = logging.getLogger(__name__)
+
+# How many pending rows to inspect per free worker slot when skipping busy sessions
+CLAIM_WINDOW_FACTOR = 5
+
+
+def enqueue_event(application, event, payload):
+    """
+    Persist an inbound event so a worker can pick it up.
+
+    Returns ``(event, created)``. A redelivery of a message that is already
+    queued (same provider message id) is rejected by the unique index and
+    returns the existing event with ``created`` False.
+    """
+    message_id = provider_message_id(payload)
+    try:
+        with transaction.atomic():
+            return WebhookEvent.objects.create(
+                application=application,
+                event=event or '',
+                session_id=clean_phone_number(payload.get("from")) or '',
+                provider_message_id=message_id,
+                payload=payload,
+            ), True
+    except IntegrityError:
+        if message_id is None:
+            raise
+        logger.info(f"Duplicate delivery of message {message_id} ignored")
+        return WebhookEvent.objects.filter(
+            application=application, provider_message_id=message_id
+        ).first(), False
+
+
+def claim_events(limit):
+    """
+    Atomically move up to ``limit`` due events from pending to processing.
+
+    Events are partitioned by session: an event is only claimed when every
+    earlier unfinished event of its session is claimed in the same batch,
+    so one conversation is never processed out of order or by two workers
+    at once, while different sessions are handed out freely.
+
+    ``skip_locked`` lets several worker processes poll the same table
+    without blocking each other; the conditional update guards backends
+    that ignore ``select_for_update``.
+    """
+    if limit <= 0:
+        return []
+
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(status=WebhookEvent.STATUS_PENDING, available_at__lte=now)
+            .order_by('id')
+            .values_list('id', 'session_id')[:limit * CLAIM_WINDOW_FACTOR]
+        )
+        if not candidates:
+            return []
+
+        claimed = _in_session_order(candidates, limit)
+        if not claimed:
+            return []
+
+        WebhookEvent.objects.filter(
+            id__in=claimed, status=WebhookEvent.STATUS_PENDING
+        ).update(status=WebhookEvent.STATUS_PROCESSING, started_at=now)
+
+    return list(
+        WebhookEvent.objects.select_related('application__configuration')
+        .filter(id__in=claimed, status=WebhookEvent.STATUS_PROCESSING, started_at=now)
+        .order_by('id')
+    )
+
+
+def _in_session_order(candidates, limit):
+    """
+    Pick candidate ids that are at the head of their session's backlog.
+
+    A session is blocked by any earlier event that is still processing,
+    waiting for a retry, or locked by another worker.
+    """
+    candidate_ids = {event_id for event_id, _ in candidates}
+    max_id = candidates[-1][0]
+    sessions = {session_id for _, session_id in candidates if session_id}
+
+    unfinished = {}
+    if sessions:
+        rows = (
+            WebhookEvent.objects
+            .filter(
+                session_id__in=sessions,
+                status__in=[WebhookEvent.STATUS_PENDING, WebhookEvent.STATUS_PROCESSING],
+                id__lte=max_id,
+            )
+            .order_by('id')
+            .values_list('session_id', 'id')
+        )
+        for session_id, event_id in rows:
+            unfinished.setdefault(session_id, []).append(event_id)
+
+    eligible = set()
+    for event_ids in unfinished.values():
+        for event_id in event_ids:
+            if event_id not in candidate_ids:
+                break
+            eligible.add(event_id)
+
+    claimed = []
+    for event_id, session_id in candidates:
+        if not session_id or event_id in eligible:
+            claimed.append(event_id)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def complete_event(event):
+    WebhookEvent.objects.filter(pk=event.pk).update(
+        status=WebhookEvent.STATUS_DONE,
+        processed_at=timezone.now(),
+        last_error='',
+    )
+
+
+def fail_event(event, error):
+    """Schedule a retry with exponential backoff, or give up after the last attempt."""
+    attempts = event.attempts + 1
+    max_attempts = getattr(settings, 'WEBHOOK_MAX_ATTEMPTS', 3)
+    now = timezone.now()
+
+    if attempts >= max_attempts:
+        status = WebhookEvent.STATUS_FAILED
+        available_at = now
+        logger.error(f"Webhook event {event.pk} failed permanently after {attempts} attempts: {error}")
+    else:
+        status = WebhookEvent.STATUS_PENDING
+        available_at = now + timedelta(seconds=2 ** attempts)
+        logger.warning(f"Webhook event {event.pk} failed (attempt {attempts}), retrying: {error}")
+
+    WebhookEvent.objects.filter(pk=event.pk).update(
+        status=status,
+        attempts=attempts,
+        available_at=available_at,
+        processed_at=now if status == WebhookEvent.STATUS_FAILED else None,
+        last_error=str(error)[:2000],
+    )
+
+
+def release_events(events):
+    """
+    Return claimed events to the queue untouched (no attempt is counted),
+    e.g. the events queued behind a failed one of the same session.
+    """
+    if not events:
+        return 0
+    return WebhookEvent.objects.filter(
+        id__in=[event.pk for event in events], status=WebhookEvent.STATUS_PROCESSING
+    ).update(status=WebhookEvent.STATUS_PENDING, started_at=None)
+
+
+def requeue_stale_events(timeout):
+    """Return events stuck in processing (e.g. a worker was killed) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    count = WebhookEvent.objects.filter(
+        status=WebhookEvent.STATUS_PROCESSING, started_at__lt=cutoff
+    ).update(status=WebhookEvent.STATUS_PENDING, started_at=None)
+    if count:
+        logger.warning(f"Requeued {count} stale webhook events")
+    return count
@@ -0,0 +1,217 @@
+"""
+Database-backed outbox for outbound WhatsApp messages.
+
+Callers (the send APIs and the webhook processor) only persist the
+message with ``enqueue_message``; the ``dispatch_outbound_messages``
+management command claims pending rows in batches and sends them through
+the application's provider. Each WhatsApp session (one per Application)
+gets a token bucket of ``OUTBOX_RATE`` messages per second with bursts of
+``OUTBOX_BURST``, so a flood of notifications is spread out instead of
+getting the session throttled. Failed sends are retried with exponential
+backoff up to ``OUTBOX_MAX_ATTEMPTS`` times.
+
+An ``idempotency_key`` makes enqueuing safe to repeat: the second call
+returns the message queued by the first one.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..models import OutboundMessage
+from .scheduler import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Provider method used for each kind of message
+SEND_METHODS = {
+    OutboundMessage.KIND_TEXT: 'send_whatsapp_message',
+    OutboundMessage.KIND_FILE: 'send_file',
+    OutboundMessage.KIND_LIST: 'send_list_message',
+}
+
+
+class OutboundSendError(Exception):
+    """The provider answered a send with an error."""
+
+
+def enqueue_message(application, phone, kind=OutboundMessage.KIND_TEXT, idempotency_key=None, **payload):
+    """
+    Queue a message for the dispatcher; ``payload`` holds the remaining
+    keyword arguments of the provider send method.
+
+    Returns ``(message, created)``; ``created`` is False when a message
+    with the same idempotency key was already queued.
+    """
+    idempotency_key = idempotency_key or None
+    if idempotency_key:
+        existing = OutboundMessage.objects.filter(
+            application=application, idempotency_key=idempotency_key
+        ).first()
+        if existing is not None:
+            return existing, False
+
+    try:
+        with transaction.atomic():
+            message = OutboundMessage.objects.create(
+                application=application,
+                phone=phone,
+                kind=kind,
+                payload=payload,
+                idempotency_key=idempotency_key,
+            )
+        return message, True
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        # Lost the race against a concurrent enqueue with the same key
+        return OutboundMessage.objects.get(
+            application=application, idempotency_key=idempotency_key
+        ), False
+
+
+def claim_messages(limit, exclude_applications=()):
+    """
+    Atomically move up to ``limit`` due messages from pending to sending,
+    skipping applications whose previous batch is still being sent.
+    """
+    if limit <= 0:
+        return []
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundMessage.STATUS_PENDING, available_at__lte=now)
+            .exclude(application_id__in=exclude_applications)
+            .order_by('id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        OutboundMessage.objects.filter(
+            id__in=ids, status=OutboundMessage.STATUS_PENDING
+        ).update(status=OutboundMessage.STATUS_SENDING, started_at=now)
+
+    return list(
+        OutboundMessage.objects.select_related('application__configuration')
+        .filter(id__in=ids, status=OutboundMessage.STATUS_SENDING, started_at=now)
+        .order_by('id')
+    )
+
+
+def send_message(message):
+    """Send one message through its application's provider."""
+    from ..providers import WPPConnectProvider
+
+    provider = WPPConnectProvider(message.application)
+    send = getattr(provider, SEND_METHODS[message.kind])
+    response = send(phone=message.phone, **message.payload)
+    if isinstance(response, dict) and response.get('status') == 'error':
+        raise OutboundSendError(response.get('message') or 'Provider returned an error')
+    return response
+
+
+def start_send(message):
+    """
+    Stamp ``started_at`` right before ``message`` is sent.
+
+    A claimed batch is sent at the bucket's pace, so the claim time says
+    nothing about how long one send has been running; stamping each
+    message keeps ``requeue_stale_messages`` from requeuing a send in
+    progress. Returns False when the message was already requeued (it
+    waited past the stale timeout) and must not be sent from this batch.
+    """
+    return bool(
+        OutboundMessage.objects.filter(
+            pk=message.pk, status=OutboundMessage.STATUS_SENDING
+        ).update(started_at=timezone.now())
+    )
+
+
+def complete_message(message, response=None):
+    OutboundMessage.objects.filter(pk=message.pk).update(
+        status=OutboundMessage.STATUS_SENT,
+        attempts=message.attempts + 1,
+        sent_at=timezone.now(),
+        response=response if isinstance(response, (dict, list)) else None,
+        last_error='',
+    )
+
+
+def fail_message(message, error):
+    """Schedule a retry with exponential backoff, or give up after the last attempt."""
+    attempts = message.attempts + 1
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+    now = timezone.now()
+
+    if attempts >= max_attempts:
+        status = OutboundMessage.STATUS_FAILED
+        available_at = now
+        logger.error(f"Outbound message {message.pk} failed permanently after {attempts} attempts: {error}")
+    else:
+        status = OutboundMessage.STATUS_PENDING
+        delay = min(
+            getattr(settings, 'OUTBOX_RETRY_BACKOFF', 2) * 2 ** (attempts - 1),
+            getattr(settings, 'OUTBOX_MAX_BACKOFF', 300),
+        )
+        available_at = now + timedelta(seconds=delay)
+        logger.warning(f"Outbound message {message.pk} failed (attempt {attempts}), retrying in {delay}s: {error}")
+
+    OutboundMessage.objects.filter(pk=message.pk).update(
+        status=status,
+        attempts=attempts,
+        available_at=available_at,
+        last_error=str(error)[:2000],
+    )
+
+
+def requeue_stale_messages(timeout):
+    """Return messages stuck in sending (e.g. a dispatcher was killed) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    count = OutboundMessage.objects.filter(
+        status=OutboundMessage.STATUS_SENDING, started_at__lt=cutoff
+    ).update(status=OutboundMessage.STATUS_PENDING, started_at=None)
+    if count:
+        logger.warning(f"Requeued {count} stale outbound messages")
+    return count
+
+
+class OutboxDispatcher:
+    """
+    Send claimed messages, pacing each application with its own token bucket.
+    """
+
+    def __init__(self, rate=None, burst=None, sender=send_message):
+        self.rate = rate if rate is not None else getattr(settings, 'OUTBOX_RATE', 1.0)
+        self.burst = burst if burst is not None else getattr(settings, 'OUTBOX_BURST', 5)
+        self.sender = sender
+        self._buckets = {}
+
+    def bucket(self, application_id):
+        bucket = self._buckets.get(application_id)
+        if bucket is None:
+            bucket = self._buckets[application_id] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def send_batch(self, messages):
+        """
+        Send messages of one application in order, waiting for a token
+        before each one.
+        """
+        for message in messages:
+            wait = self.bucket(message.application_id).reserve()
+            if wait:
+                time.sleep(wait)
+            if not start_send(message):
+                logger.info(f"Outbound message {message.pk} was requeued while waiting, skipping")
+                continue
+            try:
+                response = self.sender(message)
+            except Exception as e:
+                fail_message(message, e)
+            else:
+                complete_message(message, response)
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedExecutor:
+    """
+    Thread pool that runs tasks sharing a key one after another, in
+    submission order, while tasks with different keys run concurrently.
+
+    Webhook events are keyed by ``Conversation.session_id`` so replies to
+    one customer never overtake each other, and a slow agent call for one
+    phone number does not hold up anybody else.
+    """
+
+    def __init__(self, max_workers, thread_name_prefix='keyed'):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._lanes = {}
+        self._pending = 0
+
+    @property
+    def pending(self):
+        """Number of submitted tasks that have not finished yet."""
+        return self._pending
+
+    @property
+    def busy_keys(self):
+        """Keys that still have queued or running tasks."""
+        with self._lock:
+            return set(self._lanes)
+
+    def submit(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self._pending += 1
+            lane = self._lanes.get(key)
+            if lane is not None:
+                # A runner is already draining this key; it will pick the task up
+                lane.append((fn, args, kwargs))
+                return
+            self._lanes[key] = deque([(fn, args, kwargs)])
+        self._pool.submit(self._drain, key)
+
+    def _drain(self, key):
+        while True:
+            with self._lock:
+                lane = self._lanes[key]
+                if not lane:
+                    del self._lanes[key]
+                    return
+                fn, args, kwargs = lane.popleft()
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                # Keep draining the lane; one bad task must not stall the key
+                logger.exception(f"Task for key {key} raised an error")
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    self._idle.notify_all()
+
+    def wait(self, timeout=None, below=None):
+        """Block until fewer than ``below`` tasks are pending (default: all done) or ``timeout`` expires."""
+        limit = 1 if below is None else below
+        with self._lock:
+            return self._idle.wait_for(lambda: self._pending < limit, timeout=timeout)
+
+    def shutdown(self):
+        self.wait()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: ``rate`` tokens per second, up to ``burst``
+    saved up. ``reserve`` always succeeds and returns how long the caller
+    must wait before acting, so concurrent callers queue up fairly.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return the seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
@@ -0,0 +1,314 @@
+import asyncio
+import logging
+import weakref
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+
+from ..models import Conversation, Message, MessagePayload, OutboundMessage
+from ..utils.common import clean_phone_number, provider_message_id
+from .outbox import enqueue_message
+
+logger = logging.getLogger(__name__)
+
+AGENT_ERROR_REPLY = "⚠️ عذراً، حدث خطأ في معالجة طلبك."
+
+# One pooled client per event loop: httpx clients cannot be shared across loops
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_http_client():
+    """Return the keep-alive httpx client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = httpx.AsyncClient(timeout=30)
+    return client
+
+
+async def close_async_http_client():
+    """Close the client of the running event loop (e.g. on worker shutdown)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class WebhookEventProcessor:
+    """
+    Handles a queued WPPConnect webhook event: logs the conversation,
+    resolves a reply (Flow AI, accounting agent or auto-reply) and queues
+    it in the outbox.
+
+    ``aprocess`` is the asyncio variant used by ``process_webhook_events
+    --async``: Flow AI and the agent's LLM call are awaited instead of
+    holding a thread, so one process can wait on many replies at once.
+    """
+
+    def process(self, webhook_event):
+        application = webhook_event.application
+        if not application.enabled:
+            logger.info(f"Skipping event {webhook_event.pk}: application {application.name} is disabled")
+            return
+
+        if webhook_event.event == "onmessage":
+            self.handle_message(
+                application, webhook_event.payload,
+                event_id=webhook_event.pk, retry=webhook_event.attempts > 0
+            )
+
+    async def aprocess(self, webhook_event):
+        application = webhook_event.application
+        if not application.enabled:
+            logger.info(f"Skipping event {webhook_event.pk}: application {application.name} is disabled")
+            return
+
+        if webhook_event.event == "onmessage":
+            await self.ahandle_message(
+                application, webhook_event.payload,
+                event_id=webhook_event.pk, retry=webhook_event.attempts > 0
+            )
+
+    def handle_message(self, application, data, event_id=None, retry=False):
+        phone = clean_phone_number(data.get("from"))
+        message_body = (data.get("body") or "").strip()
+        if not phone:
+            return
+
+        reply_key = f"reply:{event_id}" if event_id else None
+        logged, conversation = self.log_incoming(application, phone, message_body, data, reply_key, retry)
+        if not logged:
+            return
+
+        # Determine response
+        response_text = None
+
+        # 1. Flow AI Integration
+        if application.flow_ai and application.flow_url:
+            response_text = self.process_flow_ai_message(application, message_body, phone, data)
+
+        # 2. Accounting Agent Integration (Fallback if Flow AI not enabled or returned None)
+        if not response_text and application.use_accounting_agent:
+            from ..agent.factories import AIAgentFactory
+            try:
+                agent = AIAgentFactory.create()
+                response_text = agent.process_message(
+                    message_body, session_id=phone, conversation=conversation
+                )
+            except Exception as e:
+                logger.error(f"Agent processing failed: {e}")
+                response_text = AGENT_ERROR_REPLY
+
+        # 3. Default Auto-Reply
+        if not response_text:
+            response_text = self.auto_reply(application, message_body)
+
+        if response_text:
+            self.queue_reply(application, phone, data, conversation, response_text, reply_key)
+
+    async def ahandle_message(self, application, data, event_id=None, retry=False):
+        """Async variant of ``handle_message``; database work runs in a thread."""
+        phone = clean_phone_number(data.get("from"))
+        message_body = (data.get("body") or "").strip()
+        if not phone:
+            return
+
+        reply_key = f"reply:{event_id}" if event_id else None
+        logged, conversation = await sync_to_async(self.log_incoming)(
+            application, phone, message_body, data, reply_key, retry
+        )
+        if not logged:
+            return
+
+        response_text = None
+        if application.flow_ai and application.flow_url:
+            response_text = await self.aprocess_flow_ai_message(application, message_body, phone, data)
+
+        if not response_text and application.use_accounting_agent:
+            from ..agent.factories import AIAgentFactory
+            try:
+                agent = AIAgentFactory.create()
+                response_text = await agent.aprocess_message(
+                    message_body, session_id=phone, conversation=conversation
+                )
+            except Exception as e:
+                logger.error(f"Agent processing failed: {e}")
+                response_text = AGENT_ERROR_REPLY
+
+        if not response_text:
+            response_text = self.auto_reply(application, message_body)
+
+        if response_text:
+            await sync_to_async(self.queue_reply)(
+                application, phone, data, conversation, response_text, reply_key
+            )
+
+    def log_incoming(self, application, phone, message_body, data, reply_key, retry):
+        """
+        Record the inbound message in its conversation.
+
+        Returns ``(logged, conversation)``; ``logged`` is False when the
+        message must not be answered (a duplicate, or a retry whose reply
+        is already queued).
+        """
+        if retry and reply_key and OutboundMessage.objects.filter(
+            application=application, idempotency_key=reply_key
+        ).exists():
+            # The reply was already queued before the failure
+            return False, None
+
+        conversation = None
+        message_id = provider_message_id(data)
+        try:
+            sender = data.get("sender") or {}
+            # Upserting the conversation and inserting the message commit
+            # together; a duplicate message rolls back the activity bump.
+            with transaction.atomic():
+                conversation = Conversation.touch(application, phone, user_identifier=phone)
+                message = Message.objects.create(
+                    conversation=conversation,
+                    direction='incoming',
+                    content=message_body,
+                    provider_message_id=message_id,
+                    sender_name=(sender.get("name") or sender.get("pushname") or data.get("notifyName") or "")[:255],
+                    message_type=(data.get("type") or "")[:30],
+                )
+                MessagePayload.for_message(message, data).save(force_insert=True)
+        except IntegrityError:
+            # Already logged: a redelivery that reached the queue twice.
+            # A retry of this same event still needs its reply.
+            if not retry:
+                logger.info(f"Duplicate message {message_id} from {phone} skipped")
+                return False, None
+        except Exception as e:
+            # The transaction rolled back, possibly including a new conversation
+            conversation = None
+            logger.error(f"Failed to log message: {e}")
+        return True, conversation
+
+    def auto_reply(self, application, message_body):
+        """Default reply when neither Flow AI nor the agent is enabled."""
+        if not application.flow_ai and not application.use_accounting_agent:
+            return "وعليكم السلام" if "سلام" in message_body.lower() else None
+        return None
+
+    def queue_reply(self, application, phone, data, conversation, response_text, reply_key):
+        if conversation is not None:
+            try:
+                Message.objects.create(
+                    conversation=conversation,
+                    direction='outgoing',
+                    content=response_text
+                )
+            except Exception as e:
+                logger.error(f"Failed to log reply: {e}")
+
+        # Keyed by the webhook event so a retried event never queues the reply twice
+        outbound, created = enqueue_message(
+            application,
+            phone,
+            idempotency_key=reply_key,
+            is_group=data.get("isGroupMsg", False),
+            is_newsletter=False,
+            message=response_text
+        )
+        logger.info(f"Response to {phone} queued as outbound message {outbound.pk}")
+
+    def process_flow_ai_message(self, application, message_body, phone, message_data=None):
+        """Send message to Flow AI and get response."""
+        flow_id = application.flow_id
+        try:
+            request = self._flow_ai_request(application, message_body, phone, message_data)
+            if request is None:
+                return None
+            api_url, payload, headers = request
+
+            logger.info(f"Sending to Flow AI: {api_url}")
+            response = requests.post(api_url, json=payload, headers=headers, timeout=30)
+            response.raise_for_status()
+            return self._flow_ai_text(response.json())
+
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"Flowise HTTP error: {e} - Status: {e.response.status_code} - Response: {e.response.text}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Flowise request failed (Flow ID: {flow_id}): {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Flow AI processing failed: {e}")
+            return None
+
+    async def aprocess_flow_ai_message(self, application, message_body, phone, message_data=None):
+        """Async variant of ``process_flow_ai_message`` using the loop's httpx client."""
+        flow_id = application.flow_id
+        try:
+            request = self._flow_ai_request(application, message_body, phone, message_data)
+            if request is None:
+                return None
+            api_url, payload, headers = request
+
+            logger.info(f"Sending to Flow AI: {api_url}")
+            response = await get_async_http_client().post(api_url, json=payload, headers=headers)
+            response.raise_for_status()
+            return self._flow_ai_text(response.json())
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Flowise HTTP error: {e} - Status: {e.response.status_code} - Response: {e.response.text}")
+            return None
+        except httpx.RequestError as e:
+            logger.error(f"Flowise request failed (Flow ID: {flow_id}): {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Flow AI processing failed: {e}")
+            return None
+
+    def _flow_ai_request(self, application, message_body, phone, message_data=None):
+        """Return ``(url, payload, headers)`` of the Flow AI prediction call, or None."""
+        flow_id = application.flow_id
+        # Construct URL: base_url + /api/v1/prediction/ + flow_id
+        base_url = application.flow_url.rstrip('/')
+
+        if not flow_id:
+            logger.error("Flow ID is missing")
+            return None
+
+        api_url = f"{base_url}/api/v1/prediction/{flow_id}"
+
+        # Extract sender name
+        user_name = phone
+        if message_data:
+            sender_data = message_data.get("sender") or {}
+            user_name = (
+                sender_data.get("name")
+                or sender_data.get("pushname")
+                or sender_data.get("notifyName")
+                or phone
+            )
+
+        payload = {
+            "question": message_body,
+            "chatId": phone,
+            "overrideConfig": {
+                "sessionId": phone,
+                "vars": {
+                    "user_name": user_name
+                }
+            }
+        }
+        # Add socketIOClientId for some Flowise versions
+        payload["socketIOClientId"] = phone
+        headers = {"Content-Type": "application/json"}
+        flow_token = application.decrypted_flow_token
+        if flow_token:
+            headers["Authorization"] = f"Bearer {flow_token}"
+        return api_url, payload, headers
+
+    def _flow_ai_text(self, data):
+        if isinstance(data, dict):
+            # Handle standard Flowise response formats
+            text = data.get("text") or data.get("message") or data.get("response")
+            if isinstance(text, dict): # Sometimes it's nested
+                text = text.get("text") or str(text)
+            return text
+        return str(data)
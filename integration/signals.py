@@ -0,0 +1,43 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import Customer, Vendor
+from bills.models import Bill
+from store.models import Category, Item, StockMovement
+from transactions.models import Purchase, Sale, SaleDetail
+from .agent.cache import bump_generation
+from .models import ApplicationConfiguration
+from .utils.encrypted_fields import EncryptedMixin
+
+# Models read by cached agent tools (see integration.agent.cache)
+TOOL_CACHE_MODELS = [
+    Sale, SaleDetail, Purchase, Item, Category, StockMovement,
+    Customer, Vendor, Bill,
+]
+
+
+@receiver(post_save, sender=ApplicationConfiguration)
+@receiver(post_delete, sender=ApplicationConfiguration)
+def invalidate_secret_cache(sender, instance, **kwargs):
+    """
+    Drop cached keys and decrypted secrets when a configuration changes.
+    """
+    EncryptedMixin.clear_cache()
+
+
+def invalidate_tool_cache(sender, **kwargs):
+    """
+    Expire cached agent tool answers that read the changed model.
+    """
+    bump_generation(sender._meta.label)
+
+
+for model in TOOL_CACHE_MODELS:
+    post_save.connect(
+        invalidate_tool_cache, sender=model,
+        dispatch_uid=f"tool_cache_save_{model._meta.label}"
+    )
+    post_delete.connect(
+        invalidate_tool_cache, sender=model,
+        dispatch_uid=f"tool_cache_delete_{model._meta.label}"
+    )
@@ -0,0 +1,77 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from langchain_core.messages import AIMessage
+
+from ..agent.factories import AccountingAgent, AIAgentFactory
+from ..models import AgentMetric
+
+
+class FakeAgentGraph:
+    """Stands in for the LangGraph agent and tracks concurrent calls."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def ainvoke(self, state, config=None):
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        question = state['messages'][-1].content
+        return {'messages': [AIMessage(content=f'answer to {question}')]}
+
+
+class AsyncProcessMessageTests(TestCase):
+
+    def setUp(self):
+        self.graph = FakeAgentGraph()
+        self.agent = AccountingAgent(llm=None, tools=AIAgentFactory.create_tools(), system_prompt='You are an accountant.')
+        self.agent.agent_for = lambda tools: self.graph
+
+    def ask(self, *questions):
+        async def ask_all():
+            return await asyncio.gather(*(self.agent.aprocess_message(question) for question in questions))
+        return async_to_sync(ask_all)()
+
+    @override_settings(AGENT_MAX_CONCURRENT_LLM_CALLS=2)
+    def test_llm_calls_are_bounded_per_event_loop(self):
+        questions = [f'question {n}' for n in range(6)]
+
+        answers = self.ask(*questions)
+
+        self.assertEqual(answers, [f'answer to {question}' for question in questions])
+        self.assertEqual(self.graph.calls, 6)
+        self.assertEqual(self.graph.peak, 2)
+
+    @override_settings(AGENT_MAX_CONCURRENT_LLM_CALLS=10)
+    def test_calls_overlap_below_the_limit(self):
+        self.ask(*[f'question {n}' for n in range(4)])
+
+        self.assertEqual(self.graph.peak, 4)
+
+    def test_conversational_messages_skip_the_llm(self):
+        [answer] = self.ask('شكرا')
+
+        self.assertTrue(answer)
+        self.assertEqual(self.graph.calls, 0)
+        self.assertEqual(AgentMetric.objects.get(kind='message').name, 'conversational')
+
+    def test_llm_error_is_answered_and_recorded(self):
+        async def fail(state, config=None):
+            raise RuntimeError('429 Too Many Requests')
+        self.graph.ainvoke = fail
+
+        with self.assertLogs('integration', 'ERROR'):
+            [answer] = self.ask('question')
+
+        self.assertIn('30', answer)
+        metric = AgentMetric.objects.get(kind='message')
+        self.assertEqual((metric.name, metric.error), ('llm', '429 Too Many Requests'))
@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from store.models import Category
+
+from ..agent.cache import bump_generation, cache_stats, cached_tool, get_cache
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'agent_tools': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'agent-tool-cache-tests',
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedToolTests(TestCase):
+
+    def setUp(self):
+        get_cache().clear()
+        self.calls = []
+
+        @cached_tool('store.Category')
+        def list_categories(name: str = '') -> str:
+            self.calls.append(name)
+            return ', '.join(Category.objects.filter(name__icontains=name).values_list('name', flat=True))
+
+        self.list_categories = list_categories
+
+    def test_repeated_calls_are_served_from_the_cache(self):
+        Category.objects.create(name='Paper')
+        before = cache_stats()['by_tool'].get('list_categories', {'hits': 0, 'misses': 0})
+
+        self.assertEqual(self.list_categories(), 'Paper')
+        self.assertEqual(self.list_categories(), 'Paper')
+
+        self.assertEqual(self.calls, [''])
+        after = cache_stats()['by_tool']['list_categories']
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+    def test_arguments_are_normalized(self):
+        self.list_categories('Paper')
+        self.list_categories(name='  PAPER ')
+
+        self.assertEqual(self.calls, ['Paper'])
+
+    def test_write_invalidates_after_commit(self):
+        self.assertEqual(self.list_categories(), '')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Ink')
+            # Not committed yet: the cached answer still stands
+            self.assertEqual(self.list_categories(), '')
+
+        self.assertEqual(self.list_categories(), 'Ink')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_bump_generation_misses_even_after_the_counter_was_cleared(self):
+        self.list_categories()
+        get_cache().delete('agent_tool:gen:store.Category')
+        self.list_categories()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation('store.Category')
+        self.list_categories()
+
+        self.assertEqual(len(self.calls), 3)
+
+    def test_unrelated_model_keeps_the_entry(self):
+        self.list_categories()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation('store.Item')
+        self.list_categories()
+
+        self.assertEqual(len(self.calls), 1)
+
+    def test_cache_outage_falls_back_to_the_tool(self):
+        with mock.patch.object(get_cache(), 'get_many', side_effect=ConnectionError('cache down')):
+            with self.assertLogs('integration', 'WARNING'):
+                self.assertEqual(self.list_categories(), '')
+
+        self.assertEqual(self.calls, [''])
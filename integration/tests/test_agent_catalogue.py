@@ -0,0 +1,66 @@
+from django.test import TestCase
+
+from store.models import Category, Item, StockMovement
+from store.stock import move_stock
+
+from ..agent.catalogue import CatalogueSnapshot
+
+
+class CatalogueSnapshotTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Stationery')
+        for name, price in (('قلم أزرق جاف', 2), ('قلم', 1), ('Blue pen refill', 3), ('Pencil', 1)):
+            Item.objects.create(name=name, description='', category=cls.category, quantity=10, price=price)
+
+    def setUp(self):
+        self.catalogue = CatalogueSnapshot(refresh_interval=0)
+
+    def names(self, term, limit=10):
+        return [entry.name for entry in self.catalogue.search(term, limit)]
+
+    def test_exact_then_prefix_then_shortest(self):
+        self.assertEqual(self.names('قلم'), ['قلم', 'قلم أزرق جاف'])
+        self.assertEqual(self.names('pen'), ['Pencil', 'Blue pen refill'])
+
+    def test_every_word_must_match_after_normalization(self):
+        # Alef variants and case are folded
+        self.assertEqual(self.names('ازرق قلم'), ['قلم أزرق جاف'])
+        self.assertEqual(self.names('BLUE refill'), ['Blue pen refill'])
+        self.assertEqual(self.names('blue pencil'), [])
+        self.assertEqual(self.names('  '), [])
+
+    def test_resolve_returns_the_best_entry(self):
+        entry = self.catalogue.resolve('قلم')
+
+        self.assertEqual((entry.name, entry.price, entry.quantity, entry.category), ('قلم', 1.0, 10, 'Stationery'))
+        self.assertIsNone(self.catalogue.resolve('stapler'))
+
+    def test_refresh_picks_up_new_and_changed_items(self):
+        self.catalogue.refresh()
+        version = self.catalogue.version
+        pencil = Item.objects.get(name='Pencil')
+
+        Item.objects.create(name='Stapler', description='', category=self.category, quantity=1, price=7)
+        move_stock(pencil, -4, StockMovement.REASON_SALE)
+
+        self.assertEqual(self.catalogue.resolve('stapler').price, 7.0)
+        self.assertEqual(self.catalogue.resolve('pencil').quantity, 6)
+        self.assertEqual(self.catalogue.version, version + 1)
+        self.assertEqual(len(self.catalogue), 5)
+
+    def test_deleted_items_trigger_a_full_reload(self):
+        self.catalogue.refresh()
+        Item.objects.filter(name='Pencil').delete()
+
+        self.assertEqual(self.names('pen'), ['Blue pen refill'])
+        self.assertEqual(len(self.catalogue), 3)
+
+    def test_unchanged_catalogue_keeps_its_version(self):
+        self.catalogue.refresh()
+        version = self.catalogue.version
+
+        self.catalogue.refresh()
+
+        self.assertEqual(self.catalogue.version, version)
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..agent.memory import estimate_tokens, load_memory
+from ..models import Conversation, Message
+from .utils import create_application
+
+
+@override_settings(AGENT_MEMORY_MAX_MESSAGES=4, AGENT_MEMORY_TOKEN_BUDGET=1500, AGENT_MEMORY_SUMMARY_TOKENS=300)
+class LoadMemoryTests(TestCase):
+
+    def setUp(self):
+        self.conversation = Conversation.touch(create_application(), '967700000001')
+        self.started = timezone.now() - timedelta(hours=1)
+        self.count = 0
+
+    def say(self, *contents):
+        """Log alternating user/assistant messages a minute apart."""
+        for content in contents:
+            direction = 'incoming' if self.count % 2 == 0 else 'outgoing'
+            message = Message.objects.create(conversation=self.conversation, direction=direction, content=content)
+            Message.objects.filter(pk=message.pk).update(created_at=self.started + timedelta(minutes=self.count))
+            self.count += 1
+
+    def test_short_conversation_fits_in_the_window(self):
+        self.say('مرحبا', 'أهلا، كيف أساعدك؟', 'مبيعات اليوم')
+
+        memory = load_memory('967700000001', current_message='مبيعات اليوم')
+
+        # The message being answered is not replayed
+        self.assertEqual(memory.window, [('incoming', 'مرحبا'), ('outgoing', 'أهلا، كيف أساعدك؟')])
+        self.assertEqual(memory.summary, '')
+        self.conversation.refresh_from_db()
+        self.assertIsNone(self.conversation.summary_until)
+
+    def test_overflow_is_folded_into_the_summary(self):
+        self.say('one', 'two', 'three', 'four', 'five', 'six', 'seven')
+
+        memory = load_memory('967700000001')
+
+        self.assertEqual([content for _, content in memory.window], ['four', 'five', 'six', 'seven'])
+        self.assertEqual(memory.summary, 'User: one\nAssistant: two\nUser: three')
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.summary, memory.summary)
+        self.assertEqual(self.conversation.summary_until, self.started + timedelta(minutes=2))
+
+        # Folded messages are not folded again; newer overflow is appended
+        self.say('eight', 'nine')
+        memory = load_memory('967700000001')
+
+        self.assertEqual([content for _, content in memory.window], ['six', 'seven', 'eight', 'nine'])
+        self.assertEqual(memory.summary, 'User: one\nAssistant: two\nUser: three\nAssistant: four\nUser: five')
+
+    def test_token_budget_limits_the_window(self):
+        long = 'x' * 400
+        self.say('first', long, long)
+
+        with self.settings(AGENT_MEMORY_TOKEN_BUDGET=estimate_tokens(long) * 2):
+            memory = load_memory('967700000001')
+
+        self.assertEqual(memory.window, [('outgoing', long), ('incoming', long)])
+        self.assertEqual(memory.summary, 'User: first')
+
+    def test_summary_keeps_the_newest_lines_within_its_budget(self):
+        self.say(*[f'message {n}' for n in range(10)])
+
+        budget = estimate_tokens('User: message 4') + estimate_tokens('Assistant: message 5')
+        with self.settings(AGENT_MEMORY_SUMMARY_TOKENS=budget):
+            memory = load_memory('967700000001')
+
+        self.assertEqual(memory.summary, 'User: message 4\nAssistant: message 5')
+
+    def test_unknown_session(self):
+        self.assertIsNone(load_memory('nobody'))
+        self.assertIsNone(load_memory(''))
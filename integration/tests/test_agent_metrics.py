@@ -0,0 +1,76 @@
+from django.test import TestCase, override_settings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.tools import tool
+
+from ..agent.instrumentation import AgentMetricsHandler
+from ..models import AgentMetric
+
+
+@tool
+def lookup_price(name: str) -> str:
+    """Return the price of an item."""
+    return f'{name}: 10'
+
+
+@tool
+def broken_tool(name: str) -> str:
+    """Always fails."""
+    raise ValueError('database is down')
+
+
+def fake_llm(*replies):
+    return GenericFakeChatModel(messages=iter(replies))
+
+
+class AgentMetricsHandlerTests(TestCase):
+
+    def setUp(self):
+        self.metrics = AgentMetricsHandler('967700000001')
+
+    def test_records_llm_and_tool_steps_with_totals(self):
+        config = {'callbacks': [self.metrics]}
+        reply = AIMessage(content='ok', usage_metadata={'input_tokens': 120, 'output_tokens': 30, 'total_tokens': 150})
+        fake_llm(reply).invoke('price of paper?', config=config)
+        lookup_price.invoke({'name': 'paper'}, config=config)
+        self.metrics.route = 'llm'
+
+        self.metrics.save()
+
+        message = AgentMetric.objects.get(kind=AgentMetric.KIND_MESSAGE)
+        self.assertEqual(message.name, 'llm')
+        self.assertEqual(message.session_id, '967700000001')
+        self.assertEqual((message.prompt_tokens, message.completion_tokens), (120, 30))
+        self.assertEqual((message.llm_calls, message.tool_calls), (1, 1))
+        steps = AgentMetric.objects.filter(run_id=message.run_id).exclude(kind=AgentMetric.KIND_MESSAGE)
+        self.assertEqual(
+            sorted(steps.values_list('kind', 'name', 'prompt_tokens')),
+            [('llm', 'GenericFakeChatModel', 120), ('tool', 'lookup_price', 0)],
+        )
+
+    def test_records_tool_errors(self):
+        with self.assertRaises(ValueError):
+            broken_tool.invoke({'name': 'paper'}, config={'callbacks': [self.metrics]})
+
+        self.assertEqual(self.metrics.steps[0]['error'], 'database is down')
+        self.assertEqual(self.metrics.steps[0]['kind'], 'tool')
+
+    def test_falls_back_to_provider_token_usage(self):
+        self.metrics.on_llm_start({'name': 'ChatOpenAI'}, ['hi'], run_id='run', invocation_params={'model': 'gpt-4o'})
+        response = LLMResult(
+            generations=[[ChatGeneration(message=AIMessage(content='ok'))]],
+            llm_output={'token_usage': {'prompt_tokens': 7, 'completion_tokens': 3}},
+        )
+        self.metrics.on_llm_end(response, run_id='run')
+
+        [step] = self.metrics.steps
+        self.assertEqual((step['name'], step['prompt_tokens'], step['completion_tokens']), ('gpt-4o', 7, 3))
+
+    @override_settings(AGENT_METRICS_ENABLED=False)
+    def test_disabled_metrics_are_not_saved(self):
+        self.metrics.route = 'router'
+        with self.assertLogs('integration', 'INFO'):
+            self.metrics.save()
+
+        self.assertFalse(AgentMetric.objects.exists())
@@ -0,0 +1,78 @@
+from django.test import SimpleTestCase
+from langchain_core.tools import tool
+
+from ..agent.factories import AIAgentFactory
+from ..agent.router import IntentRouter
+
+
+@tool
+def get_today_sales() -> str:
+    """Today's sales."""
+    return 'sales: 100'
+
+
+@tool
+def get_monthly_sales(month: int = None, year: int = None) -> str:
+    """Sales of a month."""
+    raise RuntimeError('database is down')
+
+
+class IntentMatchTests(SimpleTestCase):
+    """Matching against the real intents and tools."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.router = IntentRouter(AIAgentFactory.create_tools())
+
+    def test_whole_message_intents(self):
+        for message in ('مبيعات اليوم', 'كم مبيعات اليوم؟', 'Show low stock', 'الملخص المالي!'):
+            with self.subTest(message=message):
+                self.assertIsNotNone(self.router.match(message))
+
+        self.assertEqual(self.router.match('كم مبيعات اليوم؟'), ('get_today_sales', {}))
+        self.assertEqual(self.router.match('low stock'), ('get_low_stock_products', {}))
+
+    def test_pattern_groups_become_arguments(self):
+        self.assertEqual(
+            self.router.match('مبيعات شهر 3 لسنة 2024'), ('get_monthly_sales', {'month': 3, 'year': 2024})
+        )
+        self.assertEqual(self.router.match('sales for month 11'), ('get_monthly_sales', {'month': 11}))
+
+    def test_more_specific_messages_go_to_the_llm(self):
+        for message in ('مبيعات اليوم لعميل محمد', 'how were sales today compared to yesterday', ''):
+            with self.subTest(message=message):
+                self.assertIsNone(self.router.match(message))
+
+
+class IntentRouteTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = IntentRouter(
+            [get_today_sales, get_monthly_sales],
+            intents={
+                'get_today_sales': {'keywords': ['today sales']},
+                'get_monthly_sales': {'patterns': [r'sales month (?P<month>\d{1,2})']},
+            },
+            prefixes=['show'],
+        )
+
+    def test_routes_to_the_tool_and_counts_hits(self):
+        self.assertEqual(self.router.route('show today sales'), 'sales: 100')
+        self.assertIsNone(self.router.route('what did we sell to Ali'))
+
+        self.assertEqual(self.router.stats(), {
+            'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'by_intent': {'get_today_sales': 1},
+        })
+
+    def test_failing_tool_falls_back_to_the_llm(self):
+        with self.assertLogs('integration', 'ERROR'):
+            self.assertIsNone(self.router.route('sales month 3'))
+
+        self.assertEqual(self.router.stats()['misses'], 1)
+
+    def test_intents_for_unknown_tools_are_ignored(self):
+        with self.assertLogs('integration', 'WARNING'):
+            router = IntentRouter([get_today_sales], intents={'get_vendors': {'keywords': ['vendors']}})
+
+        self.assertIsNone(router.match('vendors'))
@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from ..agent.factories import AIAgentFactory
+from ..agent.toolsets import ToolSelector
+
+
+class ToolSelectorTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tools = AIAgentFactory.create_tools()
+        cls.selector = ToolSelector(cls.tools)
+
+    def names(self, message, previous=None):
+        return [tool.name for tool in self.selector.select(message, previous)]
+
+    def test_offers_the_matching_category_and_core_tools(self):
+        self.assertEqual(self.names('كم مبيعات الشهر؟'), [
+            'get_today_sales', 'get_monthly_sales', 'get_yearly_sales',
+            'get_top_selling_products', 'get_financial_summary',
+            'search_item', 'get_user_preferences', 'set_display_format',
+        ])
+
+    def test_attached_particles_and_spelling_variants_match(self):
+        # "والعملاء" (and the customers) with a prefix, "فاتورة" with ta marbuta
+        self.assertIn('get_best_customers', self.names('والعملاء'))
+        self.assertIn('get_customer_invoices', self.names('فاتورة محمد'))
+
+    def test_follow_up_keeps_the_previous_context(self):
+        names = self.names('وكم سعره؟', previous='هل عندكم ورق طباعة في المخزون')
+
+        self.assertIn('get_low_stock_products', names)
+        self.assertNotIn('manage_sale', names)
+
+    def test_unmatched_message_gets_every_tool(self):
+        self.assertEqual(self.names('hmm'), [tool.name for tool in self.tools])
+
+    def test_selection_keeps_the_original_tool_order(self):
+        names = self.names('sell to a customer')
+        order = [tool.name for tool in self.tools]
+
+        self.assertEqual(names, sorted(names, key=order.index))
+        self.assertIn('manage_sale', names)
+        self.assertIn('get_customer_details', names)
+        self.assertNotIn('get_vendors', names)
@@ -0,0 +1,48 @@
+import tempfile
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Conversation, Message, MessageArchive
+from ..services.archive import archive_messages, archived_messages, has_archived_messages
+from .utils import create_application
+
+
+class ArchiveMessagesTests(TestCase):
+
+    def setUp(self):
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        settings = override_settings(MESSAGE_ARCHIVE_DIR=archive_dir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        application = create_application()
+        self.conversation = Conversation.touch(application, '111')
+        self.other = Conversation.touch(application, '222')
+        old = timezone.now() - timedelta(days=400)
+        for n, conversation in enumerate([self.conversation, self.other, self.conversation]):
+            message = Message.objects.create(conversation=conversation, direction='incoming', content=f'old {n}')
+            Message.objects.filter(pk=message.pk).update(created_at=old + timedelta(minutes=n))
+        Message.objects.create(conversation=self.conversation, direction='incoming', content='recent')
+
+    def test_reads_back_only_the_conversation_segment(self):
+        [(_, count, archive)] = archive_messages(days=180)
+
+        self.assertEqual(count, 3)
+        self.assertEqual(archive.segments.count(), 2)
+        self.assertEqual(list(Message.objects.values_list('content', flat=True)), ['recent'])
+        self.assertTrue(has_archived_messages(self.conversation))
+        self.assertEqual(
+            [record['content'] for record in archived_messages(self.conversation)], ['old 0', 'old 2']
+        )
+        self.assertEqual([record['content'] for record in archived_messages(self.other)], ['old 1'])
+
+    def test_conversation_without_segments_has_no_archive(self):
+        archive_messages(days=180)
+        # An archive whose time range covers the conversation is not scanned
+        MessageArchive.objects.get().segments.filter(conversation=self.other).delete()
+
+        self.assertFalse(has_archived_messages(self.other))
+        self.assertEqual(archived_messages(self.other), [])
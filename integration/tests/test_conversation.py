@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Conversation
+from .utils import create_application
+
+
+class ConversationTouchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def test_creates_the_conversation(self):
+        with self.assertNumQueries(2):
+            conversation = Conversation.touch(self.application, '967700000001', user_identifier='967700000001')
+
+        self.assertIsNotNone(conversation.pk)
+        self.assertEqual(conversation.application, self.application)
+        self.assertEqual(conversation.session_id, '967700000001')
+        self.assertEqual(conversation.user_identifier, '967700000001')
+        self.assertEqual(conversation.summary, '')
+        self.assertEqual(Conversation.objects.count(), 1)
+
+    def test_bumps_updated_at_of_an_existing_conversation(self):
+        conversation = Conversation.touch(self.application, '967700000001', user_identifier='first')
+        earlier = timezone.now() - timedelta(days=1)
+        Conversation.objects.filter(pk=conversation.pk).update(
+            started_at=earlier, updated_at=earlier, summary='Asked about prices.'
+        )
+
+        with self.assertNumQueries(2):
+            touched = Conversation.touch(self.application, '967700000001', user_identifier='second')
+
+        self.assertEqual(touched.pk, conversation.pk)
+        self.assertGreater(touched.updated_at, earlier)
+        # Only updated_at is rewritten
+        self.assertEqual(touched.started_at, earlier)
+        self.assertEqual(touched.summary, 'Asked about prices.')
+        self.assertEqual(touched.user_identifier, 'first')
+        self.assertEqual(Conversation.objects.count(), 1)
+
+    def test_sessions_are_scoped_by_application(self):
+        other = create_application('Other app')
+
+        first = Conversation.touch(self.application, '967700000001')
+        second = Conversation.touch(other, '967700000001')
+
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertEqual(second.application, other)
@@ -0,0 +1,185 @@
+import threading
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from ..management.commands.process_webhook_events import Command
+from ..models import WebhookEvent
+from ..services import claim_events, complete_event, fail_event, release_events
+from .utils import create_application
+
+
+def create_event(application, session_id, **kwargs):
+    return WebhookEvent.objects.create(
+        application=application, event='onmessage', session_id=session_id,
+        payload={'from': session_id}, **kwargs
+    )
+
+
+class RecordingProcessor:
+    """Stands in for WebhookEventProcessor and records the processing order."""
+
+    def __init__(self, fail_once=()):
+        self.fail_once = set(fail_once)
+        self.processed = []
+        self.lock = threading.Lock()
+
+    def process(self, event):
+        with self.lock:
+            self.processed.append(event.pk)
+            if event.pk in self.fail_once:
+                self.fail_once.discard(event.pk)
+                raise RuntimeError('provider down')
+
+    async def aprocess(self, event):
+        self.process(event)
+
+
+class ClaimEventsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def test_claims_events_in_id_order(self):
+        first = create_event(self.application, '111')
+        other = create_event(self.application, '222')
+        second = create_event(self.application, '111')
+
+        claimed = claim_events(10)
+
+        self.assertEqual([event.pk for event in claimed], [first.pk, other.pk, second.pk])
+        self.assertTrue(all(event.status == WebhookEvent.STATUS_PROCESSING for event in claimed))
+
+    def test_session_in_flight_is_not_handed_out(self):
+        first = create_event(self.application, '111')
+        second = create_event(self.application, '111')
+        other = create_event(self.application, '222')
+
+        self.assertEqual([event.pk for event in claim_events(1)], [first.pk])
+        # 111 is still processing, so only the other session is claimable
+        self.assertEqual([event.pk for event in claim_events(10)], [other.pk])
+        self.assertEqual(claim_events(10), [])
+
+        complete_event(first)
+        self.assertEqual([event.pk for event in claim_events(10)], [second.pk])
+
+    def test_session_waiting_for_a_retry_is_not_handed_out(self):
+        first = create_event(self.application, '111')
+        second = create_event(self.application, '111')
+
+        with self.assertLogs('integration', 'WARNING'):
+            fail_event(claim_events(1)[0], RuntimeError('boom'))
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, WebhookEvent.STATUS_PENDING)
+        self.assertEqual(first.attempts, 1)
+        self.assertGreater(first.available_at, timezone.now())
+        # The later event is due but must wait behind the retry
+        self.assertEqual(claim_events(10), [])
+
+        WebhookEvent.objects.filter(pk=first.pk).update(available_at=timezone.now())
+        self.assertEqual([event.pk for event in claim_events(10)], [first.pk, second.pk])
+
+    def test_release_returns_events_without_counting_an_attempt(self):
+        create_event(self.application, '111')
+        events = claim_events(10)
+
+        self.assertEqual(release_events(events), 1)
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.STATUS_PENDING)
+        self.assertEqual(event.attempts, 0)
+        self.assertIsNone(event.started_at)
+
+
+class WorkerOrderingMixin:
+    """
+    Runs the worker loop of ``process_webhook_events`` over one session
+    with three events and a second session with one.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.application = create_application()
+        self.first = create_event(self.application, '111')
+        self.other = create_event(self.application, '222')
+        self.second = create_event(self.application, '111')
+        self.third = create_event(self.application, '111')
+
+    def run_worker(self, processor):
+        raise NotImplementedError
+
+    def status(self, event):
+        event.refresh_from_db()
+        return event.status, event.attempts
+
+    def test_events_of_one_session_run_in_order(self):
+        processor = RecordingProcessor()
+        self.run_worker(processor)
+
+        session = [pk for pk in processor.processed if pk != self.other.pk]
+        self.assertEqual(session, [self.first.pk, self.second.pk, self.third.pk])
+        self.assertEqual(
+            WebhookEvent.objects.filter(status=WebhookEvent.STATUS_DONE).count(), 4
+        )
+
+    def test_failure_requeues_later_events_behind_the_retry(self):
+        processor = RecordingProcessor(fail_once=[self.first.pk])
+        with self.assertLogs('integration', 'WARNING'):
+            self.run_worker(processor)
+
+        self.assertEqual(sorted(processor.processed), sorted([self.first.pk, self.other.pk]))
+        self.assertEqual(self.status(self.first), (WebhookEvent.STATUS_PENDING, 1))
+        self.assertEqual(self.status(self.second), (WebhookEvent.STATUS_PENDING, 0))
+        self.assertEqual(self.status(self.third), (WebhookEvent.STATUS_PENDING, 0))
+        self.assertEqual(self.status(self.other), (WebhookEvent.STATUS_DONE, 0))
+
+        # Once the retry is due the session resumes with it, in order
+        WebhookEvent.objects.filter(pk=self.first.pk).update(available_at=timezone.now() - timedelta(seconds=1))
+        processor.processed.clear()
+        self.run_worker(processor)
+
+        self.assertEqual(processor.processed, [self.first.pk, self.second.pk, self.third.pk])
+        self.assertEqual(self.status(self.third), (WebhookEvent.STATUS_DONE, 0))
+
+
+class AsyncWorkerTests(WorkerOrderingMixin, TestCase):
+
+    def run_worker(self, processor):
+        command = Command()
+        command.running = True
+        command.processor = processor
+        async_to_sync(command._run_async)(4, 0.01, 300, True)
+
+
+class ThreadWorkerTests(WorkerOrderingMixin, TransactionTestCase):
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('threads cannot share an in-memory SQLite database')
+        super().setUp()
+
+    def run_worker(self, processor):
+        command = Command()
+        command.running = True
+        command.processor = processor
+        command._run_threads(4, 0.01, 300, True)
+
+    def test_failed_session_events_are_released_in_the_same_batch(self):
+        # Lane-level check without the thread pool: the event queued behind
+        # a failure is released, not processed
+        command = Command()
+        command.processor = RecordingProcessor(fail_once=[self.first.pk])
+        first, other, second, third = claim_events(10)
+        failed = set()
+        with self.assertLogs('integration', 'WARNING'):
+            for event in (first, other, second, third):
+                command._process(event, failed)
+
+        self.assertEqual(failed, {'111'})
+        self.assertEqual(command.processor.processed, [self.first.pk, self.other.pk])
+        self.assertEqual(self.status(self.second), (WebhookEvent.STATUS_PENDING, 0))
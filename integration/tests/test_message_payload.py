@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Message, MessagePayload
+from ..services import WebhookEventProcessor
+from .utils import create_application
+
+PAYLOAD = {
+    'event': 'onmessage',
+    'id': {'_serialized': 'false_967700000001@c.us_3EB0A1'},
+    'from': '967700000001@c.us',
+    'body': 'كم مبيعات اليوم؟',
+    'type': 'chat',
+    'sender': {'pushname': 'Ahmed'},
+    'notifyName': 'Ahmed',
+}
+
+
+class MessagePayloadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='staff', password='secret-pw')
+        WebhookEventProcessor().log_incoming(
+            create_application(), '967700000001', PAYLOAD['body'], PAYLOAD, 'reply:1', False
+        )
+        cls.message = Message.objects.get()
+
+    def test_typed_columns_replace_the_raw_payload(self):
+        self.assertEqual(self.message.sender_name, 'Ahmed')
+        self.assertEqual(self.message.message_type, 'chat')
+        self.assertEqual(self.message.provider_message_id, 'false_967700000001@c.us_3EB0A1')
+
+    def test_payload_is_stored_compressed_and_loaded_lazily(self):
+        record = MessagePayload.objects.get(message=self.message)
+        self.assertLess(len(bytes(record.data)), record.size)
+
+        message = Message.objects.get(pk=self.message.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(message.payload, PAYLOAD)
+            self.assertEqual(message.payload, PAYLOAD)
+
+    def test_messages_without_a_payload(self):
+        reply = Message.objects.create(
+            conversation=self.message.conversation, direction='outgoing', content='100'
+        )
+
+        self.assertIsNone(reply.payload)
+
+    def test_payload_view(self):
+        url = reverse('message-payload', args=[self.message.pk])
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), PAYLOAD)
+        self.assertEqual(self.client.get(reverse('message-payload', args=[0])).status_code, 404)
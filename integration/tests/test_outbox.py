@@ -0,0 +1,247 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from ..models import OutboundMessage
+from ..services import (
+    OutboxDispatcher, claim_messages, enqueue_message, fail_message, requeue_stale_messages
+)
+from ..services.outbox import start_send
+from .utils import create_application
+
+
+class RecordingSender:
+    """Stands in for ``send_message`` and records what was sent."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.sent = []
+
+    def __call__(self, message):
+        self.sent.append(message.pk)
+        if message.pk in self.fail:
+            raise RuntimeError('provider down')
+        return {'status': 'success'}
+
+
+class EnqueueMessageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def test_idempotency_key_returns_the_queued_message(self):
+        message, created = enqueue_message(self.application, '967700000001', idempotency_key='order-1', message='Hi')
+        again, created_again = enqueue_message(self.application, '967700000001', idempotency_key='order-1', message='Hi')
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(again.pk, message.pk)
+        self.assertEqual(message.payload, {'message': 'Hi'})
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+    def test_messages_without_a_key_are_never_deduplicated(self):
+        enqueue_message(self.application, '967700000001', message='Hi')
+        enqueue_message(self.application, '967700000001', idempotency_key='', message='Hi')
+
+        self.assertEqual(OutboundMessage.objects.count(), 2)
+        self.assertFalse(OutboundMessage.objects.filter(idempotency_key__isnull=False).exists())
+
+    def test_keys_are_scoped_to_the_application(self):
+        other = create_application('Other app')
+        enqueue_message(self.application, '967700000001', idempotency_key='order-1', message='Hi')
+        _, created = enqueue_message(other, '967700000001', idempotency_key='order-1', message='Hi')
+
+        self.assertTrue(created)
+
+    def test_lost_race_returns_the_winning_message(self):
+        message, _ = enqueue_message(self.application, '967700000001', idempotency_key='order-1', message='Hi')
+
+        # The lookup misses as if the other enqueue had not committed yet,
+        # so the insert hits the unique constraint
+        with mock.patch.object(OutboundMessage.objects, 'filter', return_value=OutboundMessage.objects.none()):
+            again, created = enqueue_message(self.application, '967700000001', idempotency_key='order-1', message='Hi')
+
+        self.assertFalse(created)
+        self.assertEqual(again.pk, message.pk)
+
+
+class ClaimMessagesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+        cls.other = create_application('Other app')
+
+    def test_claims_due_messages_in_id_order(self):
+        first, _ = enqueue_message(self.application, '1', message='a')
+        later, _ = enqueue_message(self.application, '2', message='b')
+        OutboundMessage.objects.filter(pk=later.pk).update(available_at=timezone.now() + timedelta(minutes=1))
+        second, _ = enqueue_message(self.other, '3', message='c')
+
+        claimed = claim_messages(10)
+
+        self.assertEqual([message.pk for message in claimed], [first.pk, second.pk])
+        self.assertTrue(all(message.status == OutboundMessage.STATUS_SENDING for message in claimed))
+        self.assertTrue(all(message.started_at is not None for message in claimed))
+        self.assertEqual(claim_messages(10), [])
+
+    def test_skips_applications_still_in_flight(self):
+        enqueue_message(self.application, '1', message='a')
+        other, _ = enqueue_message(self.other, '2', message='b')
+
+        claimed = claim_messages(10, exclude_applications=[self.application.pk])
+
+        self.assertEqual([message.pk for message in claimed], [other.pk])
+        self.assertEqual(OutboundMessage.objects.filter(status=OutboundMessage.STATUS_PENDING).count(), 1)
+
+    def test_respects_the_limit(self):
+        for n in range(3):
+            enqueue_message(self.application, str(n), message='a')
+
+        self.assertEqual(len(claim_messages(2)), 2)
+        self.assertEqual(len(claim_messages(0)), 0)
+        self.assertEqual(len(claim_messages(2)), 1)
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=4, OUTBOX_RETRY_BACKOFF=2, OUTBOX_MAX_BACKOFF=5)
+class FailMessageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def setUp(self):
+        enqueue_message(self.application, '967700000001', message='Hi')
+
+    def fail(self):
+        message = claim_messages(1)[0]
+        before = timezone.now()
+        fail_message(message, RuntimeError('provider down'))
+        message.refresh_from_db()
+        delay = (message.available_at - before).total_seconds()
+        # Make the retry due straight away for the next round
+        OutboundMessage.objects.filter(pk=message.pk).update(available_at=timezone.now())
+        return message, delay
+
+    def test_backs_off_exponentially_up_to_the_cap(self):
+        delays = []
+        for _ in range(3):
+            with self.assertLogs('integration', 'WARNING'):
+                message, delay = self.fail()
+            self.assertEqual(message.status, OutboundMessage.STATUS_PENDING)
+            self.assertEqual(message.last_error, 'provider down')
+            delays.append(round(delay))
+
+        self.assertEqual(message.attempts, 3)
+        self.assertEqual(delays, [2, 4, 5])
+
+    def test_gives_up_after_the_last_attempt(self):
+        for _ in range(3):
+            with self.assertLogs('integration', 'WARNING'):
+                self.fail()
+        with self.assertLogs('integration', 'ERROR'):
+            message, _ = self.fail()
+
+        self.assertEqual(message.status, OutboundMessage.STATUS_FAILED)
+        self.assertEqual(message.attempts, 4)
+        self.assertEqual(claim_messages(10), [])
+
+
+class StaleMessageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def setUp(self):
+        self.queued, _ = enqueue_message(self.application, '967700000001', message='Hi')
+
+    def make_stale(self):
+        OutboundMessage.objects.filter(pk=self.queued.pk).update(
+            started_at=timezone.now() - timedelta(minutes=20)
+        )
+        with self.assertLogs('integration', 'WARNING'):
+            self.assertEqual(requeue_stale_messages(600), 1)
+
+    def test_start_send_refuses_a_requeued_message(self):
+        message = claim_messages(1)[0]
+        self.make_stale()
+
+        self.assertFalse(start_send(message))
+        self.queued.refresh_from_db()
+        self.assertEqual(self.queued.status, OutboundMessage.STATUS_PENDING)
+
+    def test_dispatcher_skips_a_requeued_message(self):
+        message = claim_messages(1)[0]
+        self.make_stale()
+        sender = RecordingSender()
+
+        OutboxDispatcher(rate=0, sender=sender).send_batch([message])
+
+        self.assertEqual(sender.sent, [])
+        self.queued.refresh_from_db()
+        self.assertEqual((self.queued.status, self.queued.attempts), (OutboundMessage.STATUS_PENDING, 0))
+
+    def test_start_send_keeps_a_send_in_progress_from_being_requeued(self):
+        message = claim_messages(1)[0]
+        OutboundMessage.objects.filter(pk=message.pk).update(started_at=timezone.now() - timedelta(minutes=20))
+
+        self.assertTrue(start_send(message))
+        self.assertEqual(requeue_stale_messages(600), 0)
+
+
+class DispatcherTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def test_sends_the_batch_and_records_the_outcome(self):
+        sent, _ = enqueue_message(self.application, '1', message='a')
+        failed, _ = enqueue_message(self.application, '2', message='b')
+        sender = RecordingSender(fail=[failed.pk])
+
+        with self.assertLogs('integration', 'WARNING'):
+            OutboxDispatcher(rate=0, sender=sender).send_batch(claim_messages(10))
+
+        self.assertEqual(sender.sent, [sent.pk, failed.pk])
+        sent.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual((sent.status, sent.attempts), (OutboundMessage.STATUS_SENT, 1))
+        self.assertEqual(sent.response, {'status': 'success'})
+        self.assertEqual((failed.status, failed.attempts), (OutboundMessage.STATUS_PENDING, 1))
+
+
+class DispatchCommandTests(TransactionTestCase):
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('threads cannot share an in-memory SQLite database')
+        self.application = create_application()
+        self.other = create_application('Other app')
+
+    def test_once_drains_the_outbox_in_order_per_application(self):
+        messages = [
+            enqueue_message(application, str(n), message=str(n))[0]
+            for n, application in enumerate([self.application, self.other, self.application, self.application])
+        ]
+        sender = RecordingSender()
+        dispatcher = OutboxDispatcher(rate=0, sender=sender)
+
+        command = 'integration.management.commands.dispatch_outbound_messages'
+        with mock.patch(f'{command}.OutboxDispatcher', return_value=dispatcher), \
+                mock.patch(f'{command}.close_http_sessions') as close_http_sessions:
+            call_command('dispatch_outbound_messages', '--once', '--poll-interval=0.01', stdout=mock.Mock())
+
+        own = [message.pk for message in messages if message.application_id == self.application.pk]
+        self.assertEqual([pk for pk in sender.sent if pk in own], own)
+        self.assertEqual(len(sender.sent), 4)
+        self.assertEqual(
+            OutboundMessage.objects.filter(status=OutboundMessage.STATUS_SENT).count(), 4
+        )
+        close_http_sessions.assert_called_once_with()
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Conversation, Message
+from ..utils.pagination import InvalidCursor, keyset_page
+from .utils import create_application
+
+
+class KeysetPageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.conversation = Conversation.touch(create_application(), '967700000001')
+        base = timezone.now() - timedelta(hours=1)
+        # Pairs of messages share a timestamp, so ids must break the ties
+        for n in range(7):
+            message = Message.objects.create(conversation=cls.conversation, direction='incoming', content=str(n))
+            Message.objects.filter(pk=message.pk).update(created_at=base + timedelta(minutes=n // 2))
+
+    def pages(self, descending=True, limit=3):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(
+                self.conversation.messages.all(), 'created_at', cursor=cursor, limit=limit, descending=descending
+            )
+            pages.append([message.content for message in rows])
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_row_once_across_ties(self):
+        self.assertEqual(self.pages(), [['6', '5', '4'], ['3', '2', '1'], ['0']])
+        self.assertEqual(self.pages(descending=False), [['0', '1', '2'], ['3', '4', '5'], ['6']])
+
+    def test_last_page_has_no_cursor(self):
+        rows, cursor = keyset_page(self.conversation.messages.all(), 'created_at', limit=7)
+
+        self.assertEqual(len(rows), 7)
+        self.assertIsNone(cursor)
+
+    def test_page_depth_does_not_add_queries(self):
+        _, cursor = keyset_page(self.conversation.messages.all(), 'created_at', limit=3)
+
+        with self.assertNumQueries(1):
+            keyset_page(self.conversation.messages.all(), 'created_at', cursor=cursor, limit=3)
+
+    def test_invalid_cursor(self):
+        for cursor in ('garbage', 'WzEsMl0'):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                keyset_page(self.conversation.messages.all(), 'created_at', cursor=cursor)
+
+
+class ConversationPaginationViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='staff', password='secret-pw')
+        cls.conversation = Conversation.touch(create_application(), '967700000001')
+        for n in range(5):
+            Message.objects.create(conversation=cls.conversation, direction='incoming', content=str(n))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_messages_view_scrolls_back_in_pages(self):
+        url = reverse('conversation-messages', args=[self.conversation.pk])
+        first = self.client.get(url, {'limit': 2}).json()
+        second = self.client.get(url, {'limit': 2, 'cursor': first['next_cursor']}).json()
+
+        self.assertEqual([message['content'] for message in first['messages']], ['3', '4'])
+        self.assertEqual([message['content'] for message in second['messages']], ['1', '2'])
+        self.assertIsNotNone(second['next_cursor'])
+
+    def test_bad_parameters(self):
+        url = reverse('conversation-messages', args=[self.conversation.pk])
+
+        self.assertEqual(self.client.get(url, {'cursor': 'garbage'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 'all'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('conversation-list'), {'cursor': 'garbage'}).status_code, 404)
@@ -0,0 +1,145 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import OutboundMessage
+from .utils import create_application
+
+
+def basic_auth(username, password):
+    token = base64.b64encode(f'{username}:{password}'.encode()).decode()
+    return {'HTTP_AUTHORIZATION': f'Basic {token}'}
+
+
+class SendMessageViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        get_user_model().objects.create_user(username='apiuser', password='secret-pw')
+        cls.application = create_application()
+        cls.auth = basic_auth('apiuser', 'secret-pw')
+
+    def send(self, data, auth=None, **extra):
+        return self.client.post(
+            reverse('send_message'), json.dumps(data), content_type='application/json',
+            **(self.auth if auth is None else auth), **extra
+        )
+
+    def message(self, **overrides):
+        return {'webhook_key': self.application.webhook_key, 'phone': '967700000001', 'message': 'Hello', **overrides}
+
+    def test_queues_the_message(self):
+        response = self.send(self.message())
+
+        self.assertEqual(response.status_code, 202)
+        body = response.json()
+        self.assertEqual(body['status'], 'queued')
+        self.assertFalse(body['duplicate'])
+        outbound = OutboundMessage.objects.get(pk=body['id'])
+        self.assertEqual(outbound.kind, OutboundMessage.KIND_TEXT)
+        self.assertEqual(outbound.phone, '967700000001')
+
+    def test_idempotency_key_returns_the_first_message(self):
+        first = self.send(self.message(), HTTP_IDEMPOTENCY_KEY='order-1').json()
+        second = self.send(self.message(), HTTP_IDEMPOTENCY_KEY='order-1').json()
+
+        self.assertEqual(second['id'], first['id'])
+        self.assertTrue(second['duplicate'])
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+    def test_missing_credentials(self):
+        response = self.send(self.message(), auth={})
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Basic realm="api"')
+        self.assertEqual(response.json()['status'], 'error')
+
+    def test_wrong_password(self):
+        response = self.send(self.message(), auth=basic_auth('apiuser', 'wrong'))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(OutboundMessage.objects.exists())
+
+    def test_malformed_basic_header(self):
+        response = self.send(self.message(), auth={'HTTP_AUTHORIZATION': 'Basic not-base64!'})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_unknown_application(self):
+        response = self.send(self.message(webhook_key='nope'))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_disabled_application(self):
+        create_application('Disabled app', enabled=False)
+
+        response = self.send(self.message(webhook_key='key-disabled-app'))
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'status': 'error', 'message': 'Application is disabled.'})
+
+    def test_missing_fields(self):
+        response = self.send({'webhook_key': self.application.webhook_key})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'Missing required fields: phone, message')
+
+    def test_malformed_json(self):
+        response = self.client.post(
+            reverse('send_message'), '{"phone": ', content_type='application/json', **self.auth
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_unsupported_provider(self):
+        create_application('Meta app', whatsapp_provider_type='meta')
+
+        response = self.send(self.message(webhook_key='key-meta-app'))
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_form_encoded_body(self):
+        response = self.client.post(reverse('send_message'), self.message(), **self.auth)
+
+        self.assertEqual(response.status_code, 202)
+
+    def test_get_is_not_allowed(self):
+        response = self.client.get(reverse('send_message'), **self.auth)
+
+        self.assertEqual(response.status_code, 405)
+
+
+class WebhookViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def post(self, webhook_key, data):
+        return self.client.post(
+            reverse('webhook', args=[webhook_key]), json.dumps(data), content_type='application/json'
+        )
+
+    def test_unknown_key(self):
+        self.assertEqual(self.post('nope', {'event': 'onmessage'}).status_code, 404)
+
+    def test_disabled_application(self):
+        create_application('Disabled app', enabled=False)
+
+        self.assertEqual(self.post('key-disabled-app', {'event': 'onmessage'}).status_code, 403)
+
+    def test_non_object_body(self):
+        response = self.client.post(
+            reverse('webhook', args=[self.application.webhook_key]), '[1, 2]', content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_ignored_event_is_acknowledged(self):
+        response = self.post(self.application.webhook_key, {'event': 'onack'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'success', 'received': True, 'duplicate': False})
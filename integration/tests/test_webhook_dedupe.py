@@ -0,0 +1,100 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Message, OutboundMessage, WebhookEvent
+from ..services import WebhookEventProcessor, claim_events, enqueue_event
+from .utils import create_application
+
+PAYLOAD = {
+    'event': 'onmessage',
+    'id': {'_serialized': 'false_967700000001@c.us_3EB0A1'},
+    'from': '967700000001@c.us',
+    'body': 'السلام عليكم',
+    'type': 'chat',
+}
+
+
+class RedeliveredWebhookTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def post(self, payload):
+        return self.client.post(
+            reverse('webhook', args=[self.application.webhook_key]),
+            json.dumps(payload), content_type='application/json'
+        )
+
+    def test_redelivery_is_acknowledged_but_not_queued_twice(self):
+        first = self.post(PAYLOAD)
+        second = self.post(PAYLOAD)
+
+        self.assertEqual(first.json(), {'status': 'success', 'received': True, 'duplicate': False})
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.json()['duplicate'])
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.assertEqual(WebhookEvent.objects.get().provider_message_id, 'false_967700000001@c.us_3EB0A1')
+
+    def test_enqueue_event_returns_the_queued_event(self):
+        event, created = enqueue_event(self.application, 'onmessage', PAYLOAD)
+        with self.assertLogs('integration', 'INFO'):
+            again, created_again = enqueue_event(self.application, 'onmessage', dict(PAYLOAD))
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(again.pk, event.pk)
+
+    def test_messages_without_an_id_are_never_deduplicated(self):
+        payload = {key: value for key, value in PAYLOAD.items() if key != 'id'}
+        enqueue_event(self.application, 'onmessage', payload)
+        enqueue_event(self.application, 'onmessage', payload)
+
+        self.assertEqual(WebhookEvent.objects.count(), 2)
+
+    def test_message_logged_twice_is_answered_once(self):
+        # Two events for the same message, e.g. queued before dedupe existed
+        processor = WebhookEventProcessor()
+        processor.handle_message(self.application, PAYLOAD, event_id=1)
+        with self.assertLogs('integration', 'INFO'):
+            processor.handle_message(self.application, PAYLOAD, event_id=2)
+
+        self.assertEqual(Message.objects.filter(direction='incoming').count(), 1)
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+
+class RetriedEventTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.application = create_application()
+
+    def setUp(self):
+        enqueue_event(self.application, 'onmessage', PAYLOAD)
+        self.event = claim_events(1)[0]
+        self.processor = WebhookEventProcessor()
+
+    def retry(self):
+        self.event.attempts = 1
+        self.processor.process(self.event)
+
+    def test_retry_after_the_reply_was_queued_does_nothing(self):
+        self.processor.process(self.event)
+        self.retry()
+
+        self.assertEqual(Message.objects.filter(direction='incoming').count(), 1)
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+    def test_retry_after_logging_still_queues_the_reply(self):
+        # The first attempt logged the message, then failed before replying
+        self.processor.log_incoming(
+            self.application, '967700000001', PAYLOAD['body'], PAYLOAD, f'reply:{self.event.pk}', False
+        )
+        self.retry()
+
+        self.assertEqual(Message.objects.filter(direction='incoming').count(), 1)
+        reply = OutboundMessage.objects.get()
+        self.assertEqual(reply.idempotency_key, f'reply:{self.event.pk}')
+        self.assertEqual(reply.phone, '967700000001')
@@ -0,0 +1,13 @@
+from ..models import Application
+
+
+def create_application(name='Test app', **kwargs):
+    """Create an enabled WPPConnect application without a configuration."""
+    fields = {
+        'bot_id': 'bot',
+        'webhook_key': f'key-{name}'.replace(' ', '-').lower(),
+        'whatsapp_provider_type': 'wppconnect',
+        'session': 'session',
+    }
+    fields.update(kwargs)
+    return Application.objects.create(name=name, **fields)
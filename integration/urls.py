@@ -6,7 +6,7 @@ from .views import (
     ApplicationCloseSessionView, ApplicationRestartSessionView, ApplicationCheckConnectionView,
     ApplicationSyncContactsView, ApplicationSyncMessagesView, WebhookView,
     ConfigListView, ConfigCreateView, ConfigUpdateView, ConfigDeleteView,
-    ConversationListView, ConversationDetailView,
+    ConversationListView, ConversationDetailView, ConversationMessagesView, MessagePayloadView,
     SendMessageView, SendFileView, SendMenuSelectView
 )
 
@@ -42,6 +42,8 @@ urlpatterns = [
     # Conversation URLs
     path('conversations/', ConversationListView.as_view(), name='conversation-list'),
     path('conversations/<int:pk>/', ConversationDetailView.as_view(), name='conversation-detail'),
+    path('conversations/<int:pk>/messages/', ConversationMessagesView.as_view(), name='conversation-messages'),
+    path('conversations/messages/<int:pk>/payload/', MessagePayloadView.as_view(), name='message-payload'),
 
     # Messaging APIs
     path('send-message/', SendMessageView.as_view(), name='send_message'),
@@ -1,3 +1,6 @@
+import re
+import unicodedata
+
 
 def clean_phone_number(phone_number):
     """Clean phone number or LID by removing @c.us or @lid suffixes."""
@@ -11,3 +14,37 @@ def clean_phone_number(phone_number):
         phone_number = phone_number.split("@")[0]
         return phone_number
     return phone_number
+
+
+def provider_message_id(payload):
+    """
+    Return the provider's id of an inbound message payload, or None.
+
+    WPPConnect sends it as a string ("false_967...@c.us_3EB0...") or as an
+    object with a ``_serialized`` key.
+    """
+    message_id = (payload or {}).get("id")
+    if isinstance(message_id, dict):
+        message_id = message_id.get("_serialized") or message_id.get("id")
+    if not message_id:
+        return None
+    return str(message_id)[:255]
+
+
+_ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+_ARABIC_LETTERS = str.maketrans({
+    '\u0623': '\u0627', '\u0625': '\u0627', '\u0622': '\u0627', '\u0671': '\u0627',  # alef forms
+    '\u0629': '\u0647',  # ta marbuta -> ha
+    '\u0649': '\u064a',  # alef maksura -> ya
+    '\u0624': '\u0648', '\u0626': '\u064a',  # hamza carriers
+})
+
+
+def normalize_text(value):
+    """
+    Fold Arabic/Latin text for matching: case-insensitive, Arabic
+    diacritics/tatweel removed, alef/ya/ta-marbuta variants unified.
+    """
+    value = unicodedata.normalize('NFKC', value or '').casefold()
+    value = _ARABIC_DIACRITICS.sub('', value).translate(_ARABIC_LETTERS)
+    return ' '.join(value.split())
@@ -1,4 +1,8 @@
+import hashlib
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from base64 import urlsafe_b64encode as b64e, urlsafe_b64decode as b64d
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -10,21 +14,78 @@ from django.db import models
 from django.utils.encoding import force_bytes
 
 
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# PBKDF2 with 100k iterations costs tens of milliseconds, so derived keys
+# (by secret + salt) and decrypted values (by ciphertext digest) are kept
+# per process. Both are cleared when an ApplicationConfiguration is saved.
+_key_cache = TTLCache(
+    maxsize=getattr(settings, 'ENCRYPTION_CACHE_SIZE', 256),
+    ttl=getattr(settings, 'ENCRYPTION_CACHE_TTL', 3600),
+)
+_plaintext_cache = TTLCache(
+    maxsize=getattr(settings, 'ENCRYPTION_CACHE_SIZE', 256),
+    ttl=getattr(settings, 'ENCRYPTION_CACHE_TTL', 3600),
+)
+
+
 class EncryptedMixin:
     """Mixin for reusable encryption and decryption functionality"""
 
     @staticmethod
     def get_key(secret, salt):
         """Generate Fernet key from SECRET_KEY + salt using PBKDF2"""
-        return b64e(
-            PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-                backend=default_backend(),
-            ).derive(secret)
-        )
+        cache_key = (hashlib.sha256(secret).digest(), bytes(salt))
+        key = _key_cache.get(cache_key)
+        if key is None:
+            key = b64e(
+                PBKDF2HMAC(
+                    algorithm=hashes.SHA256(),
+                    length=32,
+                    salt=salt,
+                    iterations=100000,
+                    backend=default_backend(),
+                ).derive(secret)
+            )
+            _key_cache.set(cache_key, key)
+        return key
+
+    @staticmethod
+    def clear_cache():
+        """Drop cached derived keys and decrypted values."""
+        _key_cache.clear()
+        _plaintext_cache.clear()
 
     @classmethod
     def encrypt(cls, value: str) -> str:
@@ -47,6 +108,13 @@ class EncryptedMixin:
     def decrypt(cls, value: str) -> str:
         if value is None:
             return None
+
+        cache_key = hashlib.sha256(
+            force_bytes(settings.SECRET_KEY) + b"\0" + value.encode()
+        ).digest()
+        cached = _plaintext_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             # Decode the base64 to get salt + encrypted_value
@@ -57,7 +125,9 @@ class EncryptedMixin:
             key = cls.get_key(force_bytes(settings.SECRET_KEY), salt)
             f = Fernet(key)
             
-            return f.decrypt(encrypted_value).decode()
+            plaintext = f.decrypt(encrypted_value).decode()
+            _plaintext_cache.set(cache_key, plaintext)
+            return plaintext
         except (ValueError, TypeError):
             # In case of base64 decode failure or invalid value
             return value
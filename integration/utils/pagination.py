@@ -0,0 +1,55 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor could not be decoded."""
+
+
+def encode_cursor(value, pk):
+    """Encode the ``(value, pk)`` position of the last row of a page."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, pk], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        return datetime.fromisoformat(value), int(pk)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_page(queryset, field, cursor=None, limit=20, descending=True):
+    """
+    Return ``(rows, next_cursor)`` for one page of ``queryset`` ordered by
+    ``(field, id)``.
+
+    Rows after ``cursor`` are found with a range condition on the composite
+    ``(field, id)`` index instead of an OFFSET, so every page costs the same
+    no matter how deep it is. ``next_cursor`` is None on the last page.
+    """
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        op = 'lt' if descending else 'gt'
+        # The outer bound on ``field`` alone lets the database seek into the
+        # index; the OR only breaks ties between rows sharing a value.
+        queryset = queryset.filter(
+            Q(**{f'{field}__{op}e': value}),
+            Q(**{f'{field}__{op}': value}) | Q(**{f'id__{op}': pk}),
+        )
+
+    prefix = '-' if descending else ''
+    rows = list(queryset.order_by(f'{prefix}{field}', f'{prefix}id')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
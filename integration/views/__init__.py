@@ -6,7 +6,7 @@ from .configuration import (
     ConfigListView, ConfigCreateView, ConfigUpdateView, ConfigDeleteView
 )
 from .conversation import (
-    ConversationListView, ConversationDetailView
+    ConversationListView, ConversationDetailView, ConversationMessagesView, MessagePayloadView
 )
 from .actions import (
     ApplicationActionView, ApplicationStartSessionView, ApplicationGenerateTokenView,
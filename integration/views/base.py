@@ -1,52 +1,141 @@
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework.authentication import BasicAuthentication
-from rest_framework.permissions import IsAuthenticated
-from rest_framework import status
-from rest_framework.exceptions import PermissionDenied
-from django.shortcuts import get_object_or_404
-from django.utils.translation import gettext_lazy as _
+import base64
+import binascii
+import json
 import logging
 
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
 from ..models import Application
-from ..providers import WPPConnectProvider
+from ..services import enqueue_message
+
+# Providers the outbox dispatcher can send through
+QUEUED_PROVIDERS = {'wppconnect'}
 
 logger = logging.getLogger(__name__)
 
-class BaseWhatsAppView(APIView):
+
+class ApiError(Exception):
+    """Raised inside an API view to answer with a JSON error."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_request_data(request):
+    """
+    Return the JSON or form body of ``request`` as a dict.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ApiError(_("Malformed JSON body."), 400)
+        if not isinstance(data, dict):
+            raise ApiError(_("Expected a JSON object."), 400)
+        return data
+    return request.POST.dict()
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncApiView(View):
+    """
+    Base class for the ASGI-native JSON APIs.
+
+    Handlers are coroutines, so under uvicorn a request waiting on the
+    database never holds a worker thread; under WSGI Django runs them in
+    a per-request event loop. ``ApiError`` is turned into a JSON response.
+    """
+    http_method_names = ['post', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except ApiError as e:
+            response = JsonResponse({"status": "error", "message": str(e.message)}, status=e.status)
+            if e.status == 401:
+                response['WWW-Authenticate'] = 'Basic realm="api"'
+            return response
+
+
+class BaseWhatsAppView(AsyncApiView):
     """
     Base class for WhatsApp-related views to avoid code duplication.
+    Requests authenticate with HTTP Basic credentials.
     """
-    authentication_classes = [BasicAuthentication]
-    permission_classes = [IsAuthenticated]
-    
-    def get_application(self, webhook_key):
+
+    async def authenticate(self, request):
         """
-        Fetch the Application object or return a 404 response if not found.
+        Resolve the HTTP Basic credentials of ``request`` to an active user.
         """
-        app = get_object_or_404(Application, webhook_key=webhook_key)
+        auth = request.headers.get('Authorization', '').split()
+        if len(auth) != 2 or auth[0].lower() != 'basic':
+            raise ApiError(_("Authentication credentials were not provided."), 401)
+        try:
+            username, _sep, password = base64.b64decode(auth[1]).decode('utf-8').partition(':')
+        except (binascii.Error, UnicodeDecodeError):
+            raise ApiError(_("Invalid basic header."), 401)
+
+        user = await aauthenticate(request, username=username, password=password)
+        if user is None or not user.is_active:
+            raise ApiError(_("Invalid username/password."), 401)
+        request.user = user
+        return user
+
+    async def get_application(self, webhook_key):
+        """
+        Fetch the Application object or fail with 404 if not found.
+        """
+        app = await Application.objects.filter(webhook_key=webhook_key).afirst()
+        if app is None:
+            raise ApiError(_("Not found."), 404)
         if not app.enabled:
             logger.warning("Application with webhook_key %s is disabled", webhook_key)
-            raise PermissionDenied(_("Application is disabled."))
+            raise ApiError(_("Application is disabled."), 403)
         return app
 
-    def create_provider(self, whatsapp_provider_type, application):
+    async def get_data(self, request, required_fields):
         """
-        Create and return the provider instance.
+        Authenticate the request and return its body, failing with 400 if
+        any of the required fields is missing.
         """
-        if whatsapp_provider_type == 'wppconnect':
-            return WPPConnectProvider(application)
-        # Placeholder for other providers
-        return None
+        await self.authenticate(request)
+        data = parse_request_data(request)
+        missing_fields = [field for field in required_fields if field not in data]
+        if missing_fields:
+            raise ApiError(f"Missing required fields: {', '.join(missing_fields)}", 400)
+        return data
 
-    def validate_request_data(self, request, required_fields):
+    async def enqueue(self, request, data, application, kind, **payload):
         """
-        Validate that all required fields are present in the request data.
+        Queue a message in the outbox and answer 202 Accepted.
+
+        An ``Idempotency-Key`` header (or ``idempotency_key`` field) makes
+        retries of the same request return the message queued first.
         """
-        missing_fields = [field for field in required_fields if field not in request.data]
-        if missing_fields:
-            return Response(
-                {"status": "error", "message": f"Missing required fields: {', '.join(missing_fields)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        return None
+        if application.whatsapp_provider_type not in QUEUED_PROVIDERS:
+            raise ApiError(_("Provider not found or not supported."), 400)
+
+        idempotency_key = (
+            request.headers.get("Idempotency-Key")
+            or data.get("idempotency_key")
+        )
+        # enqueue_message needs a transaction, which the async ORM cannot open
+        message, created = await sync_to_async(enqueue_message)(
+            application,
+            data.get("phone"),
+            kind=kind,
+            idempotency_key=idempotency_key,
+            **payload
+        )
+        return JsonResponse(
+            {"status": "queued", "id": message.pk, "duplicate": not created, "message_status": message.status},
+            status=202,
+        )
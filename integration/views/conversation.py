@@ -1,16 +1,110 @@
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
 from django.views.generic import ListView, DetailView
-from ..models import Conversation
+from ..models import Conversation, MessagePayload
+from ..services.archive import archived_messages, has_archived_messages
+from ..utils.pagination import InvalidCursor, keyset_page
 
 class ConversationListView(LoginRequiredMixin, ListView):
+    """
+    Conversations, most recently updated first, paginated by a cursor on
+    ``(updated_at, id)`` instead of page numbers.
+    """
     model = Conversation
     template_name = 'integration/conversation_list.html'
     context_object_name = 'conversations'
-    paginate_by = 20
-    ordering = ['-updated_at']
+    page_size = 20
+
+    def get_queryset(self):
+        queryset = Conversation.objects.select_related('application')
+        try:
+            rows, self.next_cursor = keyset_page(
+                queryset, 'updated_at', cursor=self.request.GET.get('cursor'), limit=self.page_size
+            )
+        except InvalidCursor:
+            raise Http404("Invalid page cursor")
+        return rows
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        context['cursor'] = self.request.GET.get('cursor')
+        return context
 
 class ConversationDetailView(LoginRequiredMixin, DetailView):
     model = Conversation
     template_name = 'integration/conversation_detail.html'
     context_object_name = 'conversation'
+    messages_per_page = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        conversation = self.object
+        # Only the latest page is rendered; earlier pages are fetched from
+        # ConversationMessagesView while scrolling up.
+        messages, next_cursor = keyset_page(
+            conversation.messages.all(), 'created_at', limit=self.messages_per_page
+        )
+        context['chat_messages'] = messages[::-1]
+        context['next_cursor'] = next_cursor
+        # Archived history is read from the archive files only on request
+        if self.request.GET.get('archived'):
+            context['archived_messages'] = archived_messages(conversation)
+        else:
+            context['has_archive'] = has_archived_messages(conversation)
+        return context
+
+
+class ConversationMessagesView(LoginRequiredMixin, View):
+    """
+    JSON page of the messages of a conversation older than ``cursor``,
+    used for infinite scroll on the conversation detail page.
+    """
+    max_limit = 200
+
+    def get(self, request, pk):
+        conversation = get_object_or_404(Conversation, pk=pk)
+        try:
+            limit = min(max(int(request.GET.get('limit', 50)), 1), self.max_limit)
+        except ValueError:
+            return JsonResponse({'error': 'limit must be an integer'}, status=400)
+        try:
+            messages, next_cursor = keyset_page(
+                conversation.messages.all(), 'created_at',
+                cursor=request.GET.get('cursor'), limit=limit,
+            )
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        return JsonResponse({
+            'messages': [
+                {
+                    'id': message.pk,
+                    'direction': message.direction,
+                    'content': message.content,
+                    'sender_name': message.sender_name,
+                    'message_type': message.message_type,
+                    'created_at': message.created_at.isoformat(),
+                    'payload_url': reverse('message-payload', args=[message.pk])
+                    if message.direction == 'incoming' else None,
+                }
+                for message in reversed(messages)
+            ],
+            'next_cursor': next_cursor,
+        }, json_dumps_params={'ensure_ascii': False})
+
+
+class MessagePayloadView(LoginRequiredMixin, View):
+    """
+    Return the raw provider payload of one message, decompressed on demand.
+    """
+    def get(self, request, pk):
+        record = get_object_or_404(MessagePayload, message_id=pk)
+        try:
+            payload = record.unpack()
+        except Exception:
+            raise Http404("Payload could not be decoded")
+        return JsonResponse(payload, safe=False, json_dumps_params={'ensure_ascii': False, 'indent': 2})
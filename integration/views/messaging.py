@@ -1,102 +1,55 @@
-from rest_framework.response import Response
-from rest_framework import status
 from django.utils.translation import gettext_lazy as _
 import logging
 
+from ..models import OutboundMessage
 from .base import BaseWhatsAppView
 
 logger = logging.getLogger(__name__)
 
 class SendMessageView(BaseWhatsAppView):
     """
-    View to handle sending WhatsApp messages.
+    View to queue WhatsApp messages for the outbound dispatcher.
     """
-    def post(self, request):
-        validation_error = self.validate_request_data(request, ["webhook_key", "phone", "message"])
-        if validation_error:
-            return validation_error
-            
-        webhook_key = request.data["webhook_key"]
-        application = self.get_application(webhook_key)
-        
-        provider = self.create_provider(application.whatsapp_provider_type, application)
-        if not provider:
-            return Response(
-                {"status": "error", "message": _("Provider not found or not supported.")},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-            
-        response = provider.send_whatsapp_message(
-            phone=request.data.get("phone"),
-            is_group=request.data.get("isGroup", False),
-            is_newsletter=request.data.get("is_newsletter", False),
-            message=request.data.get("message"),
+    async def post(self, request):
+        data = await self.get_data(request, ["webhook_key", "phone", "message"])
+        application = await self.get_application(data["webhook_key"])
+
+        return await self.enqueue(
+            request, data, application, OutboundMessage.KIND_TEXT,
+            is_group=data.get("isGroup", False),
+            is_newsletter=data.get("is_newsletter", False),
+            message=data.get("message"),
         )
-        
-        if response.get("status") == "error":
-            return Response(response, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        return Response(response, status=status.HTTP_200_OK)
 
 class SendFileView(BaseWhatsAppView):
     """
-    View to handle sending files via WhatsApp.
+    View to queue files for sending via WhatsApp.
     """
-    def post(self, request):
-        validation_error = self.validate_request_data(request, ["webhook_key", "phone", "filename", "base64"])
-        if validation_error:
-            return validation_error
-            
-        webhook_key = request.data["webhook_key"]
-        application = self.get_application(webhook_key)
-        
-        provider = self.create_provider(application.whatsapp_provider_type, application)
-        if not provider:
-            return Response(
-                {"status": "error", "message": _("Provider not found or not supported.")},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-            
-        response = provider.send_file(
-            phone=request.data.get("phone"),
-            is_group=request.data.get("isGroup", False),
-            is_newsletter=request.data.get("is_newsletter", False),
-            filename=request.data.get("filename"),
-            caption=request.data.get("caption", ""),
-            base64_data=request.data.get("base64"),
+    async def post(self, request):
+        data = await self.get_data(request, ["webhook_key", "phone", "filename", "base64"])
+        application = await self.get_application(data["webhook_key"])
+
+        return await self.enqueue(
+            request, data, application, OutboundMessage.KIND_FILE,
+            is_group=data.get("isGroup", False),
+            is_newsletter=data.get("is_newsletter", False),
+            filename=data.get("filename"),
+            caption=data.get("caption", ""),
+            base64_data=data.get("base64"),
         )
-        
-        if response.get("status") == "error":
-            return Response(response, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        return Response(response, status=status.HTTP_200_OK)
 
 class SendMenuSelectView(BaseWhatsAppView):
     """
-    View to handle sending a menu selection message via WhatsApp.
+    View to queue a menu selection message for sending via WhatsApp.
     """
-    def post(self, request):
-        validation_error = self.validate_request_data(request, ["webhook_key", "phone", "sections"])
-        if validation_error:
-            return validation_error
-            
-        webhook_key = request.data["webhook_key"]
-        application = self.get_application(webhook_key)
-        
-        provider = self.create_provider(application.whatsapp_provider_type, application)
-        if not provider:
-            return Response(
-                {"status": "error", "message": _("Provider not found or not supported.")},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-            
-        try:
-            response = provider.send_list_message(
-                phone=request.data.get("phone"),
-                is_group=request.data.get("isGroup", False),
-                description=request.data.get("description", ""),
-                sections=request.data.get("sections"),
-                button_text=str(request.data.get("buttonText", _("Click here to show the list"))),
-            )
-            return Response(response, status=status.HTTP_200_OK)
-        except Exception as e:
-            logger.error("Error sending menu: %s", str(e))
-            return Response({"status": "error", "message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    async def post(self, request):
+        data = await self.get_data(request, ["webhook_key", "phone", "sections"])
+        application = await self.get_application(data["webhook_key"])
+
+        return await self.enqueue(
+            request, data, application, OutboundMessage.KIND_LIST,
+            is_group=data.get("isGroup", False),
+            description=data.get("description", ""),
+            sections=data.get("sections"),
+            button_text=str(data.get("buttonText", _("Click here to show the list"))),
+        )
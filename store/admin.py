@@ -7,10 +7,11 @@ This module defines the following admin classes:
 - CategoryAdmin: Configuration for the Category model in the admin interface.
 - ItemAdmin: Configuration for the Item model in the admin interface.
 - DeliveryAdmin: Configuration for the Delivery model in the admin interface.
+- StockMovementAdmin: Read-only view of the stock ledger.
 """
 
 from django.contrib import admin
-from .models import Category, Item, Delivery
+from .models import Category, Item, Delivery, StockMovement
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -47,6 +48,25 @@ class DeliveryAdmin(admin.ModelAdmin):
     ordering = ('-date',)
 
 
+class StockMovementAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the StockMovement model.
+
+    Movements are append-only; stock is changed through store.stock.
+    """
+    list_display = ('item', 'quantity', 'reason', 'reference', 'created_at')
+    search_fields = ('item__name', 'reference')
+    list_filter = ('reason', 'created_at')
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Item, ItemAdmin)
 admin.site.register(Delivery, DeliveryAdmin)
+admin.site.register(StockMovement, StockMovementAdmin)
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from store.stock import reconcile_stock
+
+
+class Command(BaseCommand):
+    help = 'Recompute Item.quantity from the stock movement ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report items whose quantity differs from the ledger'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        mismatches = reconcile_stock(dry_run=dry_run)
+
+        for item, stored, expected in mismatches:
+            self.stdout.write(f'{item.name}: stored {stored}, ledger {expected}')
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Stock matches the ledger.'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f'{len(mismatches)} items differ from the ledger.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Reconciled {len(mismatches)} items.'))
@@ -0,0 +1,46 @@
+# Generated by Django 5.1 on 2026-10-17 06:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_opening_balances(apps, schema_editor):
+    """
+    Start the ledger from the current stock of every item.
+    """
+    Item = apps.get_model('store', 'Item')
+    StockMovement = apps.get_model('store', 'StockMovement')
+    StockMovement.objects.bulk_create(
+        (
+            StockMovement(item_id=item_id, quantity=quantity, reason='opening')
+            for item_id, quantity in Item.objects.exclude(quantity=0)
+            .values_list('id', 'quantity').iterator()
+        ),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(help_text='Signed change: positive adds stock, negative removes it')),
+                ('reason', models.CharField(choices=[('opening', 'Opening balance'), ('purchase', 'Purchase'), ('sale', 'Sale'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('reference', models.CharField(blank=True, help_text='Source document, e.g. "sale:12" or "purchase:3"', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='store.item')),
+            ],
+            options={
+                'verbose_name_plural': 'Stock Movements',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(create_opening_balances, migrations.RunPython.noop),
+    ]
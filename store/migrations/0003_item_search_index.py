@@ -0,0 +1,70 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Index item names for store.search: pg_trgm on PostgreSQL, an FTS5
+    trigram table on SQLite (skipped if the SQLite build lacks it).
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        # Serves the fuzzy word-similarity operator (%>) on the raw column
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS store_item_name_trgm '
+            'ON store_item USING gin (name gin_trgm_ops)'
+        )
+        # Serves icontains, which Django compiles to UPPER(name::text) LIKE
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS store_item_name_upper_trgm '
+            'ON store_item USING gin ((UPPER(name::text)) gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            try:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE store_item_fts USING fts5("
+                    "name, content='store_item', content_rowid='id', "
+                    "tokenize='trigram')"
+                )
+            except Exception:
+                # FTS5 trigram tokenizer needs SQLite 3.34+; search falls back to icontains
+                return
+            cursor.execute(
+                "CREATE TRIGGER store_item_fts_ai AFTER INSERT ON store_item BEGIN "
+                "INSERT INTO store_item_fts(rowid, name) VALUES (new.id, new.name); END"
+            )
+            cursor.execute(
+                "CREATE TRIGGER store_item_fts_ad AFTER DELETE ON store_item BEGIN "
+                "INSERT INTO store_item_fts(store_item_fts, rowid, name) "
+                "VALUES ('delete', old.id, old.name); END"
+            )
+            cursor.execute(
+                "CREATE TRIGGER store_item_fts_au AFTER UPDATE OF name ON store_item BEGIN "
+                "INSERT INTO store_item_fts(store_item_fts, rowid, name) "
+                "VALUES ('delete', old.id, old.name); "
+                "INSERT INTO store_item_fts(rowid, name) VALUES (new.id, new.name); END"
+            )
+            cursor.execute("INSERT INTO store_item_fts(store_item_fts) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS store_item_name_trgm')
+        schema_editor.execute('DROP INDEX IF EXISTS store_item_name_upper_trgm')
+    elif vendor == 'sqlite':
+        for trigger in ('store_item_fts_ai', 'store_item_fts_ad', 'store_item_fts_au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        schema_editor.execute('DROP TABLE IF EXISTS store_item_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0002_stockmovement'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
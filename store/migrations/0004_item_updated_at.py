@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 06:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0003_item_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='updated_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='Last change; used to refresh cached catalogue snapshots'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+FTS_TRIGGERS = {
+    'store_item_fts_ai': (
+        "CREATE TRIGGER IF NOT EXISTS store_item_fts_ai AFTER INSERT ON store_item BEGIN "
+        "INSERT INTO store_item_fts(rowid, name) VALUES (new.id, new.name); END"
+    ),
+    'store_item_fts_ad': (
+        "CREATE TRIGGER IF NOT EXISTS store_item_fts_ad AFTER DELETE ON store_item BEGIN "
+        "INSERT INTO store_item_fts(store_item_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); END"
+    ),
+    'store_item_fts_au': (
+        "CREATE TRIGGER IF NOT EXISTS store_item_fts_au AFTER UPDATE OF name ON store_item BEGIN "
+        "INSERT INTO store_item_fts(store_item_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO store_item_fts(rowid, name) VALUES (new.id, new.name); END"
+    ),
+}
+
+
+def restore_fts_triggers(apps, schema_editor):
+    """
+    SQLite rebuilds store_item to add a column, which drops the FTS sync
+    triggers; 0004 did so. Recreate them and reindex the names they missed.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    if 'store_item_fts' not in connection.introspection.table_names():
+        return
+    for sql in FTS_TRIGGERS.values():
+        schema_editor.execute(sql)
+    schema_editor.execute("INSERT INTO store_item_fts(store_item_fts) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0004_item_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_fts_triggers, migrations.RunPython.noop),
+    ]
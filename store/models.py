@@ -7,12 +7,14 @@ This module defines the following classes:
 - Category: Represents a category for items.
 - Item: Represents an item in the inventory.
 - Delivery: Represents a delivery of an item to a customer.
+- StockMovement: Represents a change to an item's stock quantity.
 
 Each class provides specific fields and methods for handling related data.
 """
 
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 from django.forms import model_to_dict
 from django_extensions.db.fields import AutoSlugField
 from phonenumber_field.modelfields import PhoneNumberField
@@ -48,6 +50,19 @@ class Item(models.Model):
     price = models.FloatField(default=0)
     expiring_date = models.DateTimeField(null=True, blank=True)
     vendor = models.ForeignKey(Vendor, on_delete=models.SET_NULL, null=True)
+    updated_at = models.DateTimeField(
+        default=timezone.now, db_index=True,
+        help_text='Last change; used to refresh cached catalogue snapshots'
+    )
+
+    def save(self, *args, **kwargs):
+        """
+        Stamp the change time before saving the item.
+        """
+        self.updated_at = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'updated_at'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         """
@@ -101,3 +116,46 @@ class Delivery(models.Model):
             f"Delivery of {self.item} to {self.customer_name} "
             f"at {self.location} on {self.date}"
         )
+
+
+class StockMovement(models.Model):
+    """
+    Represents a change to an item's stock quantity.
+
+    Item.quantity always equals the sum of its movements; use the
+    ``store.stock`` service to change stock so both stay in step.
+    """
+    REASON_OPENING = 'opening'
+    REASON_PURCHASE = 'purchase'
+    REASON_SALE = 'sale'
+    REASON_ADJUSTMENT = 'adjustment'
+
+    REASON_CHOICES = [
+        (REASON_OPENING, 'Opening balance'),
+        (REASON_PURCHASE, 'Purchase'),
+        (REASON_SALE, 'Sale'),
+        (REASON_ADJUSTMENT, 'Adjustment'),
+    ]
+
+    item = models.ForeignKey(
+        Item, on_delete=models.CASCADE, related_name='stock_movements'
+    )
+    quantity = models.IntegerField(
+        help_text='Signed change: positive adds stock, negative removes it'
+    )
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    reference = models.CharField(
+        max_length=50, blank=True,
+        help_text='Source document, e.g. "sale:12" or "purchase:3"'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """
+        String representation of the stock movement.
+        """
+        return f"{self.item.name}: {self.quantity:+d} ({self.reason})"
+
+    class Meta:
+        ordering = ['id']
+        verbose_name_plural = 'Stock Movements'
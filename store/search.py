@@ -0,0 +1,132 @@
+"""
+Item name search backends.
+
+``search_items`` is the single entry point used by the product views and
+the agent tools. The backend is picked from the database vendor (or the
+``ITEM_SEARCH_BACKEND`` setting):
+
+- PostgreSQL: ``pg_trgm`` GIN indexes on ``store_item.name``; substring
+  matches and fuzzy word matches are both served by the index and ranked
+  by trigram word similarity.
+- SQLite: an FTS5 table with the ``trigram`` tokenizer, kept in sync by
+  triggers, ranked with bm25.
+- Anything else: plain ``icontains``.
+
+The indexes are created by migration ``store.0003_item_search_index``.
+On SQLite, a migration that rebuilds ``store_item`` (adding or altering a
+column) drops the FTS triggers; ``store.0005`` restores them after 0004.
+"""
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Item
+
+SQLITE_FTS_TABLE = 'store_item_fts'
+
+
+class IContainsSearchBackend:
+    """
+    Unindexed fallback: every word must appear in the name.
+    """
+
+    def search(self, queryset, words, limit=None):
+        queryset = queryset.filter(
+            reduce(operator.and_, (Q(name__icontains=word) for word in words))
+        )
+        return queryset[:limit] if limit else queryset
+
+
+class TrigramSearchBackend(IContainsSearchBackend):
+    """
+    PostgreSQL ``pg_trgm`` search with typo-tolerant ranking.
+    """
+
+    def search(self, queryset, words, limit=None):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        term = ' '.join(words)
+        substring = reduce(
+            operator.and_, (Q(name__icontains=word) for word in words)
+        )
+        queryset = (
+            queryset
+            .filter(substring | Q(name__trigram_word_similar=term))
+            .annotate(rank=TrigramWordSimilarity(term, 'name'))
+            .order_by('-rank', 'name')
+        )
+        return queryset[:limit] if limit else queryset
+
+
+class SQLiteFTSSearchBackend(IContainsSearchBackend):
+    """
+    SQLite FTS5 trigram search for development databases.
+    """
+
+    def search(self, queryset, words, limit=None):
+        # The trigram tokenizer cannot match fragments shorter than 3 characters
+        if any(len(word) < 3 for word in words):
+            return super().search(queryset, words, limit)
+
+        match = ' AND '.join('"%s"' % word.replace('"', '""') for word in words)
+        # The match and the bm25 ordering run inside the item query, so the
+        # caller's LIMIT applies without materialising every matching id.
+        # GROUP BY keeps SQLite from flattening the rank subquery into a
+        # MATCH per item row; it is computed once and looked up by rowid.
+        fts = SQLITE_FTS_TABLE
+        matches = f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s'
+        ranks = (
+            f'SELECT ranked.rank FROM (SELECT rowid, min(rank) AS rank FROM {fts} '
+            f'WHERE {fts} MATCH %s GROUP BY rowid) AS ranked '
+            f'WHERE ranked.rowid = {Item._meta.db_table}.id'
+        )
+        queryset = (
+            queryset
+            .filter(pk__in=RawSQL(matches, [match]))
+            .annotate(fts_rank=RawSQL(ranks, [match], output_field=FloatField()))
+            .order_by('fts_rank', 'name')
+        )
+        return queryset[:limit] if limit else queryset
+
+
+def _default_backend_path():
+    if connection.vendor == 'postgresql':
+        return 'store.search.TrigramSearchBackend'
+    if connection.vendor == 'sqlite' and _sqlite_fts_available():
+        return 'store.search.SQLiteFTSSearchBackend'
+    return 'store.search.IContainsSearchBackend'
+
+
+def _sqlite_fts_available():
+    return SQLITE_FTS_TABLE in connection.introspection.table_names()
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'ITEM_SEARCH_BACKEND', None) or _default_backend_path()
+        _backend = import_string(path)()
+    return _backend
+
+
+def search_items(term, queryset=None, limit=None):
+    """
+    Return items whose name matches ``term``, best matches first.
+
+    Every whitespace-separated word must match. An empty term returns
+    ``queryset`` (all items by default) unfiltered.
+    """
+    if queryset is None:
+        queryset = Item.objects.all()
+    words = (term or '').split()
+    if not words:
+        return queryset[:limit] if limit else queryset
+    return get_backend().search(queryset, words, limit)
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Item, StockMovement
+
+
+@receiver(pre_save, sender=Item)
+def remember_item_quantity(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored quantity so an edit made through the item form
+    can be recorded as a stock adjustment.
+    """
+    instance._stock_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._stock_previous = (
+        Item.objects.filter(pk=instance.pk)
+        .values_list('quantity', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Item)
+def record_item_quantity_change(sender, instance, created, raw=False, **kwargs):
+    """
+    Record quantities set directly on an item (new items and manual
+    edits) in the stock ledger.
+    """
+    if raw:
+        return
+    if created:
+        if instance.quantity:
+            StockMovement.objects.create(
+                item=instance,
+                quantity=instance.quantity,
+                reason=StockMovement.REASON_OPENING
+            )
+        return
+
+    previous = getattr(instance, '_stock_previous', None)
+    if previous is not None and instance.quantity != previous:
+        StockMovement.objects.create(
+            item=instance,
+            quantity=instance.quantity - previous,
+            reason=StockMovement.REASON_ADJUSTMENT
+        )
@@ -0,0 +1,152 @@
+"""
+Stock ledger service.
+
+Every change to ``Item.quantity`` goes through ``move_stock`` (or
+``remove_stock_bulk`` for multi-line sales): the delta is applied with a
+single conditional ``UPDATE ... SET quantity = quantity + delta`` and
+recorded as a StockMovement in the same transaction. The database row
+lock taken by the update serialises concurrent sales of the same item,
+so stock can neither be oversold nor double counted.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Item, StockMovement
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientStock(ValueError):
+    """
+    Raised when a movement would take an item's stock below zero.
+    """
+
+    def __init__(self, item, requested):
+        self.item = item
+        self.requested = requested
+        super().__init__(f"Not enough stock for item: {item.name}")
+
+
+def move_stock(item, quantity, reason, reference='', allow_negative=False):
+    """
+    Atomically add ``quantity`` (negative to remove) to ``item``'s stock
+    and record the movement.
+
+    Raises InsufficientStock instead of going below zero unless
+    ``allow_negative`` is set (used when correcting past documents).
+    ``item.quantity`` is refreshed from the database afterwards.
+    """
+    if not quantity:
+        return None
+
+    with transaction.atomic():
+        rows = Item.objects.filter(pk=item.pk)
+        if quantity < 0 and not allow_negative:
+            rows = rows.filter(quantity__gte=-quantity)
+        if not rows.update(
+            quantity=F('quantity') + quantity, updated_at=timezone.now()
+        ):
+            item.refresh_from_db(fields=['quantity'])
+            raise InsufficientStock(item, -quantity)
+        movement = StockMovement.objects.create(
+            item=item,
+            quantity=quantity,
+            reason=reason,
+            reference=reference
+        )
+
+    item.refresh_from_db(fields=['quantity'])
+    return movement
+
+
+def remove_stock_bulk(items, quantities, reason, reference=''):
+    """
+    Remove stock for many items with one UPDATE and one INSERT.
+
+    ``items`` maps item id to an Item already locked with
+    ``select_for_update`` by the caller's transaction, ``quantities``
+    maps item id to the (positive) quantity to remove. Raises
+    InsufficientStock for the first item that is short, before anything
+    is written.
+    """
+    quantities = {item_id: qty for item_id, qty in quantities.items() if qty}
+    if not quantities:
+        return []
+
+    for item_id, qty in quantities.items():
+        if items[item_id].quantity < qty:
+            raise InsufficientStock(items[item_id], qty)
+
+    Item.objects.filter(pk__in=quantities).update(
+        quantity=F('quantity') - Case(
+            *[When(pk=item_id, then=Value(qty)) for item_id, qty in quantities.items()],
+            output_field=IntegerField()
+        ),
+        updated_at=timezone.now()
+    )
+    movements = StockMovement.objects.bulk_create([
+        StockMovement(
+            item=items[item_id],
+            quantity=-qty,
+            reason=reason,
+            reference=reference
+        )
+        for item_id, qty in quantities.items()
+    ])
+    for item_id, qty in quantities.items():
+        items[item_id].quantity -= qty
+    return movements
+
+
+def ledger_quantity(item_id):
+    """
+    Return the stock level implied by an item's movements.
+    """
+    return StockMovement.objects.filter(item_id=item_id).aggregate(
+        total=Coalesce(Sum('quantity'), 0)
+    )['total']
+
+
+def reconcile_stock(dry_run=False):
+    """
+    Reset Item.quantity to the ledger total wherever the two disagree.
+
+    Every item is compared against its ledger total in one grouped query;
+    only the mismatched rows are then locked and rechecked, so a clean
+    catalogue costs a single query.
+
+    Returns a list of ``(item, stored_quantity, ledger_quantity)`` for
+    every mismatch found.
+    """
+    candidates = list(
+        Item.objects.annotate(ledger=Coalesce(Sum('stock_movements__quantity'), 0))
+        .exclude(quantity=F('ledger'))
+        .only('id', 'name', 'quantity')
+    )
+
+    mismatches = []
+    for item in candidates:
+        with transaction.atomic():
+            # A sale may have moved the item since the grouped query
+            locked = (
+                Item.objects.select_for_update()
+                .only('id', 'quantity')
+                .get(pk=item.pk)
+            )
+            expected = ledger_quantity(item.pk)
+            if locked.quantity == expected:
+                continue
+            mismatches.append((item, locked.quantity, expected))
+            if not dry_run:
+                Item.objects.filter(pk=item.pk).update(
+                    quantity=expected, updated_at=timezone.now()
+                )
+                logger.warning(
+                    f"Reconciled stock of {item.name}: "
+                    f"{locked.quantity} -> {expected}"
+                )
+    return mismatches
@@ -1,3 +1,135 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from .models import Category, Item, StockMovement
+from .search import (
+    SQLITE_FTS_TABLE, IContainsSearchBackend, SQLiteFTSSearchBackend, search_items
+)
+from .stock import InsufficientStock, ledger_quantity, move_stock, reconcile_stock
+
+
+class StockLedgerConcurrencyTests(TransactionTestCase):
+    """
+    Hammer one item from many threads and check that the stored quantity
+    and the ledger agree and never go below zero.
+    """
+    THREADS = 8
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('threads cannot share an in-memory SQLite database')
+        category = Category.objects.create(name='Stress')
+        self.item = Item.objects.create(
+            name='Stress item', description='', category=category, quantity=50
+        )
+
+    def _run_concurrently(self, func, times):
+        def run(_):
+            try:
+                return func()
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            return list(pool.map(run, range(times)))
+
+    def _sell_one(self):
+        item = Item.objects.get(pk=self.item.pk)
+        try:
+            move_stock(item, -1, StockMovement.REASON_SALE)
+            return True
+        except InsufficientStock:
+            return False
+
+    def test_concurrent_sales_never_oversell(self):
+        results = self._run_concurrently(self._sell_one, 80)
+
+        self.item.refresh_from_db()
+        self.assertEqual(sum(results), 50)
+        self.assertEqual(self.item.quantity, 0)
+        self.assertEqual(ledger_quantity(self.item.pk), 0)
+        self.assertEqual(
+            StockMovement.objects.filter(item=self.item, reason=StockMovement.REASON_SALE).count(), 50
+        )
+
+    def test_concurrent_purchases_and_sales_stay_reconciled(self):
+        def purchase_two():
+            item = Item.objects.get(pk=self.item.pk)
+            move_stock(item, 2, StockMovement.REASON_PURCHASE)
+            return True
+
+        self._run_concurrently(purchase_two, 40)
+        self._run_concurrently(self._sell_one, 60)
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.quantity, 50 + 80 - 60)
+        self.assertEqual(ledger_quantity(self.item.pk), self.item.quantity)
+        self.assertEqual(reconcile_stock(dry_run=True), [])
+
+
+class ItemSearchMixin:
+    """
+    Behaviour every search backend shares; subclasses set ``backend``.
+    """
+    backend = None
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Office')
+        for name in ('Printer paper A4', 'Paper clips', 'Laser printer', 'Stapler'):
+            Item.objects.create(name=name, description='', category=category, quantity=1, price=1)
+
+    def setUp(self):
+        patcher = mock.patch('store.search._backend', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def names(self, term, **kwargs):
+        return sorted(item.name for item in search_items(term, **kwargs))
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.names('paper'), ['Paper clips', 'Printer paper A4'])
+        self.assertEqual(self.names('PRINTER paper'), ['Printer paper A4'])
+        self.assertEqual(self.names('printer toner'), [])
+
+    def test_matches_inside_words(self):
+        self.assertEqual(self.names('aple'), ['Stapler'])
+
+    def test_empty_term_returns_everything(self):
+        self.assertEqual(len(self.names('  ')), 4)
+
+    def test_limit(self):
+        self.assertEqual(len(search_items('er', limit=1)), 1)
+
+
+class IContainsSearchBackendTests(ItemSearchMixin, TestCase):
+    backend = IContainsSearchBackend()
+
+
+class SQLiteFTSSearchBackendTests(ItemSearchMixin, TestCase):
+    backend = SQLiteFTSSearchBackend()
+
+    def setUp(self):
+        if connection.vendor != 'sqlite' or SQLITE_FTS_TABLE not in connection.introspection.table_names():
+            self.skipTest('needs SQLite with the FTS5 trigram tokenizer')
+        super().setUp()
+
+    def test_ranks_and_limits_in_one_query(self):
+        with self.assertNumQueries(1):
+            items = list(search_items('printer', limit=10))
+
+        self.assertEqual(len(items), 2)
+        self.assertTrue(all(isinstance(item.fts_rank, float) for item in items))
+        self.assertEqual(items, sorted(items, key=lambda item: (item.fts_rank, item.name)))
+
+    def test_index_follows_renames_and_deletes(self):
+        stapler = Item.objects.get(name='Stapler')
+        stapler.name = 'Heavy duty stapler'
+        stapler.save()
+        Item.objects.filter(name='Paper clips').delete()
+
+        self.assertEqual(self.names('heavy'), ['Heavy duty stapler'])
+        self.assertEqual(self.names('clips'), [])
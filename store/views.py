@@ -12,10 +12,12 @@ and querying functionalities.
 
 # Standard library imports
 import operator
+from datetime import timedelta
 from functools import reduce
 
 # Django core imports
 from django.shortcuts import render
+from django.utils import timezone
 from django.urls import reverse, reverse_lazy
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
@@ -39,11 +41,12 @@ from django_tables2.export.views import ExportMixin
 
 # Local app imports
 from accounts.models import Profile, Vendor
-from transactions.models import Sale
+from transactions.models import Sale, DailySalesRollup
 from integration.models import ApplicationConfiguration
 from .models import Category, Item, Delivery
 from .forms import ItemForm, CategoryForm, DeliveryForm
 from .tables import ItemTable
+from .search import search_items
 
 
 @login_required
@@ -66,15 +69,14 @@ def dashboard(request):
     categories = [cat["name"] for cat in category_counts]
     category_counts = [cat["item_count"] for cat in category_counts]
 
-    sale_dates = (
-        Sale.objects.values("date_added__date")
-        .annotate(total_sales=Sum("grand_total"))
-        .order_by("date_added__date")
-    )
+    # One pre-aggregated row per day, limited to the last year
+    sale_dates = DailySalesRollup.objects.filter(
+        date__gt=timezone.localdate() - timedelta(days=365)
+    ).values("date", "grand_total").order_by("date")
     sale_dates_labels = [
-        date["date_added__date"].strftime("%Y-%m-%d") for date in sale_dates
+        date["date"].strftime("%Y-%m-%d") for date in sale_dates
     ]
-    sale_dates_values = [float(date["total_sales"]) for date in sale_dates]
+    sale_dates_values = [float(date["grand_total"]) for date in sale_dates]
 
     # Get Flow AI configurations
     flow_configs = ApplicationConfiguration.objects.filter(flow_ai=True)
@@ -134,12 +136,7 @@ class ItemSearchListView(ProductListView):
 
         query = self.request.GET.get("q")
         if query:
-            query_list = query.split()
-            result = result.filter(
-                reduce(
-                    operator.and_, (Q(name__icontains=q) for q in query_list)
-                )
-            )
+            result = search_items(query, queryset=result)
         return result
 
 
@@ -395,8 +392,8 @@ def get_items_ajax_view(request):
             term = request.POST.get("term", "")
             data = []
 
-            items = Item.objects.filter(name__icontains=term)
-            for item in items[:10]:
+            items = search_items(term, limit=10).select_related("category")
+            for item in items:
                 data.append(item.to_json())
 
             return JsonResponse(data, safe=False)
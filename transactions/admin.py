@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Sale, SaleDetail, Purchase
+from .models import Sale, SaleDetail, Purchase, DailySalesRollup
 
 
 @admin.register(Sale)
@@ -79,3 +79,34 @@ class PurchaseAdmin(admin.ModelAdmin):
         """
         obj.total_value = obj.price * obj.quantity
         super().save_model(request, obj, form, change)
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    """
+    Read-only admin view of the pre-aggregated daily sales totals.
+    """
+    list_display = (
+        'date',
+        'sale_count',
+        'grand_total',
+        'amount_paid',
+        'outstanding'
+    )
+    ordering = ('-date',)
+    date_hierarchy = 'date'
+    readonly_fields = (
+        'date',
+        'sale_count',
+        'sub_total',
+        'grand_total',
+        'tax_amount',
+        'amount_paid',
+        'outstanding'
+    )
+
+    def has_add_permission(self, request):
+        """
+        Rows are maintained from sales; use rebuild_sales_rollup to backfill.
+        """
+        return False
@@ -0,0 +1,174 @@
+"""
+Streaming spreadsheet exports for sales and purchases.
+
+Rows are read with ``select_related`` and ``.iterator(chunk_size=...)``
+so memory use stays flat however many records are exported:
+
+* CSV is written straight into a ``StreamingHttpResponse`` and starts
+  downloading with the first chunk.
+* Excel uses an openpyxl write-only workbook, which spools rows to a
+  temporary file instead of keeping cell objects in memory; the file is
+  then streamed back with ``FileResponse``.
+"""
+import csv
+import tempfile
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from openpyxl import Workbook
+
+XLSX_CONTENT_TYPE = (
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+)
+
+SALE_COLUMNS = [
+    'ID', 'Date', 'Customer', 'Sub Total',
+    'Grand Total', 'Tax Amount', 'Tax Percentage',
+    'Amount Paid', 'Amount Change'
+]
+
+PURCHASE_COLUMNS = [
+    'ID', 'Item', 'Description', 'Vendor', 'Order Date',
+    'Delivery Date', 'Quantity', 'Delivery Status',
+    'Price per item (Ksh)', 'Total Value'
+]
+
+
+class Echo:
+    """
+    File-like object whose ``write`` returns the value instead of
+    buffering it, so csv.writer rows can be yielded one by one.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def _date_param(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        # Well formed but not a real date, e.g. 2024-02-30
+        parsed = None
+    if parsed is None:
+        raise BadRequest(f"'{name}' must be a date in YYYY-MM-DD format.")
+    return parsed
+
+
+def filter_by_date(queryset, request, field):
+    """
+    Restrict ``queryset`` to the ``start`` / ``end`` (YYYY-MM-DD, inclusive)
+    query parameters, interpreted in the current time zone. An invalid
+    date raises ``BadRequest``, which Django answers with a 400.
+    """
+    start = _date_param(request, 'start')
+    end = _date_param(request, 'end')
+    if start:
+        queryset = queryset.filter(**{
+            f'{field}__gte': timezone.make_aware(datetime.combine(start, time.min))
+        })
+    if end:
+        queryset = queryset.filter(**{
+            f'{field}__lt': timezone.make_aware(
+                datetime.combine(end + timedelta(days=1), time.min)
+            )
+        })
+    return queryset
+
+
+def naive(value):
+    """
+    Excel cannot store time zones; export local wall-clock time.
+    """
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value).replace(tzinfo=None)
+    return value
+
+
+def sale_rows(sales):
+    for sale in sales.select_related('customer').iterator(chunk_size=export_chunk_size()):
+        yield [
+            sale.id,
+            naive(sale.date_added),
+            sale.customer.phone,
+            sale.sub_total,
+            sale.grand_total,
+            sale.tax_amount,
+            sale.tax_percentage,
+            sale.amount_paid,
+            sale.amount_change
+        ]
+
+
+def purchase_rows(purchases):
+    queryset = purchases.select_related('item', 'vendor')
+    for purchase in queryset.iterator(chunk_size=export_chunk_size()):
+        yield [
+            purchase.id,
+            purchase.item.name,
+            purchase.description,
+            purchase.vendor.name,
+            naive(purchase.order_date),
+            naive(purchase.delivery_date),
+            purchase.quantity,
+            purchase.get_delivery_status_display(),
+            purchase.price,
+            purchase.total_value
+        ]
+
+
+def csv_response(filename, columns, rows):
+    writer = csv.writer(Echo())
+
+    def stream():
+        # Byte order mark so Excel opens UTF-8 (e.g. Arabic names) correctly
+        yield '\ufeff'
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(
+                ['' if value is None else value for value in row]
+            )
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename={filename}.csv'
+    return response
+
+
+def xlsx_response(filename, title, columns, rows):
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title)
+    worksheet.append(columns)
+    for row in rows:
+        worksheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f'{filename}.xlsx',
+        content_type=XLSX_CONTENT_TYPE
+    )
+
+
+def export_response(request, filename, title, columns, rows):
+    """
+    Return a CSV stream for ``?format=csv``, otherwise an Excel workbook.
+    """
+    if request.GET.get('format') == 'csv':
+        return csv_response(filename, columns, rows)
+    return xlsx_response(filename, title, columns, rows)
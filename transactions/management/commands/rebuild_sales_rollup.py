@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from transactions.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailySalesRollup table from all recorded sales'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding daily sales rollup...')
+        days = rebuild_rollup()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt sales rollup for {days} days.'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-17 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_alter_purchase_quantity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Date')),
+                ('sale_count', models.PositiveIntegerField(default=0)),
+                ('sub_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('grand_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('tax_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, help_text="Unpaid balance of the day's sales (grand total minus amount paid)", max_digits=14)),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Rollup',
+                'verbose_name_plural': 'Daily Sales Rollups',
+                'db_table': 'daily_sales_rollup',
+                'ordering': ['date'],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+from django.db.models.functions import TruncDate
+
+AMOUNT_FIELDS = ('sub_total', 'grand_total', 'tax_amount', 'amount_paid', 'outstanding')
+
+
+def backfill_rollup(apps, schema_editor):
+    """
+    Fill DailySalesRollup from the sales recorded before it existed.
+    """
+    Sale = apps.get_model('transactions', 'Sale')
+    DailySalesRollup = apps.get_model('transactions', 'DailySalesRollup')
+
+    days = (
+        Sale.objects.annotate(day=TruncDate('date_added'))
+        .values('day')
+        .annotate(
+            total_sale_count=Count('id'),
+            total_sub_total=Sum('sub_total'),
+            total_grand_total=Sum('grand_total'),
+            total_tax_amount=Sum('tax_amount'),
+            total_amount_paid=Sum('amount_paid'),
+            total_outstanding=Sum(
+                Case(
+                    When(
+                        grand_total__gt=F('amount_paid'),
+                        then=F('grand_total') - F('amount_paid'),
+                    ),
+                    default=Value(0),
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                )
+            ),
+        )
+        .order_by('day')
+    )
+
+    DailySalesRollup.objects.all().delete()
+    DailySalesRollup.objects.bulk_create(
+        (
+            DailySalesRollup(
+                date=row['day'],
+                sale_count=row['total_sale_count'],
+                **{
+                    field: Decimal(str(row[f'total_{field}'] or 0)).quantize(Decimal('0.01'))
+                    for field in AMOUNT_FIELDS
+                },
+            )
+            for row in days
+        ),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_dailysalesrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
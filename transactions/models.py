@@ -109,6 +109,61 @@ class SaleDetail(models.Model):
         )
 
 
+class DailySalesRollup(models.Model):
+    """
+    Pre-aggregated sales totals for one calendar day.
+
+    Rows are maintained incrementally by the Sale signals in
+    ``transactions.signals`` and can be rebuilt from scratch with the
+    ``rebuild_sales_rollup`` management command.
+    """
+
+    date = models.DateField(unique=True, verbose_name="Date")
+    sale_count = models.PositiveIntegerField(default=0)
+    sub_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    grand_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    tax_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    amount_paid = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    outstanding = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Unpaid balance of the day's sales (grand total minus amount paid)"
+    )
+
+    class Meta:
+        db_table = "daily_sales_rollup"
+        ordering = ["date"]
+        verbose_name = "Daily Sales Rollup"
+        verbose_name_plural = "Daily Sales Rollups"
+
+    def __str__(self):
+        """
+        Returns a string representation of the DailySalesRollup instance.
+        """
+        return (
+            f"{self.date} | "
+            f"Sales: {self.sale_count} | "
+            f"Grand Total: {self.grand_total}"
+        )
+
+
 class Purchase(models.Model):
     """
     Represents a purchase of an item,
@@ -146,9 +201,6 @@ class Purchase(models.Model):
         """
         self.total_value = self.price * self.quantity
         super().save(*args, **kwargs)
-        # Update the item quantity
-        self.item.quantity += self.quantity
-        self.item.save()
 
     def __str__(self):
         """
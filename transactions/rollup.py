@@ -0,0 +1,137 @@
+"""
+Incremental maintenance of the DailySalesRollup table.
+
+Every Sale create/update/delete adds or subtracts that sale's amounts on
+its day's row inside the same transaction, so dashboard charts and the
+agent's sales summaries aggregate one row per day instead of scanning
+the whole sales history.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailySalesRollup, Sale
+
+AMOUNT_FIELDS = ("sub_total", "grand_total", "tax_amount", "amount_paid")
+CENTS = Decimal("0.01")
+
+
+def _amount(value):
+    return Decimal(str(value or 0)).quantize(CENTS)
+
+
+def sale_snapshot(sale):
+    """
+    Return the (day, amounts) a sale contributes to the rollup.
+    """
+    amounts = {field: _amount(getattr(sale, field)) for field in AMOUNT_FIELDS}
+    amounts["outstanding"] = max(amounts["grand_total"] - amounts["amount_paid"], Decimal("0"))
+    return timezone.localdate(sale.date_added), amounts
+
+
+def apply_delta(day, amounts, sign=1):
+    """
+    Add (``sign=1``) or remove (``sign=-1``) one sale's amounts on ``day``.
+
+    Uses a single conditional UPDATE with F() expressions so concurrent
+    sales on the same day never lose an increment. A day without a row
+    (first sale of the day, or a day from before the rollup existed) is
+    recomputed from the Sale table instead, which already reflects the
+    change being applied.
+
+    Returns True when the day was recomputed.
+    """
+    changes = {field: F(field) + sign * value for field, value in amounts.items()}
+    changes["sale_count"] = F("sale_count") + sign
+
+    with transaction.atomic():
+        if DailySalesRollup.objects.filter(date=day).update(**changes):
+            return False
+        try:
+            with transaction.atomic():
+                recompute_day(day)
+            return True
+        except IntegrityError:
+            # Another transaction created the row first, without this change
+            DailySalesRollup.objects.filter(date=day).update(**changes)
+            return False
+
+
+def recompute_day(day):
+    """Write the rollup row of ``day`` from that day's sales."""
+    rows = daily_totals(Sale.objects.filter(date_added__date=day))
+    if rows:
+        DailySalesRollup.objects.create(**rows[0])
+
+
+def daily_totals(sales):
+    """
+    Aggregate a Sale queryset into one dict of DailySalesRollup field
+    values per day.
+    """
+    decimal = DecimalField(max_digits=14, decimal_places=2)
+    # Aliases are prefixed so they do not shadow the Sale columns they sum
+    days = (
+        sales.annotate(day=TruncDate("date_added"))
+        .values("day")
+        .annotate(
+            total_sale_count=Count("id"),
+            total_sub_total=Sum("sub_total"),
+            total_grand_total=Sum("grand_total"),
+            total_tax_amount=Sum("tax_amount"),
+            total_amount_paid=Sum("amount_paid"),
+            total_outstanding=Sum(
+                Case(
+                    When(
+                        grand_total__gt=F("amount_paid"),
+                        then=F("grand_total") - F("amount_paid"),
+                    ),
+                    default=Value(0),
+                    output_field=decimal,
+                )
+            ),
+        )
+        .order_by("day")
+    )
+    return [
+        {
+            "date": row["day"],
+            "sale_count": row["total_sale_count"],
+            **{
+                field: _amount(row[f"total_{field}"])
+                for field in AMOUNT_FIELDS + ("outstanding",)
+            },
+        }
+        for row in days
+    ]
+
+
+def rebuild_rollup():
+    """
+    Recompute every DailySalesRollup row from the Sale table.
+
+    Returns the number of days written.
+    """
+    rows = [DailySalesRollup(**row) for row in daily_totals(Sale.objects.all())]
+
+    with transaction.atomic():
+        DailySalesRollup.objects.all().delete()
+        DailySalesRollup.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def sales_summary(**filters):
+    """
+    Aggregate rollup rows matching ``filters`` (e.g. ``date=today`` or
+    ``date__year=2024``) into total, count, paid and outstanding.
+    """
+    result = DailySalesRollup.objects.filter(**filters).aggregate(
+        total=Sum("grand_total"),
+        count=Sum("sale_count"),
+        paid=Sum("amount_paid"),
+        outstanding=Sum("outstanding"),
+    )
+    return {key: value or 0 for key, value in result.items()}
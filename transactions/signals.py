@@ -1,14 +1,101 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import Purchase
+from store.models import Item, StockMovement
+from store.stock import move_stock
+from .models import Purchase, Sale
+from .rollup import AMOUNT_FIELDS, apply_delta, sale_snapshot
+
+
+@receiver(pre_save, sender=Purchase)
+def remember_purchase_quantity(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored item and quantity of an existing purchase so an edit
+    only moves the difference into stock.
+    """
+    instance._stock_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._stock_previous = (
+        Purchase.objects.filter(pk=instance.pk)
+        .values_list("item_id", "quantity")
+        .first()
+    )
 
 
 @receiver(post_save, sender=Purchase)
-def update_item_quantity(sender, instance, created, **kwargs):
+def update_item_quantity(sender, instance, created, raw=False, **kwargs):
+    """
+    Signal to update item quantity when a purchase is made or edited.
+    """
+    if raw:
+        return
+    reference = f"purchase:{instance.pk}"
+    previous = getattr(instance, "_stock_previous", None)
+
+    with transaction.atomic():
+        if created or previous is None:
+            move_stock(
+                instance.item, instance.quantity,
+                StockMovement.REASON_PURCHASE, reference
+            )
+            return
+
+        previous_item_id, previous_quantity = previous
+        if previous_item_id != instance.item_id:
+            move_stock(
+                Item(pk=previous_item_id), -previous_quantity,
+                StockMovement.REASON_PURCHASE, reference, allow_negative=True
+            )
+            previous_quantity = 0
+        move_stock(
+            instance.item, instance.quantity - previous_quantity,
+            StockMovement.REASON_PURCHASE, reference, allow_negative=True
+        )
+
+
+@receiver(pre_save, sender=Sale)
+def remember_sale_totals(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored totals of an existing sale so post_save can apply
+    only the difference to the daily rollup.
+    """
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    previous = (
+        Sale.objects.filter(pk=instance.pk)
+        .only("date_added", *AMOUNT_FIELDS)
+        .first()
+    )
+    if previous is not None:
+        instance._rollup_previous = sale_snapshot(previous)
+
+
+@receiver(post_save, sender=Sale)
+def update_sales_rollup(sender, instance, raw=False, **kwargs):
+    """
+    Apply a created or edited sale to DailySalesRollup.
+    """
+    if raw:
+        return
+    previous = getattr(instance, "_rollup_previous", None)
+    current = sale_snapshot(instance)
+    if previous == current:
+        return
+    with transaction.atomic():
+        if previous is not None:
+            recomputed = apply_delta(*previous, sign=-1)
+            if recomputed and previous[0] == current[0]:
+                # The recomputed day already holds the saved amounts
+                return
+        apply_delta(*current)
+
+
+@receiver(post_delete, sender=Sale)
+def remove_from_sales_rollup(sender, instance, **kwargs):
     """
-    Signal to update item quantity when a purchase is made.
+    Subtract a deleted sale from DailySalesRollup.
     """
-    if created:
-        instance.item.quantity += instance.quantity
-        instance.item.save()
+    apply_delta(*sale_snapshot(instance), sign=-1)
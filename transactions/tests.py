@@ -1,3 +1,100 @@
+import json
+from datetime import datetime
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Customer
+from store.models import Category, Item
+
+from .models import Sale, SaleDetail
+
+
+class SaleCreateQueryCountTests(TestCase):
+    """
+    Creating a sale costs the same number of queries whatever the number
+    of lines on the ticket.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(first_name='Walk', last_name='In')
+        category = Category.objects.create(name='Counter')
+        cls.items = [
+            Item.objects.create(
+                name=f'Item {n}', description='', category=category,
+                quantity=100, price=10
+            )
+            for n in range(5)
+        ]
+
+    def _post_sale(self, items):
+        lines = [
+            {'id': item.pk, 'price': 10, 'quantity': 1, 'total_item': 10}
+            for item in items
+        ]
+        total = 10 * len(lines)
+        payload = {
+            'customer': self.customer.pk,
+            'sub_total': total,
+            'grand_total': total,
+            'amount_paid': total,
+            'amount_change': 0,
+            'items': lines,
+        }
+        response = self.client.post(
+            reverse('sale-create'), json.dumps(payload),
+            content_type='application/json',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_query_count_does_not_grow_with_lines(self):
+        # The first sale of the day also creates its rollup row
+        self._post_sale(self.items[:1])
+
+        with CaptureQueriesContext(connection) as single_line:
+            self._post_sale(self.items[:1])
+
+        with self.assertNumQueries(len(single_line)):
+            self._post_sale(self.items)
+
+        self.assertEqual(Sale.objects.count(), 3)
+        self.assertEqual(SaleDetail.objects.count(), 1 + 1 + len(self.items))
+        for item in self.items:
+            item.refresh_from_db()
+        self.assertEqual(
+            [item.quantity for item in self.items], [97, 99, 99, 99, 99]
+        )
+
+
+class SalesExportDateFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = Customer.objects.create(first_name='Walk', last_name='In')
+        for day in (1, 15, 28):
+            sale = Sale.objects.create(customer=customer, grand_total=day)
+            Sale.objects.filter(pk=sale.pk).update(
+                date_added=timezone.make_aware(datetime(2024, 2, day, 12))
+            )
+
+    def export(self, **params):
+        return self.client.get(reverse('sales-export'), {'format': 'csv', **params})
+
+    def test_filters_by_inclusive_date_range(self):
+        response = self.export(start='2024-02-15', end='2024-02-28')
+
+        self.assertEqual(response.status_code, 200)
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 1 + 2)
 
-# Create your tests here.
+    def test_invalid_dates_are_rejected(self):
+        for params in ({'start': '2024-02-30'}, {'end': '2024-13-01'}, {'start': 'yesterday'}):
+            with self.subTest(params=params):
+                with self.assertLogs('django.request', 'WARNING'):
+                    response = self.export(**params)
+                self.assertEqual(response.status_code, 400)
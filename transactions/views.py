@@ -3,7 +3,7 @@ import json
 import logging
 
 # Django core imports
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.urls import reverse
 from django.shortcuts import render
 from django.db import transaction
@@ -15,14 +15,16 @@ from django.views.generic.edit import CreateView, UpdateView, DeleteView
 # Authentication and permissions
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 
-# Third-party packages
-from openpyxl import Workbook
-
 # Local app imports
-from store.models import Item
+from store.models import Item, StockMovement
+from store.stock import remove_stock_bulk
 from accounts.models import Customer
 from .models import Sale, Purchase, SaleDetail
 from .forms import PurchaseForm
+from .exports import (
+    SALE_COLUMNS, PURCHASE_COLUMNS, export_response, filter_by_date,
+    purchase_rows, sale_rows
+)
 
 
 logger = logging.getLogger(__name__)
@@ -33,104 +35,30 @@ def is_ajax(request):
 
 
 def export_sales_to_excel(request):
-    # Create a workbook and select the active worksheet.
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Sales'
-
-    # Define the column headers
-    columns = [
-        'ID', 'Date', 'Customer', 'Sub Total',
-        'Grand Total', 'Tax Amount', 'Tax Percentage',
-        'Amount Paid', 'Amount Change'
-    ]
-    worksheet.append(columns)
-
-    # Fetch sales data
-    sales = Sale.objects.all()
-
-    for sale in sales:
-        # Convert timezone-aware datetime to naive datetime
-        if sale.date_added.tzinfo is not None:
-            date_added = sale.date_added.replace(tzinfo=None)
-        else:
-            date_added = sale.date_added
-
-        worksheet.append([
-            sale.id,
-            date_added,
-            sale.customer.phone,
-            sale.sub_total,
-            sale.grand_total,
-            sale.tax_amount,
-            sale.tax_percentage,
-            sale.amount_paid,
-            sale.amount_change
-        ])
-
-    # Set up the response to send the file
-    response = HttpResponse(
-        content_type=(
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+    """
+    Stream sales as an Excel workbook, or as CSV with ``?format=csv``.
+    Optional ``start`` / ``end`` (YYYY-MM-DD) limit the sale dates.
+    """
+    sales = filter_by_date(
+        Sale.objects.order_by('id'), request, 'date_added'
+    )
+    return export_response(
+        request, 'sales', 'Sales', SALE_COLUMNS, sale_rows(sales)
     )
-    response['Content-Disposition'] = 'attachment; filename=sales.xlsx'
-    workbook.save(response)
-
-    return response
 
 
 def export_purchases_to_excel(request):
-    # Create a workbook and select the active worksheet.
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = 'Purchases'
-
-    # Define the column headers
-    columns = [
-        'ID', 'Item', 'Description', 'Vendor', 'Order Date',
-        'Delivery Date', 'Quantity', 'Delivery Status',
-        'Price per item (Ksh)', 'Total Value'
-    ]
-    worksheet.append(columns)
-
-    # Fetch purchases data
-    purchases = Purchase.objects.all()
-
-    for purchase in purchases:
-        # Convert timezone-aware datetime to naive datetime
-        delivery_tzinfo = purchase.delivery_date.tzinfo
-        order_tzinfo = purchase.order_date.tzinfo
-
-        if delivery_tzinfo or order_tzinfo is not None:
-            delivery_date = purchase.delivery_date.replace(tzinfo=None)
-            order_date = purchase.order_date.replace(tzinfo=None)
-        else:
-            delivery_date = purchase.delivery_date
-            order_date = purchase.order_date
-        worksheet.append([
-            purchase.id,
-            purchase.item.name,
-            purchase.description,
-            purchase.vendor.name,
-            order_date,
-            delivery_date,
-            purchase.quantity,
-            purchase.get_delivery_status_display(),
-            purchase.price,
-            purchase.total_value
-        ])
-
-    # Set up the response to send the file
-    response = HttpResponse(
-        content_type=(
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+    """
+    Stream purchases as an Excel workbook, or as CSV with ``?format=csv``.
+    Optional ``start`` / ``end`` (YYYY-MM-DD) limit the order dates.
+    """
+    purchases = filter_by_date(
+        Purchase.objects.order_by('id'), request, 'order_date'
+    )
+    return export_response(
+        request, 'purchases', 'Purchases', PURCHASE_COLUMNS,
+        purchase_rows(purchases)
     )
-    response['Content-Disposition'] = 'attachment; filename=purchases.xlsx'
-    workbook.save(response)
-
-    return response
 
 
 class SaleListView(LoginRequiredMixin, ListView):
@@ -187,42 +115,66 @@ def SaleCreateView(request):
                     "amount_change": float(data["amount_change"]),
                 }
 
-                # Use a transaction to ensure atomicity
+                # Validate the lines before touching the database
+                items = data["items"]
+                if not isinstance(items, list):
+                    raise ValueError("Items should be a list")
+
+                lines = []
+                for item in items:
+                    if not all(
+                        k in item for k in [
+                            "id", "price", "quantity", "total_item"
+                        ]
+                    ):
+                        raise ValueError("Item is missing required fields")
+                    lines.append({
+                        "item_id": int(item["id"]),
+                        "price": float(item["price"]),
+                        "quantity": int(item["quantity"]),
+                        "total_detail": float(item["total_item"])
+                    })
+
+                quantities = {}
+                for line in lines:
+                    quantities[line["item_id"]] = (
+                        quantities.get(line["item_id"], 0) + line["quantity"]
+                    )
+
+                # Use a transaction to ensure atomicity; the query count is
+                # the same whatever the number of lines
                 with transaction.atomic():
+                    # Lock every item on the ticket in one query
+                    item_instances = Item.objects.select_for_update().in_bulk(
+                        list(quantities)
+                    )
+                    if len(item_instances) != len(quantities):
+                        raise Item.DoesNotExist
+
                     # Create the sale
                     new_sale = Sale.objects.create(**sale_attributes)
                     logger.info(f"Sale created: {new_sale}")
 
-                    # Create sale details and update item quantities
-                    items = data["items"]
-                    if not isinstance(items, list):
-                        raise ValueError("Items should be a list")
-
-                    for item in items:
-                        if not all(
-                            k in item for k in [
-                                "id", "price", "quantity", "total_item"
-                            ]
-                        ):
-                            raise ValueError("Item is missing required fields")
-
-                        item_instance = Item.objects.get(id=int(item["id"]))
-                        if item_instance.quantity < int(item["quantity"]):
-                            raise ValueError(f"Not enough stock for item: {item_instance.name}")
-
-                        detail_attributes = {
-                            "sale": new_sale,
-                            "item": item_instance,
-                            "price": float(item["price"]),
-                            "quantity": int(item["quantity"]),
-                            "total_detail": float(item["total_item"])
-                        }
-                        SaleDetail.objects.create(**detail_attributes)
-                        logger.info(f"Sale detail created: {detail_attributes}")
-
-                        # Reduce item quantity
-                        item_instance.quantity -= int(item["quantity"])
-                        item_instance.save()
+                    # Reduce item quantities; raises InsufficientStock
+                    # (a ValueError) and rolls the sale back if short
+                    remove_stock_bulk(
+                        item_instances, quantities,
+                        StockMovement.REASON_SALE, f"sale:{new_sale.pk}"
+                    )
+
+                    SaleDetail.objects.bulk_create([
+                        SaleDetail(
+                            sale=new_sale,
+                            item=item_instances[line["item_id"]],
+                            price=line["price"],
+                            quantity=line["quantity"],
+                            total_detail=line["total_detail"]
+                        )
+                        for line in lines
+                    ])
+                    logger.info(
+                        f"Created {len(lines)} sale details for sale {new_sale.pk}"
+                    )
 
                 return JsonResponse(
                     {